@@ -1,82 +1,225 @@
-import pandas as pd
+import datetime
+import hashlib
+import time
+import re
 from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+from docx.oxml import OxmlElement
 from docx.oxml.ns import qn
-import numpy as np
 from copy import deepcopy
-from openpyxl import load_workbook
-from openpyxl.utils import coordinate_to_tuple, get_column_letter
+from lxml import etree
 from functios_database import inicializar_base_datos,obtener_configuraciones,guardar_configuracion
 
-def detectar_rango_tabla(excel_path, celda_inicial="B2", sheet_name=None):
+
+# Textos que pandas.read_excel convierte en NaN por defecto (más los errores de Excel),
+# para que la lectura desde la caché produzca el mismo DataFrame.
+VALORES_NULOS_EXCEL = {
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+    "#DIV/0!", "#NAME?", "#NULL!", "#NUM!", "#REF!", "#VALUE!",
+}
+
+
+# Rangos ya detectados: (ruta, hoja, celda) -> ((mtime, tamaño), rango).
+# Un libro sin cambios no vuelve a recorrerse; si cambió, su entrada se reemplaza (no se
+# acumula una por cada guardado en un proceso de larga duración como el modo de vigilancia).
+_rangos_detectados = {}
+
+
+def _limites_tabla(filas, start_col_index):
+    """
+    Recorre filas (numero_fila, valores desde la columna inicial) a partir de la fila inicial
+    y devuelve (ultima_columna, ultima_fila, terminado). Se detiene en la primera celda vacía
+    de la columna inicial; `terminado` indica si se encontró ese límite.
+    """
+    last_col = start_col_index - 1
+    last_row = None
+    for numero, valores in filas:
+        if last_row is None:
+            # Detectar límite de columnas en la fila inicial
+            for valor in valores:
+                if valor in (None, ""):
+                    break
+                last_col += 1
+            last_row = numero - 1
+        # Detectar límite de filas
+        if not valores or valores[0] in (None, "") or numero != last_row + 1:
+            return last_col, last_row, True
+        last_row = numero
+    return last_col, last_row, False
+
+
+def detectar_rango_tabla(excel_path, celda_inicial="B2", sheet_name=None, cache=None):
     """
     Detecta el rango de una tabla en Excel comenzando desde la celda inicial.
     Devuelve el rango como string, por ejemplo 'B2:F16'.
+    La hoja se recorre en streaming desde la celda inicial y la lectura se detiene en la
+    primera fila vacía; si se pasa `cache` (WorkbookCache) las filas se toman de ella.
+    El resultado se recuerda mientras el archivo no cambie (mtime y tamaño).
     """
-    wb = load_workbook(excel_path, data_only=True)
-    ws = wb[sheet_name] if sheet_name else wb.active
+    from openpyxl.utils import coordinate_to_tuple, get_column_letter
+    import zipfile
+    from excel_cache import firma_archivo, leer_valores
+    from xlsx_stream import LibroXlsx
 
-    start_col_letter, start_row = coordinate_to_tuple(celda_inicial)
-    start_col_index = start_col_letter  # en realidad devuelve número, no letra
+    start_row, start_col_index = coordinate_to_tuple(celda_inicial)  # devuelve (fila, columna)
     start_col_letter = get_column_letter(start_col_index)
 
-    # Convertir a índice 0-based
-    row = start_row
-    col = start_col_index
-
-    # Detectar límite de columnas
-    last_col = col
-    while ws.cell(row=row, column=last_col).value not in (None, ""):
-        last_col += 1
-    last_col -= 1  # retroceder al último con valor
+    ruta, mtime, tamano = firma_archivo(excel_path)
+    clave = (ruta, sheet_name, celda_inicial)
+    firma = (mtime, tamano)
+    recordado = _rangos_detectados.get(clave)
+    if recordado is not None and recordado[0] == firma:
+        return recordado[1]
+
+    if cache is not None:
+        max_row = start_row + 100
+        while True:
+            filas = cache.obtener_hoja(excel_path, sheet_name, max_row=max_row)
+            last_col, last_row, terminado = _limites_tabla(
+                ((n, fila[start_col_index - 1:]) for n, fila in enumerate(filas[start_row - 1:], start=start_row)),
+                start_col_index)
+            if terminado or len(filas) < max_row:
+                break
+            max_row *= 2
+    elif zipfile.is_zipfile(excel_path):
+        with LibroXlsx(excel_path) as libro:
+            last_col, last_row, _ = _limites_tabla(
+                libro.iterar_valores(sheet_name, min_row=start_row, min_col=start_col_index), start_col_index)
+    else:
+        # .xls: sin lectura en streaming, se lee la hoja entera
+        filas, _ = leer_valores(excel_path, sheet_name, min_row=start_row, min_col=start_col_index)
+        last_col, last_row, _ = _limites_tabla(enumerate(filas, start=start_row), start_col_index)
 
-    # Detectar límite de filas
-    last_row = row
-    while ws.cell(row=last_row, column=col).value not in (None, ""):
-        last_row += 1
-    last_row -= 1  # retroceder al último con valor
+    if last_row is None:
+        last_row = start_row - 1
 
     col_end_letter = get_column_letter(last_col)
 
     rango = f"{start_col_letter}{start_row}:{col_end_letter}{last_row}"
+    _rangos_detectados[clave] = (firma, rango)
     return rango
 
 
-def read_excel_table(excel_path, sheet_name, excel_range):
-    """Lee un rango de una hoja de Excel y lo devuelve como DataFrame."""
-    import re
+def resolver_rango(excel_path, sheet_name, excel_range, cache=None):
+    """
+    Devuelve el rango a leer. Si la configuración solo indica la celda inicial
+    (ej. 'B2'), el rango se detecta automáticamente con detectar_rango_tabla.
+    """
+    excel_range = excel_range.strip().upper()
+    if re.fullmatch(r'[A-Z]+\d+', excel_range):
+        return detectar_rango_tabla(excel_path, excel_range, sheet_name, cache=cache)
+    return excel_range
+
+
+def _parse_excel_range(excel_range):
     match = re.match(r'([A-Z]+)(\d+):([A-Z]+)(\d+)', excel_range)
     if not match:
         raise ValueError("Formato de rango inválido. Usa algo como 'B2:L14'.")
     col_start, row_start, col_end, row_end = match.groups()
-    row_start = int(row_start)
-    row_end = int(row_end)
-    cols = f"{col_start}:{col_end}"
+    return col_start, int(row_start), col_end, int(row_end)
+
+
+def _dataframe_desde_filas(encabezado, filas, col_start_idx, ancho):
+    """
+    Construye el DataFrame de un rango a partir de filas ya recortadas a sus columnas
+    (el encabezado es la fila 1 de Excel, como en pd.read_excel).
+    Los valores se conservan tal como están en Excel (dtype object), sin que el tipo
+    dependa de otras filas de la columna.
+    """
+    import pandas as pd
+
+    def normalizar(fila):
+        valores = [None if isinstance(v, str) and v in VALORES_NULOS_EXCEL else v for v in fila[:ancho]]
+        return valores + [None] * (ancho - len(valores))
+
+    columnas = [v if v is not None else f"Unnamed: {col_start_idx - 1 + k}"
+                for k, v in enumerate(normalizar(encabezado))]
+    return pd.DataFrame([normalizar(fila) for fila in filas], columns=columnas, dtype=object)
+
+
+def read_excel_table(excel_path, sheet_name, excel_range, cache=None):
+    """
+    Lee un rango de una hoja de Excel y lo devuelve como DataFrame.
+    Solo se leen las filas hasta el final del rango; si se pasa `cache` (WorkbookCache)
+    la hoja se comparte entre todas las configuraciones del lote.
+    """
+    from openpyxl.utils import column_index_from_string
+    from excel_cache import leer_bloque
+
+    col_start, row_start, col_end, row_end = _parse_excel_range(excel_range)
+    idx_inicio = column_index_from_string(col_start)
+    idx_fin = column_index_from_string(col_end)
+    ancho = idx_fin - idx_inicio + 1
+
+    if cache is not None:
+        filas = cache.obtener_hoja(excel_path, sheet_name, max_row=row_end)
+        encabezado = filas[0][idx_inicio - 1:idx_fin] if filas else ()
+        datos = [fila[idx_inicio - 1:idx_fin] for fila in filas[max(row_start - 1, 1):row_end]]
+    else:
+        encabezado, datos = leer_bloque(excel_path, sheet_name, row_start, row_end, idx_inicio, idx_fin)
 
-    # Leer solo columnas especificadas
-    df = pd.read_excel(excel_path, sheet_name=sheet_name, usecols=cols)
+    return _dataframe_desde_filas(encabezado, datos, idx_inicio, ancho)
 
-    # Seleccionar solo filas dentro del rango
-    df = df.iloc[row_start - 2 : row_end - 1].reset_index(drop=True)
-    return df
+class DocumentIndex:
+    """
+    Índice de párrafos y tablas del cuerpo de un documento, construido con una sola pasada.
+    Para cada párrafo guarda su texto y la siguiente tabla (w:tbl) del cuerpo, de modo que
+    buscar N tablas por etiqueta cuesta un recorrido lineal en lugar de N cuadráticos.
+    El índice sigue siendo válido mientras no se agreguen o quiten párrafos o tablas del cuerpo.
+    """
 
-def find_paragraph_with_label(doc, label):
+    def __init__(self, doc):
+        self.doc = doc
+        self._parrafos = []  # [texto, w:p, w:tbl siguiente o None]
+        self._tablas = {}
+        pendientes = []
+        for elemento in doc.element.body.iterchildren():
+            if elemento.tag == qn('w:p'):
+                entrada = [Paragraph(elemento, doc._body).text, elemento, None]
+                self._parrafos.append(entrada)
+                pendientes.append(entrada)
+            elif elemento.tag == qn('w:tbl'):
+                for entrada in pendientes:
+                    entrada[2] = elemento
+                pendientes = []
+        self._siguiente_tabla = {p: tbl for _, p, tbl in self._parrafos}
+
+    def _tabla(self, tbl):
+        if tbl is None:
+            return None
+        if tbl not in self._tablas:
+            self._tablas[tbl] = Table(tbl, self.doc._body)
+        return self._tablas[tbl]
+
+    def find_paragraph(self, label):
+        """Primer párrafo cuyo texto contiene la etiqueta (o None)."""
+        for texto, p, _ in self._parrafos:
+            if label in texto:
+                return Paragraph(p, self.doc._body)
+        return None
+
+    def table_after_paragraph(self, paragraph):
+        """Primera tabla del cuerpo que sigue al párrafo dado (o None)."""
+        return self._tabla(self._siguiente_tabla.get(paragraph._p))
+
+    def table_by_label(self, label):
+        """Primera tabla que sigue a algún párrafo que contiene la etiqueta."""
+        for texto, _, tbl in self._parrafos:
+            if tbl is not None and label in texto:
+                return self._tabla(tbl)
+        return None
+
+
+def find_paragraph_with_label(doc, label, indice=None):
     """Encuentra el párrafo que contiene la etiqueta específica."""
-    for paragraph in doc.paragraphs:
-        if label in paragraph.text:
-            return paragraph
-    return None
+    return (indice or DocumentIndex(doc)).find_paragraph(label)
 
-def find_table_after_paragraph(doc, paragraph):
-    """Encuentra la tabla inmediatamente después del párrafo dado."""
-    para_element = paragraph._p
-    for tbl in doc.tables:
-        if tbl._element.getprevious() == para_element:
-            return tbl
-    # También podría ser la siguiente en el flujo de contenido
-    for tbl in doc.tables:
-        if para_element in tbl._element.xpath('.//preceding::w:p'):
-            return tbl
-    return None
+def find_table_after_paragraph(doc, paragraph, indice=None):
+    """Encuentra la tabla inmediatamente después del párrafo dado (o la siguiente en el flujo de contenido)."""
+    return (indice or DocumentIndex(doc)).table_after_paragraph(paragraph)
 
 
 def get_grid_span(cell):
@@ -87,45 +230,215 @@ def get_grid_span(cell):
         return int(grid_span[0].get(qn('w:val')))
     return 1
 
+
+W_P = qn('w:p')
+W_R = qn('w:r')
+W_T = qn('w:t')
+W_TCPR = qn('w:tcPr')
+W_RPR = qn('w:rPr')
+XML_SPACE = qn('xml:space')
+W_GRIDSPAN = qn('w:gridSpan')
+W_VAL = qn('w:val')
+
+
+def _grid_de_celdas(tbl):
+    """
+    Recorre una sola vez los w:tr/w:tc de la tabla y devuelve (celdas, filas_con_fusiones, columnas):
+    - celdas: lista plana con el w:tc de cada posición de la cuadrícula, igual que
+      Table._cells de python-docx (celda (i, j) = celdas[i * columnas + j]).
+    - filas_con_fusiones: índices de filas con alguna celda con gridSpan > 1.
+    """
+    columnas = tbl.col_count
+    celdas = []
+    filas_con_fusiones = []
+    for i, tr in enumerate(tbl.tr_lst):
+        fusionada = False
+        for tc in tr.tc_lst:
+            if not fusionada:
+                grid_span = next(tc.iter(W_GRIDSPAN), None)
+                fusionada = grid_span is not None and int(grid_span.get(W_VAL)) > 1
+            continua = tc.vMerge == "continue"
+            for k in range(tc.grid_span):
+                if continua:
+                    celdas.append(celdas[-columnas])
+                elif k > 0:
+                    celdas.append(celdas[-1])
+                else:
+                    celdas.append(tc)
+        if fusionada:
+            filas_con_fusiones.append(i)
+    return celdas, filas_con_fusiones, columnas
+
+
 def detectar_filas_con_columnas_unidas(table):
     """
     Devuelve una lista con los índices de las filas que contienen
     al menos una celda fusionada horizontalmente (gridSpan > 1).
     """
-    filas_con_fusiones = []
-    for i, row in enumerate(table.rows):
-        for cell in row.cells:
-            if get_grid_span(cell) > 1:
-                filas_con_fusiones.append(i)
-                break  # solo necesitamos marcar la fila una vez
-    return filas_con_fusiones
+    return _grid_de_celdas(table._tbl)[1]
 
 
-def update_table_cells(word_table, df):
+def _llenar_run(r, texto):
+    """Equivalente a `r.text = texto` para un run sin rPr, creando los elementos directamente."""
+    if "\t" in texto or "\n" in texto or "\r" in texto:
+        r.text = texto  # python-docx convierte tabulaciones y saltos en w:tab / w:br
+        return
+    for e in list(r):
+        r.remove(e)
+    if texto:
+        t = etree.SubElement(r, W_T)
+        t.text = texto
+        if len(texto.strip()) < len(texto):
+            t.set(XML_SPACE, "preserve")
+
+
+def _escribir_texto_celda(tc, texto):
+    """
+    Equivalente a `_Cell.text = texto`: deja la celda con un solo párrafo y un solo run.
+    Si la celda ya tiene exactamente esa forma (sin propiedades ni atributos) se reutiliza el run.
+    """
+    contenido = [e for e in tc if isinstance(e.tag, str) and e.tag != W_TCPR]
+    if len(contenido) == 1:
+        p = contenido[0]
+        if p.tag == W_P and not p.attrib and len(p) == 1:
+            r = p[0]
+            if r.tag == W_R and not r.attrib and r.rPr is None:
+                _llenar_run(r, texto)
+                return
+    for e in contenido:
+        tc.remove(e)
+    _llenar_run(etree.SubElement(etree.SubElement(tc, W_P), W_R), texto)
+
+
+def _texto_en_run(r, texto):
+    """Como _llenar_run, pero conserva el rPr del run."""
+    if "\t" in texto or "\n" in texto or "\r" in texto:
+        r.text = texto  # python-docx conserva el rPr y convierte tabulaciones y saltos
+        return
+    for e in [e for e in r if e.tag != W_RPR]:
+        r.remove(e)
+    if texto:
+        t = etree.SubElement(r, W_T)
+        t.text = texto
+        if len(texto.strip()) < len(texto):
+            t.set(XML_SPACE, "preserve")
+
+
+def reemplazar_texto(tc, texto):
+    """
+    Cambia el texto de una celda conservando el pPr de su primer párrafo y el rPr de su
+    primer run (a diferencia de _escribir_texto_celda, que deja la celda sin formato).
+    """
+    p = next(tc.iterchildren(W_P), None)
+    if p is None:
+        p = etree.SubElement(tc, W_P)
+    for e in [e for e in tc if e is not p and isinstance(e.tag, str) and e.tag != W_TCPR]:
+        tc.remove(e)
+    r = next(p.iterchildren(W_R), None)
+    if r is None:
+        r = etree.SubElement(p, W_R)
+    for e in [e for e in p if e is not r and e.tag != W_PPR]:
+        p.remove(e)
+    _texto_en_run(r, texto)
+
+
+def _plantilla_parrafo(tc):
+    """
+    Párrafo modelo de una celda: su primer pPr y un run con el rPr de su primer run (o, si la
+    celda está vacía, el de la marca de párrafo). Se copia una vez y se clona en cada celda.
+    """
+    p = next(tc.iterchildren(W_P), None)
+    p_pr = p.find(W_PPR) if p is not None else None
+    r = next(p.iterchildren(W_R), None) if p is not None else None
+    r_pr = r.find(W_RPR) if r is not None else None
+    if r_pr is None and p_pr is not None:
+        r_pr = p_pr.find(W_RPR)
+    plantilla = tc.makeelement(W_P, {})
+    if p_pr is not None:
+        plantilla.append(deepcopy(p_pr))
+    run = etree.SubElement(plantilla, W_R)
+    if r_pr is not None:
+        run.append(deepcopy(r_pr))
+    return plantilla
+
+
+def _escribir_con_plantilla(tc, plantilla, texto):
+    """Deja la celda con una copia del párrafo modelo (ver _plantilla_parrafo) con `texto`."""
+    for e in [e for e in tc if isinstance(e.tag, str) and e.tag != W_TCPR]:
+        tc.remove(e)
+    p = deepcopy(plantilla)
+    tc.append(p)
+    _texto_en_run(p[-1], texto)
+
+
+def _texto_celda(tc):
+    """Texto de una celda, igual que `_Cell.text`."""
+    return "\n".join(p.text for p in tc.p_lst)
+
+
+def update_table_cells(word_table, df, solo_cambios=False, conservar_formato=False, header_rows=1):
     """Actualiza las celdas de una tabla de Word con los valores de un DataFrame,
-    omitiendo las filas fusionadas (no las modifica), pero manteniendo el orden."""
-    
-    filas_con_fusiones = detectar_filas_con_columnas_unidas(word_table)
+    omitiendo las filas fusionadas (no las modifica), pero manteniendo el orden.
+    Recorre el XML de la tabla una sola vez en lugar de llamar a word_table.cell(i, j) por valor.
+    Con `solo_cambios=True` solo se reescriben las celdas cuyo texto es distinto.
+    Con `conservar_formato=True` los valores quedan con el formato de la plantilla en lugar de
+    sin formato: el pPr/rPr de cada columna se toma una vez de la primera fila de datos (la
+    primera sin fusiones desde `header_rows`) y se clona en cada celda; las filas de
+    encabezado conservan el formato de su propia celda.
+    Devuelve el número de celdas escritas."""
+    import pandas as pd
+
+    tbl = word_table._tbl
+    celdas, filas_con_fusiones, num_columnas = _grid_de_celdas(tbl)
+    num_filas = len(tbl.tr_lst)
     print(f"Filas fusionadas detectadas (se omiten): {filas_con_fusiones}")
 
-    if len(df) > len(word_table.rows):
-        print(f"Advertencia: Excel tiene {len(df)} filas, pero la tabla de Word solo tiene {len(word_table.rows)} filas.")
+    if len(df) > num_filas:
+        print(f"Advertencia: Excel tiene {len(df)} filas, pero la tabla de Word solo tiene {num_filas} filas.")
+
+    valores = df.to_numpy(dtype=object)
+    vacios = pd.isna(valores)
+    filas_con_fusiones = set(filas_con_fusiones)
+    escritas = 0
 
-    for i in range(len(word_table.rows)):
-        if i >= len(df):
-            break  # no hay más filas de Excel para insertar
+    plantillas = None
+    if conservar_formato:
+        fila_datos = next((i for i in range(header_rows, num_filas) if i not in filas_con_fusiones), None)
+        if fila_datos is not None:
+            plantillas = [_plantilla_parrafo(celdas[fila_datos * num_columnas + j]) for j in range(num_columnas)]
 
+    for i in range(min(num_filas, len(df))):
         if i in filas_con_fusiones:
             print(f"Fila {i} fusionada: se omite actualización pero se avanza índice de Excel.")
             continue  # NO escribimos en filas fusionadas, pero igual avanzamos Excel
 
-        row = df.iloc[i]  # ✅ usar el mismo índice i para Excel y Word
-        for j, value in enumerate(row):
-            if j >= len(word_table.columns):
+        for j in range(valores.shape[1]):
+            if j >= num_columnas:
                 print(f"Advertencia: columna {j} de Excel excede columnas de la tabla Word.")
                 break
-            word_cell = word_table.cell(i, j)
-            word_cell.text = "" if pd.isna(value) else str(value)
+            tc = celdas[i * num_columnas + j]
+            texto = "" if vacios[i, j] else str(valores[i, j])
+            if solo_cambios and _texto_celda(tc) == texto:
+                continue
+            if plantillas is None:
+                _escribir_texto_celda(tc, texto)
+            elif i < header_rows:
+                reemplazar_texto(tc, texto)
+            else:
+                _escribir_con_plantilla(tc, plantillas[j], texto)
+            escritas += 1
+
+    return escritas
+
+
+def hash_tabla(word_table):
+    """Hash SHA-256 del texto de todas las celdas de la tabla (para detectar cambios entre ejecuciones)."""
+    celdas, _, num_columnas = _grid_de_celdas(word_table._tbl)
+    h = hashlib.sha256()
+    for k, tc in enumerate(celdas):
+        h.update(_texto_celda(tc).encode("utf-8"))
+        h.update(b"\x1e" if (k + 1) % max(num_columnas, 1) == 0 else b"\x1f")
+    return h.hexdigest()
 
 
 
@@ -138,16 +451,40 @@ def update_word_table_from_excel(excel_path, sheet_name, excel_range, word_path,
     df = read_excel_table(excel_path, sheet_name, excel_range)
     doc = Document(word_path)
 
-    paragraph = find_paragraph_with_label(doc, label)
+    if aplicar_tabla_en_documento(doc, df, label) is None:
+        return
+
+    save_path = output_path if output_path else word_path
+    doc.save(save_path)
+    print(f"Documento guardado en {save_path}")
+
+
+def aplicar_tabla_en_documento(doc, df, label, indice=None, solo_cambios=False, estadisticas=None,
+                               conservar_formato=False, header_rows=1):
+    """
+    Actualiza en memoria la tabla que sigue a `label` dentro de un documento ya abierto.
+    Devuelve la tabla actualizada o None si no se pudo actualizar (no guarda el documento).
+    Si se actualizan varias tablas del mismo documento, conviene pasar un DocumentIndex.
+    Con `solo_cambios=True` solo se reescriben las celdas que cambiaron; si se pasa el
+    diccionario `estadisticas` se guarda en él cuántas celdas se escribieron ('celdas_escritas')
+    y si cambió el tamaño de la tabla ('estructura_modificada'), además del tiempo en segundos de
+    cada etapa en estadisticas['etapas'] ('buscar_etiqueta', 'ajustar_tabla_word', 'update_table_cells').
+    `conservar_formato` y `header_rows` son los de update_table_cells.
+    """
+    etapas = estadisticas.setdefault("etapas", {}) if estadisticas is not None else {}
+    inicio = time.perf_counter()
+    indice = indice or DocumentIndex(doc)
+    paragraph = find_paragraph_with_label(doc, label, indice)
     if not paragraph:
         print(f"No se encontró la etiqueta '{label}' en el documento.")
-        return
+        return None
 
-    table = find_table_after_paragraph(doc, paragraph)
+    table = find_table_after_paragraph(doc, paragraph, indice)
+    etapas["buscar_etiqueta"] = time.perf_counter() - inicio
 
     if not table:
         print("No se encontró una tabla después de la etiqueta.")
-        return
+        return None
     
     
     num_columnas_excel = df.shape[1]
@@ -156,56 +493,142 @@ def update_word_table_from_excel(excel_path, sheet_name, excel_range, word_path,
     if num_columnas_excel != num_columnas_word:
         print(f"Error: La tabla de Excel tiene {num_columnas_excel} columnas, pero la tabla de Word tiene {num_columnas_word} columnas.")
         print("No se puede actualizar la tabla porque las columnas no coinciden.")
-        return
-
+        return None
 
-    ajustar_tabla_word(table, df.shape[0], df.shape[1])
 
+    inicio = time.perf_counter()
+    estructura_modificada = ajustar_tabla_word(table, df.shape[0], df.shape[1])
+    etapas["ajustar_tabla_word"] = time.perf_counter() - inicio
 
-    update_table_cells(table, df)
+    inicio = time.perf_counter()
+    celdas_escritas = update_table_cells(table, df, solo_cambios, conservar_formato, header_rows)
+    etapas["update_table_cells"] = time.perf_counter() - inicio
     print("Tabla actualizada con los nuevos valores.")
 
-    save_path = output_path if output_path else word_path
-    doc.save(save_path)
-    print(f"Documento guardado en {save_path}")
+    if estadisticas is not None:
+        estadisticas["celdas_escritas"] = celdas_escritas
+        estadisticas["estructura_modificada"] = estructura_modificada
+    return table
+
+
+W_TRPR = qn('w:trPr')
+W_PPR = qn('w:pPr')
+W_PSTYLE = qn('w:pStyle')
+W_VMERGE = qn('w:vMerge')
+W_TBLHEADER = qn('w:tblHeader')
+
+
+def _celda_vacia(tc, quitar_fusion=False):
+    """Copia de la celda con sus propiedades (tcPr) y un solo párrafo vacío con el pPr del primero."""
+    nueva = OxmlElement('w:tc')
+    tcPr = tc.find(W_TCPR)
+    if tcPr is not None:
+        tcPr = deepcopy(tcPr)
+        for tag in (W_VMERGE,) + ((W_GRIDSPAN,) if quitar_fusion else ()):
+            for e in tcPr.findall(tag):
+                tcPr.remove(e)
+        nueva.append(tcPr)
+    p = etree.SubElement(nueva, W_P)
+    primer_p = tc.find(W_P)
+    if primer_p is not None and primer_p.find(W_PPR) is not None:
+        p.append(deepcopy(primer_p.find(W_PPR)))
+    return nueva
+
+
+def _fila_plantilla(tbl):
+    """
+    Fila vacía con el formato de la última fila sin celdas unidas (alto, sombreado, bordes,
+    alineación), para clonar al agregar filas. None si todas las filas tienen celdas unidas.
+    """
+    for tr in reversed(tbl.tr_lst):
+        if all(tc.grid_span == 1 for tc in tr.tc_lst):
+            nueva = OxmlElement('w:tr')
+            trPr = tr.find(W_TRPR)
+            if trPr is not None:
+                trPr = deepcopy(trPr)
+                for e in trPr.findall(W_TBLHEADER):
+                    trPr.remove(e)
+                nueva.append(trPr)
+            nueva.extend(_celda_vacia(tc) for tc in tr.tc_lst)
+            etree.cleanup_namespaces(nueva)
+            return nueva
+    return None
 
 
+def _recortar_fila(tr, columnas):
+    """Quita de la fila las celdas que empiezan en la columna `columnas` o después y acorta las que la cruzan."""
+    inicio = tr.grid_before
+    for tc in list(tr.tc_lst):
+        span = tc.grid_span
+        if inicio >= columnas:
+            tr.remove(tc)
+        elif inicio + span > columnas:
+            tc.grid_span = columnas - inicio
+        inicio += span
 
 
 def ajustar_tabla_word(table, num_filas_excel, num_columnas_excel):
-    num_filas_word = len(table.rows)
-    num_columnas_word = len(table.columns)
+    """
+    Agrega o quita filas y columnas para que la tabla tenga el tamaño de Excel. Devuelve True si cambió.
+    Las filas y celdas se agregan o quitan en bloque sobre el XML: las filas nuevas copian el
+    formato de la última fila sin celdas unidas y las columnas nuevas el de la última celda de
+    cada fila; w:tblGrid se actualiza para que el documento siga siendo válido.
+    """
+    tbl = table._tbl
+    filas = tbl.tr_lst
+    grid_cols = tbl.tblGrid.gridCol_lst
+    num_filas_word = len(filas)
+    num_columnas_word = len(grid_cols)
 
     print(f"Tamaño actual Word: {num_filas_word} filas x {num_columnas_word} columnas")
     print(f"Tamaño requerido Excel: {num_filas_excel} filas x {num_columnas_excel} columnas")
 
     # Ajustar filas
     if num_filas_word < num_filas_excel:
-        for _ in range(num_filas_excel - num_filas_word):
-            table.add_row()
-        print(f"Se agregaron {num_filas_excel - num_filas_word} filas.")
+        faltantes = num_filas_excel - num_filas_word
+        plantilla = _fila_plantilla(tbl)
+        if plantilla is None:
+            for _ in range(faltantes):
+                table.add_row()
+        else:
+            ultima = filas[-1]
+            posicion = tbl.index(ultima) + 1
+            tbl[posicion:posicion] = [deepcopy(plantilla) for _ in range(faltantes)]
+        print(f"Se agregaron {faltantes} filas.")
     elif num_filas_word > num_filas_excel:
-        for _ in range(num_filas_word - num_filas_excel):
-            table._tbl.remove(table.rows[-1]._tr)
+        for tr in filas[num_filas_excel:]:
+            tbl.remove(tr)
         print(f"Se eliminaron {num_filas_word - num_filas_excel} filas.")
 
     # Ajustar columnas
     if num_columnas_word < num_columnas_excel:
-        for row in table.rows:
-            for _ in range(num_columnas_excel - num_columnas_word):
-                row._tr.append(deepcopy(row.cells[-1]._tc))
-        print(f"Se agregaron {num_columnas_excel - num_columnas_word} columnas.")
+        faltantes = num_columnas_excel - num_columnas_word
+        for tr in tbl.tr_lst:
+            if tr.tc_lst:
+                celda = _celda_vacia(tr.tc_lst[-1], quitar_fusion=True)
+                etree.cleanup_namespaces(celda)
+                tr.extend(deepcopy(celda) for _ in range(faltantes))
+        ultima_col = grid_cols[-1] if grid_cols else None
+        for _ in range(faltantes):
+            if ultima_col is not None:
+                tbl.tblGrid.append(deepcopy(ultima_col))
+            else:
+                tbl.tblGrid.add_gridCol()
+        print(f"Se agregaron {faltantes} columnas.")
     elif num_columnas_word > num_columnas_excel:
-        for row in table.rows:
-            for _ in range(num_columnas_word - num_columnas_excel):
-                row._tr.remove(row.cells[-1]._tc)
+        for tr in tbl.tr_lst:
+            _recortar_fila(tr, num_columnas_excel)
+        for grid_col in grid_cols[num_columnas_excel:]:
+            tbl.tblGrid.remove(grid_col)
         print(f"Se eliminaron {num_columnas_word - num_columnas_excel} columnas.")
 
+    return num_filas_word != num_filas_excel or num_columnas_word != num_columnas_excel
+
 
 def actualizar_todas_las_tablas():
     configs = obtener_configuraciones()
     for config in configs:
-        id_, excel_file, sheet_name, excel_range, word_file, table_label, output_file = config
+        id_, excel_file, sheet_name, excel_range, word_file, table_label, output_file = config[:7]
         try:
             print(f"Actualizando tabla {id_}...")
             update_word_table_from_excel(excel_file, sheet_name, excel_range, word_file, table_label, output_file)
@@ -213,87 +636,181 @@ def actualizar_todas_las_tablas():
         except Exception as e:
             print(f"Error al actualizar tabla {id_}: {e}")
 
-from docx.shared import Pt
-
 def formatear_tabla(tabla, fuente='Arial', tamaño=10):
     """
     Aplica formato de fuente y tamaño a todas las celdas de una tabla de Word.
-    También aplica bordes a toda la tabla.
+    También aplica bordes a toda la tabla. Es aplicar_formato con una EspecificacionTabla
+    (formato_tabla), que hace todo en un solo recorrido del XML.
     """
-    for fila in tabla.rows:
-        for celda in fila.cells:
-            for parrafo in celda.paragraphs:
-                for run in parrafo.runs:
-                    run.font.name = fuente
-                    run.font.size = Pt(tamaño)
+    from formato_tabla import EspecificacionTabla, aplicar_formato
 
-    aplicar_bordes_a_tabla(tabla)
+    aplicar_formato(tabla, EspecificacionTabla(fuente, tamaño))
 
 def aplicar_bordes_a_tabla(tabla):
-    tbl = tabla._tbl  # accedemos al XML de la tabla
+    from formato_tabla import EspecificacionTabla, aplicar_formato
+
+    aplicar_formato(tabla, EspecificacionTabla(fuente=None, tamaño=None))
 
-    tblBorders = tbl.xpath('.//w:tblBorders')
-    if tblBorders:
-        tblBorders = tblBorders[0]
-    else:
-        # Crear nodo de bordes si no existe
-        from lxml import etree
-        namespaces = {'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'}
-        tblPr = tbl.xpath('./w:tblPr', namespaces=namespaces)[0]
-        tblBorders = etree.SubElement(tblPr, '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}tblBorders')
-
-    for borde in ['top', 'left', 'bottom', 'right', 'insideH', 'insideV']:
-        tag = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}' + borde
-        elemento = tblBorders.find(tag)
-        if elemento is None:
-            from lxml import etree
-            elemento = etree.SubElement(tblBorders, tag)
-        elemento.set('val', 'single')
-        elemento.set('sz', '4')      # tamaño del borde
-        elemento.set('space', '0')
-        elemento.set('color', '000000')  # negro
+
+def _formato_estilo(estilo):
+    """(fuente, tamaño) de un estilo de párrafo, heredando de sus estilos base lo que no defina."""
+    fuente = tamaño = None
+    while estilo is not None and (fuente is None or tamaño is None):
+        fuente = fuente or estilo.font.name
+        tamaño = tamaño or (estilo.font.size.pt if estilo.font.size is not None else None)
+        estilo = estilo.base_style
+    return fuente, tamaño
 
 
 def obtener_formato_tabla(tabla):
     """
-    Retorna una tupla (fuente, tamaño) del primer texto encontrado en la tabla.
-    Si no encuentra fuente o tamaño, devuelve (None, None).
-    """
-    for fila in tabla.rows:
-        for celda in fila.cells:
-            for parrafo in celda.paragraphs:
-                for run in parrafo.runs:
-                    fuente = run.font.name
-                    tamaño = run.font.size.pt if run.font.size else None
-                    if fuente or tamaño:
-                        return (fuente, tamaño)
+    Retorna una tupla (fuente, tamaño) del primer texto encontrado en la tabla: la fuente y
+    el tamaño directos del run o, si no los tiene, los del estilo de su párrafo (formatear_tabla
+    los deja en el estilo "Tabla Arial 10"). Si no encuentra fuente o tamaño, devuelve (None, None).
+    """
+    estilos = None  # style_id -> (fuente, tamaño), se arma al encontrar el primer párrafo con estilo
+    for p in tabla._tbl.iter(W_P):
+        p_style = p.find(f"{W_PPR}/{W_PSTYLE}")
+        for r in p.iter(W_R):
+            fuente = tamaño = None
+            if r.rPr is not None:
+                fuente = r.rPr.rFonts.get(qn('w:ascii')) if r.rPr.rFonts is not None else None
+                tamaño = r.rPr.sz.val.pt if r.rPr.sz is not None else None
+            if p_style is not None and (fuente is None or tamaño is None):
+                if estilos is None:
+                    try:
+                        estilos_documento = tabla.part.styles
+                    except AttributeError:  # tabla sin documento
+                        estilos_documento = ()
+                    estilos = {estilo.style_id: _formato_estilo(estilo) for estilo in estilos_documento
+                               if estilo.type == WD_STYLE_TYPE.PARAGRAPH}
+                fuente_estilo, tamaño_estilo = estilos.get(p_style.get(W_VAL), (None, None))
+                fuente, tamaño = fuente or fuente_estilo, tamaño or tamaño_estilo
+            if fuente or tamaño:
+                return (fuente, tamaño)
     return (None, None)  # si no encuentra nada
 
 
 
-def find_table_by_label(doc, label_text):
-    for i, paragraph in enumerate(doc.paragraphs):
-        if label_text in paragraph.text:
-            for element in doc.element.body.iter():
-                if element.tag.endswith('p') and element == paragraph._element:
-                    next_element = element.getnext()
-                    while next_element is not None:
-                        if next_element.tag.endswith('tbl'):
-                            for tbl in doc.tables:
-                                if tbl._element == next_element:
-                                    return tbl
-                        next_element = next_element.getnext()
-    return None
+def find_table_by_label(doc, label_text, indice=None):
+    """Encuentra la primera tabla que sigue a un párrafo que contiene la etiqueta."""
+    return (indice or DocumentIndex(doc)).table_by_label(label_text)
+
+def formatear_dinero(texto):
+    """Devuelve el texto como moneda ("$1,234.50") o None si no es un número."""
+    try:
+        monto = float(texto.strip().replace(",", "").replace("$", ""))
+    except ValueError:
+        return None
+    return "${:,.2f}".format(monto)
+
 
 def format_table_money_columns(table, money_cols, header_rows=1):
-    for row in table.rows[header_rows:]:
-        for col_idx in money_cols:
-            cell_text = row.cells[col_idx].text.strip()
-            try:
-                monto = float(cell_text.replace(",", "").replace("$", ""))
-                row.cells[col_idx].text = "${:,.2f}".format(monto)
-            except ValueError:
-                pass  # dejar sin cambiar si falla
+    """Da formato de dinero a las columnas `money_cols` desde la fila `header_rows` (lo que no es un número queda igual)."""
+    from formato_tabla import EspecificacionTabla, aplicar_formato
+
+    especificacion = EspecificacionTabla(None, None, None, {col_idx: "dinero" for col_idx in money_cols}, header_rows)
+    return aplicar_formato(table, especificacion)["celdas_formateadas"]
+
+
+# Formatos de columna admitidos en la configuración (campo money_columns):
+# "3,6" -> dinero en las columnas 3 y 6; "3:dinero, 4:porcentaje, 5:entero, 7:fecha".
+FORMATOS_COLUMNA = ("dinero", "porcentaje", "entero", "fecha")
+SINONIMOS_FORMATO = {
+    "money": "dinero", "$": "dinero", "moneda": "dinero",
+    "percent": "porcentaje", "%": "porcentaje",
+    "integer": "entero", "int": "entero",
+    "date": "fecha",
+}
+FORMATO_FECHA = "%d/%m/%Y"
+TIPOS_FECHA = (datetime.datetime, datetime.date)  # pd.Timestamp es un datetime.datetime
+
+
+def parse_formato_columnas(formato_str):
+    """
+    Convierte el texto de la configuración en {índice 0-based: formato}.
+    Un número solo ("1,2") es una columna de dinero, como en las configuraciones anteriores;
+    "3:porcentaje" indica el formato. Los elementos no válidos se ignoran.
+    """
+    formatos = {}
+    if not formato_str:
+        return formatos
+    for parte in str(formato_str).split(","):
+        columna, _, formato = parte.partition(":")
+        columna = columna.strip()
+        formato = formato.strip().lower() or "dinero"
+        formato = SINONIMOS_FORMATO.get(formato, formato)
+        if columna.isdigit() and int(columna) > 0 and formato in FORMATOS_COLUMNA:
+            formatos[int(columna) - 1] = formato
+    return formatos
+
+
+def _numeros(valores, textos):
+    """
+    Valores numéricos de una columna (NaN si no es un número). Los números y textos simples
+    se convierten de una vez con pd.to_numeric; solo los textos restantes se limpian de "$" y ",".
+    """
+    import numpy as np
+    import pandas as pd
+
+    serie = pd.Series(valores, dtype=object)
+    numeros = pd.to_numeric(serie, errors="coerce").to_numpy(dtype=float, copy=True)
+    numeros[(serie.map(type) == bool).to_numpy()] = np.nan  # VERDADERO/FALSO no son montos
+    pendientes = np.isnan(numeros) & (textos != "")
+    if pendientes.any():
+        limpios = textos[pendientes].astype(str)
+        limpios = np.char.strip(np.char.replace(np.char.replace(limpios, "$", ""), ",", ""))
+        numeros[pendientes] = pd.to_numeric(limpios, errors="coerce")
+    numeros[~np.isfinite(numeros)] = np.nan
+    return numeros
+
+
+def formatear_columna(valores, textos, formato):
+    """
+    Aplica un formato a una columna completa (arreglos de NumPy con los valores originales de
+    Excel y sus textos). Devuelve los textos nuevos; lo que no se puede convertir queda igual.
+    """
+    import numpy as np
+    import pandas as pd
+
+    resultado = textos.copy()
+    if formato == "fecha":
+        es_fecha = np.fromiter((isinstance(v, TIPOS_FECHA) for v in valores), dtype=bool, count=len(valores))
+        if es_fecha.any():
+            fechas = pd.to_datetime(pd.Series(valores[es_fecha], dtype=object), errors="coerce")
+            validas = fechas.notna().to_numpy()
+            indices = np.flatnonzero(es_fecha)[validas]
+            resultado[indices] = fechas[validas].dt.strftime(FORMATO_FECHA).to_numpy(dtype=object)
+        return resultado
+
+    numeros = _numeros(valores, textos)
+    validos = ~np.isnan(numeros)
+    if validos.any():
+        plantilla = {"dinero": "${:,.2f}", "porcentaje": "{:.2%}", "entero": "{:,.0f}"}[formato].format
+        resultado[validos] = list(map(plantilla, numeros[validos].tolist()))
+    return resultado
+
+
+def renderizar_valores(df, formatos=None, header_rows=1):
+    """
+    Convierte el DataFrame en el texto final de cada celda ("" para vacíos) y aplica el
+    formato de cada columna (dinero, porcentaje, entero o fecha) desde la fila `header_rows`,
+    por columnas completas con pandas/NumPy, para que cada celda se escriba una sola vez en
+    su forma final. `formatos` es {índice: formato} o una lista de columnas de dinero.
+    """
+    import numpy as np
+    import pandas as pd
+
+    valores = df.to_numpy(dtype=object)
+    textos = np.where(pd.isna(valores), "", valores).astype(str).astype(object)
+    if formatos and len(textos) > header_rows:
+        if not isinstance(formatos, dict):
+            formatos = {col_idx: "dinero" for col_idx in formatos}
+        for col_idx, formato in formatos.items():
+            if col_idx < textos.shape[1]:
+                textos[header_rows:, col_idx] = formatear_columna(
+                    valores[header_rows:, col_idx], textos[header_rows:, col_idx], formato)
+    return pd.DataFrame(textos, columns=df.columns, dtype=object)
 
 def main(doc_name, label, money_columns, header_rows):
     # Cargar documento
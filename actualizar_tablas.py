@@ -0,0 +1,199 @@
+"""
+Actualización de tablas desde la línea de comandos, sin interfaz gráfica (para cron o un
+servidor sin pantalla). Usa el mismo motor que la interfaz (batch_engine) sobre las
+configuraciones habilitadas de la base.
+
+    python actualizar_tablas.py                       # todas las habilitadas, incremental
+    python actualizar_tablas.py --report "Informe general" --workers 4
+    python actualizar_tablas.py --id 3 --id 7 --forzar
+    python actualizar_tablas.py --excel datos.xlsx --simular
+    python actualizar_tablas.py --report "Informe general" --vigilar
+
+Los mensajes del proceso van a stderr y al terminar se escribe en stdout un resumen JSON
+(o en `--resumen` si se indica). El código de salida es 0 si todo terminó bien, 1 si alguna
+configuración falló o no existe y 2 si los argumentos no son válidos.
+Con --vigilar (ver vigilancia.py) el proceso queda atento a los libros de Excel y escribe
+una línea JSON por cada actualización.
+PyQt5 no se importa, y python-docx, pandas y openpyxl solo al procesar (no con --simular).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+from config_store import usar_base_datos
+from functios_database import obtener_configuraciones
+
+CAMPOS_SIMULACION = ("id", "report", "excel_file", "sheet_name", "excel_range", "table_label")
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        description="Actualiza las tablas de Word de las configuraciones guardadas, sin interfaz gráfica.")
+    seleccion = parser.add_argument_group("selección (los filtros se combinan)")
+    seleccion.add_argument("--id", dest="ids", type=int, action="append", metavar="ID",
+                           help="Solo esta configuración (se puede repetir); las que no existan o estén "
+                                "deshabilitadas se informan en 'no_encontradas'.")
+    seleccion.add_argument("--report", help="Solo las configuraciones de este informe/proyecto.")
+    seleccion.add_argument("--excel", dest="excel_file", help="Solo las que leen este libro (ruta como se guardó).")
+    seleccion.add_argument("--word", dest="word_file", help="Solo las que usan este documento (ruta como se guardó).")
+    seleccion.add_argument("--incluir-deshabilitadas", action="store_true",
+                           help="Incluir también las configuraciones deshabilitadas.")
+
+    ejecucion = parser.add_argument_group("ejecución")
+    ejecucion.add_argument("--simular", action="store_true",
+                           help="Mostrar qué se actualizaría, por documento, sin leer ni escribir archivos.")
+    ejecucion.add_argument("--workers", type=int, default=1,
+                           help="Procesos en paralelo (0 = todos los núcleos). Por defecto 1.")
+    ejecucion.add_argument("--forzar", action="store_true",
+                           help="Regenerar aunque el rango no haya cambiado desde la última ejecución.")
+    ejecucion.add_argument("--completo", action="store_true",
+                           help="No usar los hashes guardados (ni actualizarlos): reescribir todas las tablas.")
+
+    vigilancia = parser.add_argument_group("vigilancia")
+    vigilancia.add_argument("--vigilar", action="store_true",
+                            help="Quedar atento a los libros de Excel y actualizar las tablas que dependen "
+                                 "del que cambie (hasta Ctrl+C). No admite --excel, --simular ni --workers.")
+    vigilancia.add_argument("--intervalo", type=float, default=2.0,
+                            help="Segundos entre revisiones de los libros. Por defecto 2.")
+    vigilancia.add_argument("--espera", type=float, default=3.0,
+                            help="Segundos que un libro debe quedar sin cambios antes de actualizar. Por defecto 3.")
+
+    salida = parser.add_argument_group("salida")
+    salida.add_argument("--db", help="Base de configuraciones (por defecto la de CONFIGURACIONES_DB o la junto al código).")
+    salida.add_argument("--resumen", help="Escribir el resumen JSON en este archivo en lugar de stdout.")
+    salida.add_argument("--reporte", help="Reporte de tiempos por etapa (.json o .csv), como en la interfaz.")
+    salida.add_argument("--perfil", help="Ejecutar bajo cProfile y guardar las estadísticas (.prof).")
+    return parser
+
+
+@contextmanager
+def salida_a_stderr():
+    """
+    Envía a stderr todo lo que se escriba en stdout dentro del bloque, también desde los
+    procesos de trabajo (se redirige el descriptor 1), para que stdout quede para el resumen.
+    Devuelve un archivo que sigue escribiendo en el stdout original.
+    """
+    sys.stdout.flush()
+    stdout_original = os.dup(1)
+    os.dup2(2, 1)
+    salida = os.fdopen(os.dup(stdout_original), "w", encoding="utf-8")
+    try:
+        yield salida
+    finally:
+        salida.close()
+        sys.stdout.flush()
+        os.dup2(stdout_original, 1)
+        os.close(stdout_original)
+
+
+def seleccionar(args):
+    """Configuraciones elegidas por los filtros, como tuplas (id, *CAMPOS)."""
+    return obtener_configuraciones(report=args.report, excel_file=args.excel_file, word_file=args.word_file,
+                                   ids=args.ids, habilitadas=None if args.incluir_deshabilitadas else True)
+
+
+def simular(configs):
+    """Plan de la ejecución: las configuraciones agrupadas por documento de destino."""
+    from batch_engine import agrupar_por_documento, ruta_destino
+
+    return [{
+        "documento": ruta_destino(grupo[0]),
+        "plantilla": grupo[0]["word_file"],
+        "configuraciones": [{campo: config[campo] for campo in CAMPOS_SIMULACION} for config in grupo],
+    } for grupo in agrupar_por_documento(configs)]
+
+
+def resumir(resultados, duracion_total):
+    """Totales y resultado de cada configuración (sin los tiempos por etapa, que van en --reporte)."""
+    from instrumentacion import totales_por_etapa
+
+    return {
+        "configuraciones": len(resultados),
+        "correctas": sum(1 for r in resultados if r["ok"]),
+        "con_error": sum(1 for r in resultados if not r["ok"]),
+        "actualizadas": sum(1 for r in resultados if r["ok"] and not r["omitida"]),
+        "sin_cambios": sum(1 for r in resultados if r["ok"] and r["omitida"]),
+        "celdas_escritas": sum(r["celdas_escritas"] for r in resultados),
+        "documentos": sorted({r["documento"] for r in resultados if r["documento"]}),
+        "duracion_total": round(duracion_total, 4),
+        "totales_por_etapa": {etapa: round(segundos, 4)
+                              for etapa, segundos in totales_por_etapa(resultados).items() if segundos},
+        "resultados": [{
+            "id": r["id"], "ok": r["ok"], "omitida": r["omitida"], "error": r["error"],
+            "documento": r["documento"], "celdas_escritas": r["celdas_escritas"],
+            "duracion": round(r["duracion"], 4),
+        } for r in resultados],
+    }
+
+
+def escribir_resumen(resumen, ruta=None):
+    texto = json.dumps(resumen, indent=2, ensure_ascii=False)
+    if ruta:
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            archivo.write(texto + "\n")
+    else:
+        print(texto)
+
+
+def vigilar(args):
+    """Ejecuta el modo de vigilancia con una línea JSON por actualización (en stdout o en --resumen)."""
+    from vigilancia import VigilanteLibros
+
+    with salida_a_stderr() as salida:
+        destino = open(args.resumen, "a", encoding="utf-8") if args.resumen else salida
+
+        def al_terminar(libros, resultados):
+            resumen = {"fecha": time.strftime("%Y-%m-%dT%H:%M:%S"), "libros": libros,
+                       **resumir(resultados, sum(r["duracion"] for r in resultados))}
+            destino.write(json.dumps(resumen, ensure_ascii=False) + "\n")
+            destino.flush()
+
+        try:
+            VigilanteLibros(report=args.report, word_file=args.word_file, ids=args.ids,
+                            intervalo=args.intervalo, espera=args.espera, forzar=args.forzar,
+                            reporte=args.reporte, al_terminar=al_terminar).ejecutar()
+        finally:
+            if args.resumen:
+                destino.close()
+    return 0
+
+
+def main(argv=None):
+    parser = crear_parser()
+    args = parser.parse_args(argv)
+    if args.workers < 0:
+        parser.error("--workers debe ser 0 (todos los núcleos) o un número positivo.")
+    if args.vigilar and (args.excel_file or args.simular or args.workers != 1 or args.completo or args.perfil):
+        parser.error("--vigilar no admite --excel, --simular, --workers, --completo ni --perfil.")
+    if args.db:
+        usar_base_datos(args.db)
+    if args.vigilar:
+        return vigilar(args)
+
+    configs = seleccionar(args)
+    no_encontradas = sorted(set(args.ids or ()) - {config[0] for config in configs})
+    resumen = {"simulacion": args.simular, "no_encontradas": no_encontradas}
+
+    if args.simular:
+        resumen["documentos"] = simular(configs)
+        resumen["configuraciones"] = len(configs)
+    else:
+        from batch_engine import procesar_lote
+
+        inicio = time.perf_counter()
+        with salida_a_stderr():
+            resultados = procesar_lote(configs, incremental=not args.completo, forzar=args.forzar,
+                                       workers=args.workers or None, reporte=args.reporte, perfil=args.perfil)
+        resumen.update(resumir(resultados, time.perf_counter() - inicio))
+
+    escribir_resumen(resumen, args.resumen)
+    if no_encontradas or resumen.get("con_error"):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,23 +1,17 @@
-import sqlite3
+"""
+Actualiza el esquema de la base de configuraciones a la última versión.
 
-DB_NAME = "configuraciones.db"
+Las migraciones viven en config_store.MIGRACIONES y se aplican solas al abrir la base
+desde la aplicación; este script solo sirve para hacerlo sin abrirla.
+Uso:
+    python aplicar_formate.py [ruta de la base]
+"""
+import sys
 
-conn = sqlite3.connect(DB_NAME)
-cursor = conn.cursor()
+from config_store import ConfigStore, MIGRACIONES, ruta_por_defecto
 
-# Agregar columna money_columns si no existe
-try:
-    cursor.execute("ALTER TABLE configuraciones_tablas ADD COLUMN money_columns TEXT")
-    print("Columna money_columns agregada.")
-except sqlite3.OperationalError:
-    print("La columna money_columns ya existe.")
-
-# Agregar columna header_rows si no existe
-try:
-    cursor.execute("ALTER TABLE configuraciones_tablas ADD COLUMN header_rows INTEGER")
-    print("Columna header_rows agregada.")
-except sqlite3.OperationalError:
-    print("La columna header_rows ya existe.")
-
-conn.commit()
-conn.close()
+ruta = sys.argv[1] if len(sys.argv) > 1 else ruta_por_defecto()
+store = ConfigStore(ruta)
+version = store.migrar()
+store.cerrar()
+print(f"Base {ruta} en la versión {version} del esquema ({len(MIGRACIONES)} migraciones).")
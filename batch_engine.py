@@ -0,0 +1,497 @@
+"""
+Motor de actualización por lotes.
+
+Agrupa las configuraciones de `configuraciones_tablas` por documento de destino para que
+cada .docx se abra una sola vez, reciba todas sus tablas (con el formato de columnas ya aplicado
+a los valores) en memoria
+y se guarde una sola vez al final. Los documentos independientes pueden procesarse en
+paralelo en un ProcessPoolExecutor (parámetro `workers` de procesar_lote). Los valores se
+escriben con el formato de la plantilla (update_table_cells con conservar_formato=True), así
+que no hace falta una pasada de formato después.
+
+python-docx, pandas y openpyxl (Functions_Backs, excel_cache) se importan al procesar, no al
+importar el módulo, para que la línea de comandos y la interfaz arranquen sin cargarlos; lo
+mismo el pool de procesos y la instrumentación, que solo se usan con workers > 1 o con
+reporte/perfil.
+"""
+import hashlib
+import os
+import time
+from contextlib import nullcontext
+
+from config_store import CAMPOS
+from functios_database import obtener_configuraciones, obtener_hashes, guardar_hashes
+
+CANCELADO = "Cancelado por el usuario"
+
+CAMPOS_CONFIG = ("id",) + CAMPOS
+
+
+def config_a_dict(config):
+    """Convierte una fila de `configuraciones_tablas` en un diccionario con nombre de campos."""
+    if isinstance(config, dict):
+        return config
+    return dict(zip(CAMPOS_CONFIG, config))
+
+
+def ruta_destino(config):
+    """Ruta donde se guarda el documento de una configuración (salida o el mismo Word)."""
+    return config["output_file"] or config["word_file"]
+
+
+def _clave_ruta(ruta):
+    return os.path.normcase(os.path.abspath(ruta))
+
+
+def agrupar_por_documento(configs):
+    """
+    Agrupa las configuraciones por archivo de destino, conservando el orden en que
+    aparece cada documento por primera vez y el orden de las configuraciones dentro de él.
+    """
+    grupos = {}
+    for config in configs:
+        config = config_a_dict(config)
+        grupos.setdefault(_clave_ruta(ruta_destino(config)), []).append(config)
+    return list(grupos.values())
+
+
+def _resultado(config, ok, error=None, duracion=0.0, **extra):
+    resultado = {
+        "id": config["id"],
+        "table_label": config["table_label"],
+        "ok": ok,
+        "error": error,
+        "duracion": duracion,
+        "omitida": False,
+        "cancelada": False,
+        "documento": None,
+        "etapas": {},
+        "celdas_escritas": 0,
+        "guardado": {},
+        "range_hash": None,
+        "table_hash": None,
+    }
+    resultado.update(extra)
+    return resultado
+
+
+def _firma_documento(ruta):
+    stat = os.stat(ruta)
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def _firma_o_none(ruta):
+    try:
+        return _firma_documento(ruta)
+    except OSError:
+        return None
+
+
+class DocumentosAbiertos:
+    """
+    Documentos ya abiertos (con su DocumentIndex) que se conservan entre ejecuciones del mismo
+    proceso, como en el modo de vigilancia: al volver a actualizar un documento no se lee ni
+    se indexa otra vez. Se reutiliza solo si el archivo de destino (y la plantilla, si es otro
+    archivo) siguen como quedaron tras la última ejecución; si alguien los modificó se vuelve
+    a abrir desde disco.
+    """
+
+    def __init__(self):
+        self._documentos = {}  # clave del destino -> (doc, indice, firmas)
+
+    def __len__(self):
+        return len(self._documentos)
+
+    @staticmethod
+    def _firmas(word_file, save_path):
+        plantilla = _firma_o_none(word_file) if _clave_ruta(word_file) != _clave_ruta(save_path) else None
+        return _firma_o_none(save_path), plantilla
+
+    def abrir(self, word_file, save_path):
+        """(doc, indice) del documento en memoria si sigue vigente, o recién abierto de `word_file`."""
+        guardado = self._documentos.get(_clave_ruta(save_path))
+        if guardado is not None:
+            doc, indice, firmas = guardado
+            if firmas[0] is not None and firmas == self._firmas(word_file, save_path):
+                return doc, indice
+        from docx import Document
+        from Functions_Backs import DocumentIndex
+
+        doc = Document(word_file)
+        return doc, DocumentIndex(doc)
+
+    def conservar(self, doc, indice, word_file, save_path):
+        """Registra el documento tal como quedó en disco (después de guardarlo o sin cambios)."""
+        self._documentos[_clave_ruta(save_path)] = (doc, indice, self._firmas(word_file, save_path))
+
+    def descartar(self, save_path):
+        self._documentos.pop(_clave_ruta(save_path), None)
+
+
+def hash_rango(config, excel_range, df_render, save_path):
+    """
+    Hash SHA-256 de todo lo que determina el contenido de la tabla: los valores ya
+    formateados del rango, los parámetros de la configuración y, si la plantilla es un
+    archivo distinto del destino, su fecha y tamaño (una plantilla nueva obliga a regenerar).
+    """
+    h = hashlib.sha256()
+    partes = [excel_range, config["table_label"], config["money_columns"], config["header_rows"],
+              _clave_ruta(config["word_file"]), _clave_ruta(save_path)]
+    if _clave_ruta(config["word_file"]) != _clave_ruta(save_path):
+        partes.append(_firma_documento(config["word_file"]))
+    h.update("\x1f".join("" if p is None else str(p) for p in partes).encode("utf-8"))
+    for fila in df_render.itertuples(index=False):
+        h.update(b"\x1e")
+        h.update("\x1f".join(fila).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _preparar(config, save_path, cache):
+    """
+    Lee el rango de Excel y devuelve los valores con el formato de columnas ya aplicado,
+    el hash del rango y el tiempo de cada etapa.
+    """
+    from Functions_Backs import read_excel_table, resolver_rango, parse_formato_columnas, renderizar_valores
+
+    etapas = {}
+    inicio = time.perf_counter()
+    excel_range = resolver_rango(config["excel_file"], config["sheet_name"], config["excel_range"], cache)
+    print(excel_range)
+    etapas["resolver_rango"] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    df = read_excel_table(config["excel_file"], config["sheet_name"], excel_range, cache)
+    etapas["read_excel_table"] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    formatos = parse_formato_columnas(config["money_columns"])
+    header_rows = int(config["header_rows"]) if config["header_rows"] else 1
+    df = renderizar_valores(df, formatos, header_rows)
+    etapas["renderizar_valores"] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    range_hash = hash_rango(config, excel_range, df, save_path)
+    etapas["hash"] = time.perf_counter() - inicio
+    return {
+        "df": df,
+        "header_rows": header_rows,
+        "range_hash": range_hash,
+        "etapas": etapas,
+    }
+
+
+def procesar_grupo(grupo, cache=None, hashes=None, forzar=False, progreso=None, cancelado=None, documentos=None):
+    """
+    Aplica todas las configuraciones de un mismo documento de destino:
+    lo abre una vez, actualiza cada tabla en memoria y lo guarda una vez.
+    Las hojas de Excel se leen a través de `cache` (WorkbookCache) si se proporciona.
+
+    Si se pasan `hashes` ({id: (range_hash, table_hash)} de la ejecución anterior) la
+    actualización es incremental: se omiten las configuraciones cuyo rango no cambió, solo se
+    reescriben las celdas distintas y el documento no se abre ni se guarda si no hay cambios.
+    Una tabla cuyo rango no cambió no se vuelve a escribir, tampoco si se editó a mano en el
+    documento (las ediciones a mano no se detectan); `forzar=True` ignora los hashes guardados
+    y regenera todas las tablas.
+
+    `progreso(resultado)` se llama cuando termina cada configuración y `cancelado()` se consulta
+    antes de cada una: si devuelve True las restantes se marcan como canceladas (lo ya aplicado
+    se guarda igualmente).
+    Con `documentos` (DocumentosAbiertos) el documento se toma de memoria si sigue vigente y
+    se conserva abierto para la siguiente ejecución.
+    Devuelve una lista de resultados (uno por configuración).
+    """
+    from docx import Document
+    from Functions_Backs import aplicar_tabla_en_documento, hash_tabla, DocumentIndex
+
+    word_file = grupo[0]["word_file"]
+    save_path = ruta_destino(grupo[0])
+    incremental = hashes is not None
+
+    for config in grupo[1:]:
+        if _clave_ruta(config["word_file"]) != _clave_ruta(word_file):
+            print(f"Advertencia: la configuración {config['id']} usa '{config['word_file']}' como plantilla, "
+                  f"pero se aplicará sobre '{word_file}' porque comparten el destino '{save_path}'.")
+
+    resultados = {}
+    preparadas = {}
+    duraciones = {}
+
+    def terminar(config, resultado):
+        resultado["documento"] = save_path
+        if config["id"] in preparadas:
+            resultado["etapas"] = {**preparadas[config["id"]]["etapas"], **resultado["etapas"]}
+        resultados[config["id"]] = resultado
+        if progreso is not None:
+            progreso(resultado)
+
+    for config in grupo:
+        if cancelado is not None and cancelado():
+            terminar(config, _resultado(config, False, CANCELADO, cancelada=True))
+            continue
+        inicio = time.perf_counter()
+        try:
+            print(f"Actualizando tabla ID {config['id']}...")
+            preparadas[config["id"]] = _preparar(config, save_path, cache)
+        except Exception as e:
+            print(f"Error al actualizar tabla ID {config['id']}: {e}")
+            terminar(config, _resultado(config, False, str(e), time.perf_counter() - inicio))
+        duraciones[config["id"]] = time.perf_counter() - inicio
+
+    # Configuraciones cuyo rango no cambió desde la última ejecución
+    sin_cambios = set()
+    if incremental and not forzar and os.path.exists(save_path):
+        sin_cambios = {id_ for id_, datos in preparadas.items()
+                       if hashes.get(id_, (None, None))[0] == datos["range_hash"]}
+    misma_ruta = _clave_ruta(word_file) == _clave_ruta(save_path)
+
+    if preparadas and set(preparadas) <= sin_cambios:
+        print(f"Sin cambios en {save_path}: no se abre el documento.")
+        for config in grupo:
+            if config["id"] in preparadas:
+                terminar(config, _resultado(
+                    config, True, duracion=duraciones[config["id"]], omitida=True,
+                    range_hash=preparadas[config["id"]]["range_hash"], table_hash=hashes[config["id"]][1]))
+        return [resultados[config["id"]] for config in grupo]
+
+    if preparadas:
+        inicio_apertura = time.perf_counter()
+        try:
+            if documentos is not None:
+                doc, indice = documentos.abrir(word_file, save_path)
+            else:
+                doc = Document(word_file)
+                indice = DocumentIndex(doc)
+        except Exception as e:
+            print(f"Error al abrir {word_file}: {e}")
+            for config in grupo:
+                if config["id"] in preparadas:
+                    terminar(config, _resultado(
+                        config, False, f"No se pudo abrir el documento: {e}",
+                        duraciones[config["id"]] + time.perf_counter() - inicio_apertura))
+            return [resultados[config["id"]] for config in grupo]
+
+        tiempo_apertura = time.perf_counter() - inicio_apertura
+        modificado = False
+        for config in grupo:
+            datos = preparadas.get(config["id"])
+            if datos is None:
+                continue
+            if cancelado is not None and cancelado():
+                terminar(config, _resultado(config, False, CANCELADO, duraciones[config["id"]], cancelada=True))
+                continue
+            inicio = time.perf_counter()
+            try:
+                if misma_ruta and config["id"] in sin_cambios:
+                    # El rango no cambió: la tabla se deja como está, igual que cuando no se abre
+                    # el documento (en un destino armado desde plantilla sí hay que volver a aplicarla)
+                    terminar(config, _resultado(
+                        config, True, duracion=duraciones[config["id"]], omitida=True,
+                        range_hash=datos["range_hash"], table_hash=hashes[config["id"]][1]))
+                    continue
+
+                estadisticas = {}
+                table = aplicar_tabla_en_documento(doc, datos["df"], config["table_label"], indice,
+                                                   solo_cambios=incremental, estadisticas=estadisticas,
+                                                   conservar_formato=True, header_rows=datos["header_rows"])
+                etapas = estadisticas.get("etapas", {})
+                if table is None:
+                    terminar(config, _resultado(
+                        config, False, "No se pudo actualizar la tabla (ver mensajes).",
+                        duraciones[config["id"]] + time.perf_counter() - inicio, etapas=etapas))
+                    continue
+                cambios = estadisticas["celdas_escritas"] > 0 or estadisticas["estructura_modificada"]
+
+                inicio_hash = time.perf_counter()
+                table_hash = hash_tabla(table)
+                etapas["hash"] = time.perf_counter() - inicio_hash
+
+                modificado = modificado or cambios or not misma_ruta
+                terminar(config, _resultado(
+                    config, True, duracion=duraciones[config["id"]] + time.perf_counter() - inicio,
+                    omitida=not cambios, range_hash=datos["range_hash"], table_hash=table_hash,
+                    celdas_escritas=estadisticas["celdas_escritas"], etapas=etapas))
+            except Exception as e:
+                print(f"Error al actualizar tabla ID {config['id']}: {e}")
+                terminar(config, _resultado(
+                    config, False, str(e), duraciones[config["id"]] + time.perf_counter() - inicio))
+
+        guardado = {"abrir_documento": tiempo_apertura}
+        en_disco = True  # el documento en memoria coincide con el archivo de destino
+        if modificado or not incremental:
+            try:
+                inicio_guardado = time.perf_counter()
+                doc.save(save_path)
+                guardado["doc_save"] = time.perf_counter() - inicio_guardado
+                guardado["bytes_guardados"] = os.path.getsize(save_path)
+                print(f"Documento guardado en {save_path}")
+            except Exception as e:
+                print(f"Error al guardar {save_path}: {e}")
+                en_disco = False
+                for resultado in resultados.values():
+                    if resultado["ok"]:
+                        resultado["ok"] = False
+                        resultado["error"] = f"No se pudo guardar el documento: {e}"
+        else:
+            print(f"Sin cambios en {save_path}: no se guarda el documento.")
+            # Una tabla que falló a medias pudo quedar modificada solo en memoria
+            en_disco = all(resultado["ok"] for resultado in resultados.values())
+
+        if documentos is not None:
+            if en_disco:
+                documentos.conservar(doc, indice, word_file, save_path)
+            else:
+                documentos.descartar(save_path)
+
+        # La apertura y el guardado son del documento: se registran en cada resultado del grupo
+        for resultado in resultados.values():
+            resultado["guardado"] = guardado
+
+    return [resultados[config["id"]] for config in grupo]
+
+
+def agrupar_en_tareas(grupos):
+    """
+    Une en una misma tarea los grupos que dependen entre sí: si el destino de un grupo es la
+    plantilla de otro, ambos deben ejecutarse en orden dentro del mismo proceso.
+    Devuelve listas de índices de `grupos`, cada una en el orden original.
+    """
+    padre = list(range(len(grupos)))
+
+    def raiz(i):
+        while padre[i] != i:
+            padre[i] = padre[padre[i]]
+            i = padre[i]
+        return i
+
+    por_destino = {_clave_ruta(ruta_destino(grupo[0])): i for i, grupo in enumerate(grupos)}
+    for i, grupo in enumerate(grupos):
+        for config in grupo:
+            j = por_destino.get(_clave_ruta(config["word_file"]))
+            if j is not None:
+                padre[raiz(i)] = raiz(j)
+
+    tareas = {}
+    for i in range(len(grupos)):
+        tareas.setdefault(raiz(i), []).append(i)
+    return list(tareas.values())
+
+
+def _procesar_tarea(grupos, hashes=None, forzar=False):
+    """Ejecuta en un proceso de trabajo una lista de grupos, con su propia caché de libros."""
+    from excel_cache import WorkbookCache
+
+    cache = WorkbookCache()
+    return [procesar_grupo(grupo, cache, hashes, forzar) for grupo in grupos]
+
+
+def _procesar_en_paralelo(grupos, workers, hashes, forzar, progreso=None, cancelado=None):
+    """
+    Reparte las tareas independientes en un ProcessPoolExecutor; devuelve los resultados por grupo.
+    El progreso se informa al terminar cada tarea y la cancelación descarta las tareas que aún
+    no empezaron (las que ya están en ejecución terminan normalmente).
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    resultados = [None] * len(grupos)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futuros = {}
+        for tarea in agrupar_en_tareas(grupos):
+            grupos_tarea = [grupos[i] for i in tarea]
+            hashes_tarea = None
+            if hashes is not None:
+                hashes_tarea = {c["id"]: hashes[c["id"]] for g in grupos_tarea for c in g if c["id"] in hashes}
+            futuros[executor.submit(_procesar_tarea, grupos_tarea, hashes_tarea, forzar)] = tarea
+
+        for futuro in as_completed(futuros):
+            tarea = futuros[futuro]
+            if futuro.cancelled():
+                for i in tarea:
+                    resultados[i] = [_resultado(config, False, CANCELADO, cancelada=True) for config in grupos[i]]
+            else:
+                try:
+                    for i, resultados_grupo in zip(tarea, futuro.result()):
+                        resultados[i] = resultados_grupo
+                except Exception as e:
+                    print(f"Error en el proceso de trabajo: {e}")
+                    for i in tarea:
+                        resultados[i] = [_resultado(config, False, f"Falló el proceso de trabajo: {e}")
+                                         for config in grupos[i]]
+            if progreso is not None:
+                for i in tarea:
+                    for resultado in resultados[i]:
+                        progreso(resultado)
+            if cancelado is not None and cancelado():
+                for pendiente in futuros:
+                    pendiente.cancel()
+    return resultados
+
+
+def procesar_lote(configs, cache=None, incremental=False, forzar=False, workers=1, progreso=None, cancelado=None,
+                  reporte=None, perfil=None, documentos=None):
+    """
+    Procesa todas las configuraciones agrupadas por documento. Devuelve los resultados en orden.
+    Cada libro de Excel se lee una sola vez durante el lote (se crea una WorkbookCache si no se pasa una).
+    Con `incremental=True` se usan y actualizan los hashes guardados en `configuraciones_tablas`
+    para omitir lo que no cambió desde la ejecución anterior.
+    Con `workers` > 1 (o None para usar todos los núcleos) los documentos independientes se
+    procesan en paralelo en procesos separados; las configuraciones que escriben el mismo
+    archivo siempre se ejecutan en orden dentro del mismo proceso.
+    `progreso` y `cancelado` son los de procesar_grupo (en paralelo se aplican por tarea).
+    `documentos` (DocumentosAbiertos) reutiliza los documentos abiertos en ejecuciones anteriores;
+    solo se usa sin paralelismo, porque los documentos viven en este proceso.
+
+    Cada resultado incluye el tiempo por etapa ('etapas') y las celdas escritas. Si se indica
+    `reporte` (ruta .json o .csv) se guarda el reporte de la ejecución y se imprime la tabla
+    resumen; si se indica `perfil` (ruta .prof) el lote se ejecuta bajo cProfile.
+    """
+    grupos = agrupar_por_documento(configs)
+    hashes = obtener_hashes([config["id"] for grupo in grupos for config in grupo]) if incremental else None
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(grupos))
+
+    if perfil:
+        from instrumentacion import perfilar
+    inicio = time.perf_counter()
+    with (perfilar(perfil) if perfil else nullcontext()):
+        if workers > 1:
+            por_grupo = _procesar_en_paralelo(grupos, workers, hashes, forzar, progreso, cancelado)
+        else:
+            if cache is None:
+                from excel_cache import WorkbookCache
+                cache = WorkbookCache()
+            por_grupo = [procesar_grupo(grupo, cache, hashes, forzar, progreso, cancelado, documentos)
+                         for grupo in grupos]
+    duracion_total = time.perf_counter() - inicio
+    resultados = [resultado for resultados_grupo in por_grupo for resultado in resultados_grupo]
+
+    for resultado in resultados:
+        if resultado["ok"]:
+            if resultado["omitida"]:
+                print(f"Tabla ID {resultado['id']} sin cambios.")
+            else:
+                print(f"Tabla ID {resultado['id']} actualizada correctamente.")
+
+    if incremental:
+        guardar_hashes([(r["id"], r["range_hash"], r["table_hash"]) for r in resultados if r["ok"]])
+
+    if reporte:
+        from instrumentacion import escribir_reporte, tabla_resumen
+
+        escribir_reporte(resultados, reporte, duracion_total)
+        print(tabla_resumen(resultados))
+        print(f"Reporte guardado en {reporte}")
+    return resultados
+
+
+def procesar_guardadas(report=None, excel_file=None, word_file=None, ids=None, incremental=True, **opciones):
+    """
+    Procesa las configuraciones habilitadas de la base, solo las de un informe/proyecto
+    (`report`), las que leen un libro (`excel_file`), las que escriben en un documento
+    (`word_file`) o las de `ids` si se indican; los filtros se resuelven con los índices de la tabla, así que
+    la ejecución crece con lo que se regenera y no con toda la base. Las rutas se comparan
+    tal como se guardaron. El resto de las opciones son las de procesar_lote.
+    """
+    configs = obtener_configuraciones(report=report, excel_file=excel_file, word_file=word_file, ids=ids,
+                                      habilitadas=True)
+    return procesar_lote(configs, incremental=incremental, **opciones)
@@ -0,0 +1,124 @@
+"""
+Benchmark del tiempo de importación (arranque) de los módulos del proyecto.
+
+Cada módulo se importa en un intérprete nuevo con `python -X importtime` y se toma el mejor
+tiempo acumulado de varias repeticiones. También se indica qué dependencias pesadas
+(pandas, numpy, openpyxl, python-docx, PyQt5) cargó cada importación, para detectar
+cuando alguna vuelve a importarse al inicio en lugar de al primer uso:
+
+    python benchmarks/bench_arranque.py --salida arranque.json
+    python benchmarks/bench_arranque.py --salida nuevo.json --comparar arranque.json
+
+La interfaz (update_Tables_New) necesita PyQt5; si no está instalado se informa y se sigue.
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULOS = ["config_store", "batch_engine", "actualizar_tablas", "vigilancia", "functions_back",
+           "Functions_Backs", "excel_formato", "update_Tables_New"]
+PESADOS = ["pandas", "numpy", "openpyxl", "docx", "PyQt5"]
+LINEA = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def importar(modulo):
+    """
+    Importa `modulo` en un intérprete nuevo. Devuelve (milisegundos acumulados del módulo,
+    {dependencia pesada: milisegundos}) o lanza RuntimeError si la importación falla.
+    """
+    proceso = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+                             cwd=RAIZ, capture_output=True, text=True)
+    if proceso.returncode != 0:
+        raise RuntimeError(proceso.stderr.strip().splitlines()[-1])
+
+    total = None
+    pesados = {}
+    for linea in proceso.stderr.splitlines():
+        coincidencia = LINEA.match(linea)
+        if not coincidencia:
+            continue
+        acumulado, sangria, nombre = int(coincidencia.group(2)) / 1000, coincidencia.group(3), coincidencia.group(4)
+        if nombre in PESADOS:
+            pesados[nombre] = acumulado
+        if nombre == modulo and not sangria:
+            total = acumulado
+    return total, pesados
+
+
+def medir(modulo, repeticiones):
+    mejor, pesados = float("inf"), {}
+    for _ in range(repeticiones):
+        total, pesados_corrida = importar(modulo)
+        if total < mejor:
+            mejor, pesados = total, pesados_corrida
+    return mejor, pesados
+
+
+def commit_actual():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(actual, base):
+    """Imprime la relación de tiempos entre dos corridas para los módulos que coinciden."""
+    indice_base = {r["modulo"]: r["ms"] for r in base["resultados"] if r.get("ms") is not None}
+    print(f"\nComparación con {base.get('commit')} ({base.get('fecha')}):")
+    print(f"{'módulo':<20} {'base (ms)':>10} {'actual (ms)':>12} {'cambio':>8}")
+    for r in actual["resultados"]:
+        anterior = indice_base.get(r["modulo"])
+        if anterior is None or r.get("ms") is None:
+            continue
+        cambio = f"{anterior / r['ms']:.2f}x" if r["ms"] else "-"
+        print(f"{r['modulo']:<20} {anterior:>10.1f} {r['ms']:>12.1f} {cambio:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modulos", nargs="+", default=MODULOS, help="módulos a importar")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--salida", default="arranque.json", help="archivo JSON de resultados")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior para comparar")
+    args = parser.parse_args()
+
+    resultados = []
+    print(f"{'módulo':<20} {'ms':>8}  dependencias pesadas cargadas")
+    for modulo in args.modulos:
+        try:
+            ms, pesados = medir(modulo, args.repeticiones)
+        except RuntimeError as e:
+            print(f"{modulo:<20} {'-':>8}  no se pudo importar: {e}")
+            resultados.append({"modulo": modulo, "ms": None, "error": str(e)})
+            continue
+        detalle = ", ".join(f"{nombre} ({tiempo:.0f} ms)" for nombre, tiempo in pesados.items()) or "ninguna"
+        print(f"{modulo:<20} {ms:>8.1f}  {detalle}")
+        resultados.append({"modulo": modulo, "ms": ms, "pesados": pesados})
+
+    corrida = {
+        "commit": commit_actual(),
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "repeticiones": args.repeticiones,
+        "resultados": resultados,
+    }
+    with open(args.salida, "w", encoding="utf-8") as archivo:
+        json.dump(corrida, archivo, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as archivo:
+            comparar(corrida, json.load(archivo))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark de create_table22: plantillas XML por formato vs. formato aplicado celda por celda.
+
+Genera una cuadrícula sintética como la que devuelve get_sheet_data2 (por defecto 200 x 10 =
+2.000 celdas con ~10 formatos distintos), construye la tabla con ambas implementaciones,
+verifica que cada celda tenga el mismo texto y las mismas propiedades (tcPr, pPr y rPr)
+y compara el tiempo y el tamaño del XML generado.
+
+Uso:
+    python benchmarks/bench_create_table22.py [--filas 200] [--columnas 10] [--formatos 10]
+"""
+import argparse
+import os
+import sys
+import time
+from copy import deepcopy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+from docx.enum.table import WD_TABLE_ALIGNMENT
+from docx.oxml.ns import qn
+from docx.oxml.shared import OxmlElement
+from docx.shared import Pt
+from lxml import etree
+
+from functions_back import (
+    create_table22, apply_cell_formatting, get_default_format, hex_to_rgb, map_alineacion
+)
+
+
+def generar_grilla(filas, columnas, formatos):
+    estilos = []
+    for k in range(formatos):
+        estilo = get_default_format()
+        estilo['font']['bold'] = k % 2 == 0
+        estilo['font']['size'] = 9 + k % 4
+        estilo['font']['color'] = f"#{(k * 40) % 256:02x}0000"
+        estilo['background'] = f"#ff{(k * 25) % 256:02x}{(k * 60) % 256:02x}"
+        estilo['alignment']['horizontal'] = ('LEFT', 'CENTER', 'RIGHT')[k % 3]
+        for lado in estilo['borders']:
+            estilo['borders'][lado]['style'] = 'SOLID' if k % 3 else 'NONE'
+        estilos.append(estilo)
+
+    grilla = []
+    for i in range(filas):
+        fila = []
+        for j in range(columnas):
+            celda = deepcopy(estilos[0 if i == 0 else 1 + (i + j) % (formatos - 1)])
+            celda['value'] = f"Encabezado {j}" if i == 0 else f"{i * j * 1.5:,.2f}"
+            fila.append(celda)
+        grilla.append(fila)
+    return grilla
+
+
+def create_table22_anterior(table, num_cols, document):
+    """Implementación anterior: doc_table.cell(i, j) y formato construido en cada celda."""
+    doc_table = document.add_table(rows=len(table), cols=num_cols)
+    doc_table.style = 'Table Grid'
+    doc_table.alignment = WD_TABLE_ALIGNMENT.LEFT
+    tblLayout = OxmlElement('w:tblLayout')
+    tblLayout.set(qn('w:type'), 'fixed')
+    doc_table._tbl.tblPr.append(tblLayout)
+    for i, fila in enumerate(table):
+        for j, cell_data in enumerate(fila):
+            cell = doc_table.cell(i, j)
+            cell.text = ""
+            apply_cell_formatting(cell, cell_data)
+            p = cell.paragraphs[0]
+            run = p.add_run(cell_data['value'])
+            run.font.bold = cell_data['font']['bold']
+            run.font.size = Pt(cell_data['font']['size'])
+            run.font.color.rgb = hex_to_rgb(cell_data['font']['color'])
+            run.font.name = cell_data['font']['name']
+            p.alignment = map_alineacion(cell_data['alignment']['horizontal'])
+    return doc_table
+
+
+def firma_celda(tc):
+    """Texto y propiedades de la celda, ignorando runs vacíos."""
+    p = tc.p_lst[0]
+    runs = [r for r in p.r_lst if r.text]
+    return (
+        etree.tostring(tc.tcPr),
+        etree.tostring(p.pPr) if p.pPr is not None else None,
+        "".join(r.text for r in runs),
+        tuple(etree.tostring(r.rPr) for r in runs),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, default=200)
+    parser.add_argument("--columnas", type=int, default=10)
+    parser.add_argument("--formatos", type=int, default=10)
+    args = parser.parse_args()
+
+    grilla = generar_grilla(args.filas, args.columnas, args.formatos)
+
+    doc_nuevo = Document()
+    inicio = time.perf_counter()
+    tabla_nueva = create_table22(grilla, args.columnas, doc_nuevo)
+    nuevo = time.perf_counter() - inicio
+
+    doc_anterior = Document()
+    inicio = time.perf_counter()
+    tabla_anterior = create_table22_anterior(grilla, args.columnas, doc_anterior)
+    anterior = time.perf_counter() - inicio
+
+    celdas_nuevas = [tc for tr in tabla_nueva._tbl.tr_lst for tc in tr.tc_lst]
+    celdas_anteriores = [tc for tr in tabla_anterior._tbl.tr_lst for tc in tr.tc_lst]
+    equivalente = [firma_celda(tc) for tc in celdas_nuevas] == [firma_celda(tc) for tc in celdas_anteriores]
+
+    print(f"Tabla {args.filas} x {args.columnas} ({args.filas * args.columnas} celdas, {args.formatos} formatos)")
+    print(f"  plantillas por formato : {nuevo:.4f} s, {len(etree.tostring(tabla_nueva._tbl)):,} bytes de XML")
+    print(f"  celda por celda        : {anterior:.4f} s, {len(etree.tostring(tabla_anterior._tbl)):,} bytes de XML")
+    print(f"  mejora                 : {anterior / nuevo:.1f}x")
+    print(f"  celdas equivalentes    : {equivalente}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark de la tabla con formato desde un .xlsx local: obtener_rango_excel + create_table22
+(una pasada, con el formato del libro) vs. el camino que usa el motor por lotes:
+read_excel_table + renderizar_valores + update_table_cells(conservar_formato=True) +
+aplicar_formato (fuente, bordes y formato de columnas de la configuración, no los del libro).
+
+El libro sintético tiene encabezado con relleno y negrita, bordes finos y columnas con
+formato de moneda, porcentaje y fecha.
+
+Uso:
+    python benchmarks/bench_excel_formato.py [--filas 200] [--columnas 6]
+"""
+import argparse
+import datetime
+import io
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+from openpyxl import Workbook
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+from openpyxl.utils import get_column_letter
+
+from excel_formato import obtener_rango_excel
+from functions_back import create_table22
+from formato_tabla import EspecificacionTabla, aplicar_formato
+from Functions_Backs import read_excel_table, renderizar_valores, update_table_cells
+
+HOJA = "DATOS"
+FORMATOS = ('"$"#,##0.00', '0.0%', 'dd/mm/yyyy', '#,##0;(#,##0)')
+# Formato de columna de la configuración equivalente a cada formato del libro
+FORMATOS_CONFIG = ('dinero', 'porcentaje', 'fecha', 'entero')
+
+
+def generar_libro_con_formato(ruta, filas, columnas):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = HOJA
+    ws.append(["Concepto"] + [f"Columna {c}" for c in range(1, columnas)])
+    for c in ws[1]:
+        c.font = Font(bold=True, color="FFFFFF", name="Arial", size=10)
+        c.fill = PatternFill("solid", fgColor="1F4E78")
+        c.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+    fino = Side(style="thin", color="000000")
+    borde = Border(top=fino, bottom=fino, left=fino, right=fino)
+    for r in range(1, filas):
+        valores = [f"Beneficiario {r}"]
+        for c in range(1, columnas):
+            formato = FORMATOS[(c - 1) % len(FORMATOS)]
+            if formato == 'dd/mm/yyyy':
+                valores.append(datetime.date(2025, 1, 1) + datetime.timedelta(days=r))
+            elif formato == '0.0%':
+                valores.append(r % 100 / 100)
+            else:
+                valores.append(round((r * c * 1.37) * (-1 if r % 7 == 0 else 1), 2))
+        ws.append(valores)
+        for c, cell in enumerate(ws[r + 1]):
+            cell.border = borde
+            if c:
+                cell.number_format = FORMATOS[(c - 1) % len(FORMATOS)]
+    wb.save(ruta)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, default=200)
+    parser.add_argument("--columnas", type=int, default=6)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, "libro.xlsx")
+        generar_libro_con_formato(ruta, args.filas, args.columnas)
+        rango = f"A1:{get_column_letter(args.columnas)}{args.filas}"
+
+        inicio = time.perf_counter()
+        grilla, num_cols = obtener_rango_excel(ruta, HOJA, rango)
+        leido = time.perf_counter() - inicio
+        create_table22(grilla, num_cols, Document())
+        nuevo = time.perf_counter() - inicio
+
+        formatos = {c: FORMATOS_CONFIG[(c - 1) % len(FORMATOS_CONFIG)] for c in range(1, args.columnas)}
+        especificacion = EspecificacionTabla("Arial", 10, formatos=formatos)
+        renderizar_valores(read_excel_table(ruta, HOJA, "A1:B2"), formatos)  # importa pandas fuera del tiempo
+        tabla = Document().add_table(rows=args.filas, cols=args.columnas)
+
+        with redirect_stdout(io.StringIO()):
+            inicio = time.perf_counter()
+            df = renderizar_valores(read_excel_table(ruta, HOJA, rango), formatos)
+            update_table_cells(tabla, df, conservar_formato=True)
+            aplicar_formato(tabla, especificacion)
+            anterior = time.perf_counter() - inicio
+
+    print(f"Rango {rango} ({args.filas * args.columnas} celdas, {len(grilla.formatos)} formatos distintos)")
+    print(f"  obtener_rango_excel + create_table22                   : {nuevo:.4f} s (lectura con formato {leido:.4f} s)")
+    print(f"  read_excel_table + update_table_cells + aplicar_formato: {anterior:.4f} s, sin formato del libro")
+    print(f"  primera fila de datos: {grilla.valores[1]}")
+
+
+if __name__ == "__main__":
+    main()
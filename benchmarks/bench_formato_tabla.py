@@ -0,0 +1,103 @@
+"""
+Benchmark del formato de tablas: aplicar_formato (una pasada por el XML con una
+EspecificacionTabla) vs. los cuatro recorridos anteriores con objetos de python-docx
+(formatear_tabla por run, aplicar_bordes_a_tabla, format_table_money_columns celda por celda
+y obtener_formato_tabla), reproducidos aquí tal como eran.
+
+Se comprueba además que el texto final de las dos tablas es el mismo.
+
+Uso:
+    python benchmarks/bench_formato_tabla.py [--filas 500] [--columnas 8]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+from docx.shared import Pt
+from lxml import etree
+
+from formato_tabla import EspecificacionTabla, aplicar_formato
+from Functions_Backs import formatear_dinero
+
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+def crear_tabla(filas, columnas):
+    doc = Document()
+    doc.add_paragraph("1. TABLA")
+    tabla = doc.add_table(rows=filas + 1, cols=columnas)
+    tabla.cell(0, 0).merge(tabla.cell(0, columnas - 1)).text = "TÍTULO"
+    tbl = tabla._tbl
+    for i, tr in enumerate(tbl.tr_lst[1:], start=1):
+        for j, tc in enumerate(tr.tc_lst):
+            tc.p_lst[0].add_r().text = f"Beneficiario {i}" if j == 0 else str(round(i * j * 1.37, 2))
+    return tabla
+
+
+def recorridos_anteriores(tabla, money_cols, header_rows):
+    for fila in tabla.rows:
+        for celda in fila.cells:
+            for parrafo in celda.paragraphs:
+                for run in parrafo.runs:
+                    run.font.name = 'Arial'
+                    run.font.size = Pt(10)
+
+    tbl_pr = tabla._tbl.tblPr
+    tbl_borders = etree.SubElement(tbl_pr, W + 'tblBorders')
+    for borde in ['top', 'left', 'bottom', 'right', 'insideH', 'insideV']:
+        elemento = etree.SubElement(tbl_borders, W + borde)
+        elemento.set('val', 'single')
+        elemento.set('sz', '4')
+        elemento.set('space', '0')
+        elemento.set('color', '000000')
+
+    for row in tabla.rows[header_rows:]:
+        for col_idx in money_cols:
+            cell = row.cells[col_idx]
+            monto = formatear_dinero(cell.text)
+            if monto is not None and monto != cell.text:
+                cell.text = monto
+
+    for fila in tabla.rows:
+        for celda in fila.cells:
+            for parrafo in celda.paragraphs:
+                for run in parrafo.runs:
+                    if run.font.name or run.font.size:
+                        return run.font.name, run.font.size.pt if run.font.size else None
+
+
+def textos(tabla):
+    return [tc.xpath('string(.)') for tc in tabla._tbl.iter(W + 'tc')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, default=500)
+    parser.add_argument("--columnas", type=int, default=8)
+    args = parser.parse_args()
+    money_cols = list(range(1, args.columnas, 2))
+
+    anterior = crear_tabla(args.filas, args.columnas)
+    inicio = time.perf_counter()
+    recorridos_anteriores(anterior, money_cols, 1)
+    tiempo_anterior = time.perf_counter() - inicio
+
+    especificacion = EspecificacionTabla("Arial", 10, formatos={c: "dinero" for c in money_cols}, header_rows=1)
+    aplicar_formato(crear_tabla(2, args.columnas), especificacion)  # importa pandas fuera del tiempo
+    nueva = crear_tabla(args.filas, args.columnas)
+    inicio = time.perf_counter()
+    aplicar_formato(nueva, especificacion)
+    tiempo_nuevo = time.perf_counter() - inicio
+
+    print(f"Tabla de {args.filas} x {args.columnas}, dinero en las columnas {money_cols}:")
+    print(f"  cuatro recorridos con python-docx: {tiempo_anterior:.4f} s")
+    print(f"  aplicar_formato (una pasada):      {tiempo_nuevo:.4f} s  ({tiempo_anterior / tiempo_nuevo:.1f}x)")
+    print(f"  mismo texto: {textos(anterior) == textos(nueva)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark de la grilla compacta de Sheets: lista de diccionarios por celda (grilla_desde_api)
+vs. GrillaCompacta (grilla_compacta_desde_api), con un rowData sintético como el de la API.
+
+Mide la memoria retenida (tracemalloc) y el tiempo de conversión, comprueba que
+a_tabla() reproduce exactamente la tabla de diccionarios y que create_table22 genera el
+mismo XML con ambas formas.
+
+Uso:
+    python benchmarks/bench_grilla_compacta.py [--filas 2000] [--columnas 10]
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+from lxml import etree
+
+from bench_sheets_batch import FakeSheetsService
+from functions_back import GrillaCompacta, create_table22, grilla_compacta_desde_api, grilla_desde_api
+
+
+def medir(funcion, *args):
+    """(resultado, segundos, bytes retenidos por el resultado). El tiempo se mide sin tracemalloc."""
+    inicio = time.perf_counter()
+    funcion(*args)
+    segundos = time.perf_counter() - inicio
+    gc.collect()
+    tracemalloc.start()
+    resultado = funcion(*args)
+    retenidos = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return resultado, segundos, retenidos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, default=2000)
+    parser.add_argument("--columnas", type=int, default=10)
+    args = parser.parse_args()
+
+    servicio = FakeSheetsService()
+    # La última columna de cada fila falta, como cuando la API omite celdas vacías al final
+    row_data = [{'values': [servicio._celda(f, c) for c in range(args.columnas - 1)]}
+                for f in range(args.filas)]
+
+    tabla, t_tabla, m_tabla = medir(grilla_desde_api, row_data, args.columnas)
+    grilla, t_grilla, m_grilla = medir(grilla_compacta_desde_api, row_data, args.columnas)
+    assert grilla.a_tabla() == tabla, "a_tabla() no reproduce grilla_desde_api"
+    assert GrillaCompacta.desde_tabla(tabla, args.columnas).a_tabla() == tabla
+
+    filas_xml = min(args.filas, 300)
+    doc_tabla, doc_grilla = Document(), Document()
+    inicio = time.perf_counter()
+    create_table22(tabla[:filas_xml], args.columnas, doc_tabla)
+    t_doc_tabla = time.perf_counter() - inicio
+    parcial = GrillaCompacta(args.columnas)
+    for valores, ids in zip(grilla.valores[:filas_xml], grilla.ids[:filas_xml]):
+        parcial.agregar_fila(valores, [parcial.id_formato(grilla.formatos[i]) for i in ids])
+    inicio = time.perf_counter()
+    create_table22(parcial, args.columnas, doc_grilla)
+    t_doc_grilla = time.perf_counter() - inicio
+    igual = etree.tostring(doc_tabla.element.body) == etree.tostring(doc_grilla.element.body)
+
+    celdas = args.filas * args.columnas
+    print(f"Rango {args.filas} x {args.columnas} ({celdas} celdas, {len(grilla.formatos)} formatos distintos)")
+    print(f"  diccionario por celda : {t_tabla:.4f} s, {m_tabla / 1024:,.0f} KiB")
+    print(f"  grilla compacta       : {t_grilla:.4f} s, {m_grilla / 1024:,.0f} KiB")
+    print(f"  memoria               : {m_tabla / m_grilla:.1f}x menos")
+    print(f"  create_table22 ({filas_xml} filas): {t_doc_tabla:.4f} s con diccionarios, "
+          f"{t_doc_grilla:.4f} s con grilla compacta")
+    print(f"  mismo XML             : {igual}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark de read_excel_table: lectura acotada al rango vs. lectura completa con pandas.
+
+Genera libros sintéticos de distinto tamaño y mide el tiempo de leer siempre el mismo
+rango pequeño (B2:L14). La lectura acotada debe mantenerse casi constante aunque la hoja crezca.
+
+Uso:
+    python benchmarks/bench_read_excel_table.py [--filas 1000 10000 50000] [--repeticiones 3]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from openpyxl import Workbook
+
+from Functions_Backs import read_excel_table
+
+
+def generar_libro(ruta, filas, columnas=12):
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("DATOS")
+    ws.append([f"COL{c}" for c in range(1, columnas + 1)])
+    for r in range(2, filas + 2):
+        ws.append([r] + [f"texto {r}-{c}" if c % 2 else r * c * 1.5 for c in range(1, columnas)])
+    wb.save(ruta)
+
+
+def lectura_completa_pandas(excel_path, sheet_name, excel_range):
+    """Implementación anterior: lee la hoja completa y descarta filas con iloc."""
+    import re
+    col_start, row_start, col_end, row_end = re.match(r'([A-Z]+)(\d+):([A-Z]+)(\d+)', excel_range).groups()
+    df = pd.read_excel(excel_path, sheet_name=sheet_name, usecols=f"{col_start}:{col_end}")
+    return df.iloc[int(row_start) - 2:int(row_end) - 1].reset_index(drop=True)
+
+
+def medir(funcion, repeticiones):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--rango", default="B2:L14")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'filas':>8} | {'acotada (s)':>12} | {'pandas (s)':>11} | {'mejora':>7}")
+    with tempfile.TemporaryDirectory() as carpeta:
+        for filas in args.filas:
+            ruta = os.path.join(carpeta, f"libro_{filas}.xlsx")
+            generar_libro(ruta, filas)
+
+            acotada = medir(lambda: read_excel_table(ruta, "DATOS", args.rango), args.repeticiones)
+            completa = medir(lambda: lectura_completa_pandas(ruta, "DATOS", args.rango), args.repeticiones)
+            assert read_excel_table(ruta, "DATOS", args.rango).shape == \
+                lectura_completa_pandas(ruta, "DATOS", args.rango).shape
+            print(f"{filas:>8} | {acotada:>12.4f} | {completa:>11.4f} | {completa / acotada:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
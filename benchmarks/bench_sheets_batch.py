@@ -0,0 +1,56 @@
+"""
+Benchmark de obtener_rangos_sheets contra un servicio de Sheets falso (sin red, ver
+tests/fake_sheets.py): un get por rango vs. una petición por libro vs. la caché en disco.
+Las verificaciones (una sola petición, caché por revisión) están en tests/test_sheets_batch.py.
+
+Uso:
+    python benchmarks/bench_sheets_batch.py [--rangos 10] [--latencia 0.3]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from functions_back import get_sheet_data2, obtener_rangos_sheets, obtener_revision
+from tests.fake_sheets import FakeDriveService, FakeSheetsService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rangos", type=int, default=10)
+    parser.add_argument("--latencia", type=float, default=0.3, help="segundos simulados por petición")
+    args = parser.parse_args()
+
+    rangos = [("DATOS" if k % 2 else "Resumen 2025", 2 + 20 * k, 16 + 20 * k, 2, 8) for k in range(args.rangos)]
+
+    sheets = FakeSheetsService(args.latencia)
+    inicio = time.perf_counter()
+    individuales = [get_sheet_data2(sheets, "libro", *rango) for rango in rangos]
+    tiempo_individual = time.perf_counter() - inicio
+    peticiones_individual = len(sheets.peticiones)
+
+    drive = FakeDriveService("1")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        sheets = FakeSheetsService(args.latencia)
+        inicio = time.perf_counter()
+        lote = obtener_rangos_sheets(sheets, "libro", rangos, obtener_revision(drive, "libro"), cache_dir)
+        tiempo_lote = time.perf_counter() - inicio
+        peticiones_lote = len(sheets.peticiones)
+
+        inicio = time.perf_counter()
+        obtener_rangos_sheets(sheets, "libro", rangos, obtener_revision(drive, "libro"), cache_dir)
+        tiempo_cache = time.perf_counter() - inicio
+        peticiones_cache = len(sheets.peticiones) - peticiones_lote
+
+    print(f"{args.rangos} rangos, latencia simulada {args.latencia:.2f} s por petición")
+    print(f"  un get por rango      : {tiempo_individual:.3f} s, {peticiones_individual} peticiones")
+    print(f"  una petición por libro: {tiempo_lote:.3f} s, {peticiones_lote} peticiones")
+    print(f"  desde caché en disco  : {tiempo_cache:.3f} s, {peticiones_cache} peticiones")
+    print(f"  mismo resultado       : {lote == individuales}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+Suite de benchmarks del proceso Excel -> Word con datos sintéticos.
+
+Genera libros de 1k a 200k filas y plantillas .docx con 1 a 100 tablas etiquetadas (con
+filas de encabezado fusionadas) y mide:
+
+    read_excel_table      rango pequeño (50 filas) y rango completo
+    detectar_rango_tabla  desde B2 hasta el final del bloque
+    find_table_by_label   última etiqueta de la plantilla, con y sin DocumentIndex
+    update_table_cells    tabla de N filas recién creada
+    ajustar_tabla_word    de 10 a N filas
+    formatear_tabla       tabla de N filas
+    lote completo         procesar_lote (lo que ejecuta actualizar_todas_las_tablas) sobre
+                          todas las tablas de la plantilla, completo e incremental sin cambios
+
+Cada medición es el mejor tiempo de varias repeticiones. Los resultados se guardan en JSON
+junto con el commit actual para comparar corridas:
+
+    python benchmarks/bench_suite.py --salida base.json
+    python benchmarks/bench_suite.py --salida nuevo.json --comparar base.json
+
+Con --rapido se usan tamaños pequeños; con --datos CARPETA los archivos generados se
+conservan y se reutilizan en la siguiente corrida.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import pandas as pd
+from docx import Document
+
+import Functions_Backs
+from Functions_Backs import (
+    read_excel_table, detectar_rango_tabla, find_table_by_label, update_table_cells,
+    ajustar_tabla_word, formatear_tabla, DocumentIndex
+)
+from batch_engine import procesar_lote
+from config_store import usar_base_datos
+from datos_sinteticos import HOJA, COLUMNAS, etiqueta, generar_libro, generar_plantilla, en_carpeta
+
+FILAS = [1000, 10000, 50000, 200000]
+TABLAS = [1, 10, 100]
+FILAS_TABLA = [50, 500]
+RAPIDO = {"filas": [1000, 10000], "tablas": [1, 10], "filas_tabla": [50]}
+
+
+def medir(funcion, repeticiones, preparar=None):
+    """Mejor tiempo de `repeticiones` llamadas; `preparar()` crea el estado de cada llamada fuera del tiempo."""
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        with redirect_stdout(io.StringIO()):
+            argumentos = preparar() if preparar else ()
+            inicio = time.perf_counter()
+            funcion(*argumentos)
+            mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def commit_actual():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def tabla_con_datos(filas):
+    doc = Document()
+    doc.add_paragraph(etiqueta(0))
+    tabla = doc.add_table(rows=filas, cols=COLUMNAS)
+    tabla.cell(0, 0).merge(tabla.cell(0, COLUMNAS - 1))
+    return tabla
+
+
+def dataframe(filas):
+    return pd.DataFrame([[f"Beneficiario {r}"] + [r * c for c in range(2, COLUMNAS + 1)] for r in range(filas)],
+                        dtype=object)
+
+
+def bench_excel(carpeta, filas_lista, repeticiones, registrar):
+    for filas in filas_lista:
+        libro = en_carpeta(carpeta, f"libro_{filas}.xlsx", generar_libro, filas)
+        ultima_columna = chr(ord("B") + COLUMNAS - 1)
+        pequeño = f"B2:{ultima_columna}51"
+        completo = f"B2:{ultima_columna}{filas + 1}"
+        registrar("read_excel_table", {"filas_libro": filas, "rango": pequeño},
+                  medir(lambda: read_excel_table(libro, HOJA, pequeño), repeticiones))
+        registrar("read_excel_table", {"filas_libro": filas, "rango": completo},
+                  medir(lambda: read_excel_table(libro, HOJA, completo), repeticiones))
+        # Sin memoria de rangos detectados, para medir el recorrido de la hoja
+        registrar("detectar_rango_tabla", {"filas_libro": filas},
+                  medir(lambda: detectar_rango_tabla(libro, "B2", HOJA), repeticiones,
+                        preparar=lambda: Functions_Backs._rangos_detectados.clear() or ()))
+
+
+def bench_word(carpeta, tablas_lista, filas_tabla_lista, repeticiones, registrar):
+    for tablas in tablas_lista:
+        plantilla = en_carpeta(carpeta, f"plantilla_{tablas}.docx", generar_plantilla, tablas)
+        doc = Document(plantilla)
+        ultima = etiqueta(tablas - 1)
+        registrar("find_table_by_label", {"tablas": tablas, "indice": False},
+                  medir(lambda: find_table_by_label(doc, ultima), repeticiones))
+        indice = DocumentIndex(doc)
+        registrar("find_table_by_label", {"tablas": tablas, "indice": True},
+                  medir(lambda: find_table_by_label(doc, ultima, indice), repeticiones))
+
+    for filas in filas_tabla_lista:
+        df = dataframe(filas)
+        registrar("update_table_cells", {"filas": filas, "columnas": COLUMNAS},
+                  medir(update_table_cells, repeticiones, preparar=lambda: (tabla_con_datos(filas), df)))
+        registrar("ajustar_tabla_word", {"filas_inicio": 10, "filas": filas},
+                  medir(ajustar_tabla_word, repeticiones,
+                        preparar=lambda: (tabla_con_datos(10), filas, COLUMNAS)))
+
+        def tabla_llena():
+            tabla = tabla_con_datos(filas)
+            update_table_cells(tabla, df)
+            return (tabla,)
+        registrar("formatear_tabla", {"filas": filas, "columnas": COLUMNAS},
+                  medir(formatear_tabla, repeticiones, preparar=tabla_llena))
+
+
+def bench_lote(carpeta, tablas_lista, filas_tabla_lista, repeticiones, registrar):
+    """procesar_lote con la base de datos en una carpeta temporal (no toca configuraciones.db del proyecto)."""
+    for tablas in tablas_lista:
+        for filas in filas_tabla_lista:
+            libro = en_carpeta(carpeta, f"libro_{max(filas, 1000)}.xlsx", generar_libro, max(filas, 1000))
+            plantilla = en_carpeta(carpeta, f"plantilla_{tablas}.docx", generar_plantilla, tablas)
+            with tempfile.TemporaryDirectory() as trabajo:
+                salida = os.path.join(trabajo, "salida.docx")
+                ultima_columna = chr(ord("B") + COLUMNAS - 1)
+                configs = [(i + 1, libro, HOJA, f"B2:{ultima_columna}{filas + 1}", plantilla, etiqueta(i),
+                            salida, "2,3", 2) for i in range(tablas)]
+                store = usar_base_datos(os.path.join(trabajo, "configuraciones.db"))
+                try:
+                    registrar("procesar_lote", {"tablas": tablas, "filas": filas, "incremental": False},
+                              medir(lambda: procesar_lote(configs), repeticiones))
+
+                    # Segunda corrida sin cambios: se omite el documento completo
+                    with store.transaccion() as conn:
+                        conn.executemany("INSERT INTO configuraciones_tablas (id, excel_file, sheet_name, excel_range, "
+                                         "word_file, table_label, output_file, money_columns, header_rows) "
+                                         "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", configs)
+                    with redirect_stdout(io.StringIO()):
+                        procesar_lote(configs, incremental=True)
+                    registrar("procesar_lote", {"tablas": tablas, "filas": filas, "incremental": True},
+                              medir(lambda: procesar_lote(configs, incremental=True), repeticiones))
+                finally:
+                    store.cerrar()
+
+
+def comparar(actual, base):
+    """Imprime la relación de tiempos entre dos corridas para las mediciones que coinciden."""
+    indice_base = {(r["prueba"], json.dumps(r["parametros"], sort_keys=True)): r["segundos"]
+                   for r in base["resultados"]}
+    print(f"\nComparación con {base.get('commit')} ({base.get('fecha')}):")
+    print(f"{'prueba':<22} {'parámetros':<52} {'base (s)':>10} {'actual (s)':>10} {'cambio':>8}")
+    for r in actual["resultados"]:
+        anterior = indice_base.get((r["prueba"], json.dumps(r["parametros"], sort_keys=True)))
+        if anterior is None:
+            continue
+        cambio = f"{anterior / r['segundos']:.2f}x" if r["segundos"] else "-"
+        print(f"{r['prueba']:<22} {json.dumps(r['parametros'], ensure_ascii=False):<52} "
+              f"{anterior:>10.4f} {r['segundos']:>10.4f} {cambio:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, nargs="+", default=FILAS, help="filas de los libros sintéticos")
+    parser.add_argument("--tablas", type=int, nargs="+", default=TABLAS, help="tablas por plantilla")
+    parser.add_argument("--filas-tabla", type=int, nargs="+", default=FILAS_TABLA, help="filas por tabla de Word")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--rapido", action="store_true", help="tamaños pequeños para una verificación rápida")
+    parser.add_argument("--solo", nargs="+", choices=["excel", "word", "lote"], default=["excel", "word", "lote"])
+    parser.add_argument("--datos", help="carpeta donde guardar y reutilizar los archivos generados")
+    parser.add_argument("--salida", default="benchmark.json", help="archivo JSON de resultados")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior para comparar")
+    args = parser.parse_args()
+    if args.rapido:
+        args.filas, args.tablas, args.filas_tabla = RAPIDO["filas"], RAPIDO["tablas"], RAPIDO["filas_tabla"]
+
+    resultados = []
+
+    def registrar(prueba, parametros, segundos):
+        resultados.append({"prueba": prueba, "parametros": parametros, "segundos": segundos})
+        print(f"{prueba:<22} {json.dumps(parametros, ensure_ascii=False):<52} {segundos:>10.4f} s")
+
+    temporal = None
+    if args.datos:
+        os.makedirs(args.datos, exist_ok=True)
+        carpeta = os.path.abspath(args.datos)
+    else:
+        temporal = tempfile.TemporaryDirectory()
+        carpeta = temporal.name
+
+    try:
+        if "excel" in args.solo:
+            bench_excel(carpeta, args.filas, args.repeticiones, registrar)
+        if "word" in args.solo:
+            bench_word(carpeta, args.tablas, args.filas_tabla, args.repeticiones, registrar)
+        if "lote" in args.solo:
+            bench_lote(carpeta, args.tablas, args.filas_tabla, args.repeticiones, registrar)
+    finally:
+        if temporal is not None:
+            temporal.cleanup()
+
+    corrida = {
+        "commit": commit_actual(),
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "repeticiones": args.repeticiones,
+        "resultados": resultados,
+    }
+    with open(args.salida, "w", encoding="utf-8") as archivo:
+        json.dump(corrida, archivo, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as archivo:
+            comparar(corrida, json.load(archivo))
+
+
+if __name__ == "__main__":
+    main()
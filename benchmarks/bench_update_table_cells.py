@@ -0,0 +1,102 @@
+"""
+Benchmark de update_table_cells: escritura directa sobre w:tr/w:tc vs. word_table.cell(i, j).
+
+Crea un documento con una tabla de FILAS x COLUMNAS (por defecto 100 x 12) con una fila de
+encabezado fusionada, la llena con ambas implementaciones y verifica que el XML resultante
+sea idéntico.
+
+La implementación anterior crece más que cuadráticamente (100 filas: ~30 s; 500 filas: más
+de 10 minutos), así que por encima de LIMITE_ANTERIOR filas solo se mide la nueva, salvo
+con --con-anterior.
+
+Uso:
+    python benchmarks/bench_update_table_cells.py [--filas 100] [--columnas 12] [--con-anterior]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from docx import Document
+from lxml import etree
+
+from Functions_Backs import update_table_cells, detectar_filas_con_columnas_unidas
+
+LIMITE_ANTERIOR = 100
+
+
+def crear_documento(filas, columnas):
+    doc = Document()
+    doc.add_paragraph("TABLA DE PRUEBA")
+    tabla = doc.add_table(rows=filas, cols=columnas)
+    tabla.cell(0, 0).merge(tabla.cell(0, columnas - 1))
+    return doc, tabla
+
+
+def update_table_cells_anterior(word_table, df):
+    """Implementación anterior: una llamada a word_table.cell(i, j) por valor."""
+    filas_con_fusiones = detectar_filas_con_columnas_unidas(word_table)
+    for i in range(len(word_table.rows)):
+        if i >= len(df):
+            break
+        if i in filas_con_fusiones:
+            continue
+        row = df.iloc[i]
+        for j, value in enumerate(row):
+            if j >= len(word_table.columns):
+                break
+            word_table.cell(i, j).text = "" if pd.isna(value) else str(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, default=100)
+    parser.add_argument("--columnas", type=int, default=12)
+    parser.add_argument("--con-anterior", action="store_true",
+                        help=f"medir también la implementación anterior con más de {LIMITE_ANTERIOR} filas")
+    args = parser.parse_args()
+    medir_anterior = args.filas <= LIMITE_ANTERIOR or args.con_anterior
+
+    df = pd.DataFrame(
+        [[f"{i}-{j}" if j % 3 else i * j * 1.5 for j in range(args.columnas)] for i in range(args.filas)],
+        dtype=object,
+    )
+
+    doc_nuevo, tabla_nueva = crear_documento(args.filas, args.columnas)
+    if medir_anterior:
+        doc_anterior, tabla_anterior = crear_documento(args.filas, args.columnas)
+    doc_plantilla, tabla_plantilla = crear_documento(args.filas, args.columnas)
+
+    with redirect_stdout(io.StringIO()):
+        inicio = time.perf_counter()
+        update_table_cells(tabla_nueva, df)
+        nuevo = time.perf_counter() - inicio
+
+        if medir_anterior:
+            inicio = time.perf_counter()
+            update_table_cells_anterior(tabla_anterior, df)
+            anterior = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        update_table_cells(tabla_plantilla, df, conservar_formato=True)
+        plantilla = time.perf_counter() - inicio
+
+    print(f"Tabla {args.filas} x {args.columnas}")
+    print(f"  directo sobre XML : {nuevo:.4f} s")
+    print(f"  conservar_formato : {plantilla:.4f} s")
+    if not medir_anterior:
+        print(f"  word_table.cell() : no se mide con más de {LIMITE_ANTERIOR} filas (usar --con-anterior)")
+        return
+    identico = etree.tostring(tabla_nueva._tbl) == etree.tostring(tabla_anterior._tbl)
+    print(f"  word_table.cell() : {anterior:.4f} s")
+    print(f"  mejora            : {anterior / nuevo:.1f}x")
+    print(f"  XML idéntico      : {identico}")
+
+
+if __name__ == "__main__":
+    main()
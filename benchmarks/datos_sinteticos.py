@@ -0,0 +1,63 @@
+"""
+Generadores de datos sintéticos para los benchmarks.
+
+Los archivos son deterministas (mismo contenido para los mismos parámetros), de modo que
+los tiempos de distintas versiones del código se pueden comparar.
+"""
+import os
+
+from docx import Document
+from openpyxl import Workbook
+
+HOJA = "DATOS"
+COLUMNAS = 6
+
+
+def etiqueta(i):
+    return f"{i + 1}. TABLA SINTÉTICA {i + 1}."
+
+
+def generar_libro(ruta, filas, columnas=COLUMNAS):
+    """
+    Libro con la hoja DATOS: encabezados en la fila 1 y, desde B2, un bloque de `filas` x `columnas`
+    con texto en la primera columna y números (enteros y decimales) en las demás.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(HOJA)
+    ws.append([None] + [f"COL{c}" for c in range(1, columnas + 1)])
+    ws.append([None, "TOTALES"] + [f"CAMPO {c}" for c in range(2, columnas + 1)])
+    for r in range(1, filas):
+        ws.append([None, f"Beneficiario {r}"] + [r * c if c % 2 else round(r * c * 1.37, 2)
+                                                 for c in range(2, columnas + 1)])
+    wb.save(ruta)
+    return ruta
+
+
+def generar_plantilla(ruta, tablas, filas=10, columnas=COLUMNAS):
+    """
+    Documento con `tablas` tablas, cada una precedida por su etiqueta y con dos filas de
+    encabezado fusionadas (título en toda la fila y un grupo de columnas), más `filas` filas de datos.
+    """
+    doc = Document()
+    for i in range(tablas):
+        doc.add_paragraph(f"Texto introductorio de la sección {i + 1}.")
+        doc.add_paragraph(etiqueta(i))
+        tabla = doc.add_table(rows=filas + 2, cols=columnas)
+        tabla.style = "Table Grid"
+        tabla.cell(0, 0).merge(tabla.cell(0, columnas - 1)).text = f"TÍTULO {i + 1}"
+        tabla.cell(1, 1).merge(tabla.cell(1, columnas - 1)).text = "VALORES"
+        tabla.cell(1, 0).text = "NOMBRE"
+        for r in range(2, filas + 2):
+            for c in range(columnas):
+                tabla.cell(r, c).text = "-"
+        doc.add_paragraph("")
+    doc.save(ruta)
+    return ruta
+
+
+def en_carpeta(carpeta, nombre, generador, *args, **kwargs):
+    """Genera el archivo solo si no existe todavía en `carpeta` (permite reutilizar datos entre corridas)."""
+    ruta = os.path.join(carpeta, nombre)
+    if not os.path.exists(ruta):
+        generador(ruta, *args, **kwargs)
+    return ruta
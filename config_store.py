@@ -0,0 +1,326 @@
+"""
+Almacén de configuraciones de tablas (SQLite).
+
+Cada hilo usa una sola conexión de larga duración (un pool pequeño, una por hilo), en modo
+WAL: las lecturas no bloquean a la escritura ni al revés, y con `timeout` una escritura
+concurrente espera en lugar de fallar con "database is locked". Las altas, cambios y bajas
+de muchas configuraciones se hacen con executemany en una sola transacción.
+
+El esquema se versiona con PRAGMA user_version: al abrir la primera conexión se aplican las
+migraciones pendientes de MIGRACIONES, en orden y cada una en su transacción (reemplaza al
+script aplicar_formate.py). Las migraciones son idempotentes para poder aplicarlas sobre
+bases creadas antes del versionado (user_version 0 con columnas ya agregadas a mano).
+
+La ruta por defecto es configuraciones.db junto a este módulo (no depende del directorio de
+trabajo); se puede cambiar con la variable de entorno CONFIGURACIONES_DB o usar_base_datos().
+"""
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+DB_NAME = "configuraciones.db"
+TABLA = "configuraciones_tablas"
+# Campos editables de una configuración, en el orden de obtener_configuraciones (después del id).
+# `report` agrupa las configuraciones de un mismo informe/proyecto; `enabled` = 0 la excluye de las ejecuciones.
+CAMPOS = ("excel_file", "sheet_name", "excel_range", "word_file", "table_label",
+          "output_file", "money_columns", "header_rows", "report", "enabled")
+VALORES_POR_DEFECTO = {"enabled": 1}
+# Columnas por las que se filtra en listar() (todas con índice)
+FILTROS = ("report", "excel_file", "word_file")
+# Con más ids que esto se lee todo y se filtra en Python (límite de parámetros de SQLite antiguos: 999)
+MAX_IDS_CONSULTA = 900
+
+
+def ruta_por_defecto():
+    return os.environ.get("CONFIGURACIONES_DB") or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), DB_NAME)
+
+
+def _columnas(conn, tabla):
+    return {fila[1] for fila in conn.execute(f"PRAGMA table_info({tabla})")}
+
+
+def _agregar_columna(conn, tabla, columna, tipo):
+    if columna not in _columnas(conn, tabla):
+        conn.execute(f"ALTER TABLE {tabla} ADD COLUMN {columna} {tipo}")
+
+
+def _migracion_tabla(conn):
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS {TABLA} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            excel_file TEXT NOT NULL,
+            sheet_name TEXT NOT NULL,
+            excel_range TEXT NOT NULL,
+            word_file TEXT NOT NULL,
+            table_label TEXT NOT NULL,
+            output_file TEXT
+        )
+    ''')
+
+
+def _migracion_formato(conn):
+    _agregar_columna(conn, TABLA, "money_columns", "TEXT")   # ej. "1,2" o "3:porcentaje"
+    _agregar_columna(conn, TABLA, "header_rows", "INTEGER")  # ej. 1
+
+
+def _migracion_hashes(conn):
+    _agregar_columna(conn, TABLA, "range_hash", "TEXT")  # hash del rango de Excel en la última actualización
+    _agregar_columna(conn, TABLA, "table_hash", "TEXT")  # hash de la tabla de Word generada
+
+
+def _migracion_reportes(conn):
+    _agregar_columna(conn, TABLA, "report", "TEXT")
+    _agregar_columna(conn, TABLA, "enabled", "INTEGER NOT NULL DEFAULT 1")
+    for columna in FILTROS:
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{TABLA}_{columna} ON {TABLA} ({columna})")
+
+
+# La versión del esquema es la posición de la migración (1, 2, ...); solo se agregan al final
+MIGRACIONES = [_migracion_tabla, _migracion_formato, _migracion_hashes, _migracion_reportes]
+
+
+def _migrar(conn):
+    """Aplica las migraciones pendientes según PRAGMA user_version, una transacción por versión."""
+    while True:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Se relee dentro de la transacción por si otro proceso migró mientras tanto
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < len(MIGRACIONES):
+                MIGRACIONES[version](conn)
+                conn.execute(f"PRAGMA user_version = {version + 1}")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        if version >= len(MIGRACIONES):
+            return version
+
+
+def _campos_presentes(config):
+    """(campos, valores) de una configuración dada como diccionario o como secuencia en el orden de CAMPOS."""
+    if isinstance(config, dict):
+        campos = tuple(campo for campo in CAMPOS if campo in config)
+        return campos, tuple(config[campo] for campo in campos)
+    valores = tuple(config)
+    return CAMPOS[:len(valores)], valores
+
+
+def _fila(config):
+    """Valores de todos los CAMPOS de una configuración nueva (con los valores por defecto)."""
+    datos = dict(zip(*_campos_presentes(config)))
+    return tuple(VALORES_POR_DEFECTO.get(campo) if datos.get(campo) is None else datos[campo]
+                 for campo in CAMPOS)
+
+
+def _condiciones(ids=None, habilitadas=None, **filtros):
+    """Cláusula WHERE y parámetros para los filtros de listar()."""
+    condiciones, parametros = [], []
+    for columna, valor in filtros.items():
+        if columna not in FILTROS:
+            raise ValueError(f"No se puede filtrar por {columna}.")
+        if valor is not None:
+            condiciones.append(f"{columna}=?")
+            parametros.append(valor)
+    if ids is not None:
+        condiciones.append(f"id IN ({', '.join('?' * len(ids))})")
+        parametros.extend(ids)
+    if habilitadas is not None:
+        condiciones.append("enabled=?")
+        parametros.append(1 if habilitadas else 0)
+    return (" WHERE " + " AND ".join(condiciones) if condiciones else ""), parametros
+
+
+class ConfigStore:
+    """Acceso a la base de configuraciones con una conexión por hilo y migraciones al abrir."""
+
+    def __init__(self, ruta=None, timeout=30.0):
+        self.ruta = ruta or ruta_por_defecto()
+        self.timeout = timeout
+        self._local = threading.local()
+        self._conexiones = []
+        self._lock = threading.Lock()
+        self._lock_migracion = threading.Lock()
+        self._migrada = False
+
+    def conexion(self):
+        """Conexión del hilo actual (se abre y, la primera vez, migra el esquema)."""
+        conn = getattr(self._local, "conn", None)
+        # Un proceso hijo (fork) no debe reutilizar la conexión del padre
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        conn = sqlite3.connect(self.ruta, timeout=self.timeout, isolation_level=None,
+                               check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        self._local.conn, self._local.pid = conn, os.getpid()
+        with self._lock:
+            self._conexiones.append(conn)
+        if not self._migrada:
+            with self._lock_migracion:
+                if not self._migrada:
+                    _migrar(conn)
+                    self._migrada = True
+        return conn
+
+    def cerrar(self):
+        """Cierra todas las conexiones abiertas por este almacén."""
+        with self._lock:
+            for conn in self._conexiones:
+                conn.close()
+            self._conexiones.clear()
+        self._local = threading.local()
+
+    @contextmanager
+    def transaccion(self):
+        """Bloque en una transacción (BEGIN IMMEDIATE: reserva la escritura desde el inicio)."""
+        conn = self.conexion()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def version(self):
+        return self.conexion().execute("PRAGMA user_version").fetchone()[0]
+
+    def migrar(self):
+        """Abre la base aplicando las migraciones pendientes y devuelve la versión del esquema."""
+        return self.version()
+
+    # --- Consultas ---
+
+    def listar(self, report=None, excel_file=None, word_file=None, ids=None, habilitadas=None,
+               despues_de=None, limite=None):
+        """
+        Configuraciones como tuplas (id, *CAMPOS), ordenadas por id. Sin filtros devuelve todas;
+        `report`, `excel_file` y `word_file` (valor exacto, como se guardó) usan sus índices,
+        `ids` limita a esas configuraciones y `habilitadas` filtra por `enabled`.
+        Para leer por páginas: `limite` filas con id mayor que `despues_de` (el último leído).
+        """
+        ids = list(ids) if ids is not None else None
+        if ids is not None and len(ids) > MAX_IDS_CONSULTA:
+            ids = set(ids)
+            return [config for config in self.listar(report, excel_file, word_file, None, habilitadas,
+                                                     despues_de, None)
+                    if config[0] in ids][:limite]
+        where, parametros = _condiciones(ids, habilitadas, report=report, excel_file=excel_file,
+                                         word_file=word_file)
+        if despues_de is not None:
+            where += (" AND " if where else " WHERE ") + "id>?"
+            parametros.append(despues_de)
+        if limite is not None:
+            where += " ORDER BY id LIMIT ?"
+            parametros.append(limite)
+        else:
+            where += " ORDER BY id"
+        return self.conexion().execute(
+            f"SELECT id, {', '.join(CAMPOS)} FROM {TABLA}{where}", parametros).fetchall()
+
+    def reportes(self):
+        """Nombres de informe/proyecto distintos (sin las configuraciones sin informe)."""
+        return [fila[0] for fila in self.conexion().execute(
+            f"SELECT DISTINCT report FROM {TABLA} WHERE report IS NOT NULL ORDER BY report")]
+
+    def libros(self, report=None, word_file=None, ids=None):
+        """Libros de Excel distintos (rutas como se guardaron) que leen las configuraciones habilitadas."""
+        where, parametros = _condiciones(ids, True, report=report, word_file=word_file)
+        return [fila[0] for fila in self.conexion().execute(
+            f"SELECT DISTINCT excel_file FROM {TABLA}{where} ORDER BY excel_file", parametros)]
+
+    def obtener(self, id_config):
+        return self.conexion().execute(
+            f"SELECT id, {', '.join(CAMPOS)} FROM {TABLA} WHERE id=?", (id_config,)).fetchone()
+
+    def obtener_hashes(self, ids=None):
+        """{id: (range_hash, table_hash)} de la última actualización de cada configuración (o solo de `ids`)."""
+        ids = list(ids) if ids is not None else None
+        if ids is not None and len(ids) > MAX_IDS_CONSULTA:
+            todos = self.obtener_hashes()
+            return {id_config: todos[id_config] for id_config in ids if id_config in todos}
+        where, parametros = _condiciones(ids)
+        return {id_config: (range_hash, table_hash) for id_config, range_hash, table_hash
+                in self.conexion().execute(f"SELECT id, range_hash, table_hash FROM {TABLA}{where}", parametros)}
+
+    # --- Escrituras ---
+
+    def insertar(self, config):
+        """Agrega una configuración (diccionario o secuencia en el orden de CAMPOS) y devuelve su id."""
+        with self.transaccion() as conn:
+            cursor = conn.execute(
+                f"INSERT INTO {TABLA} ({', '.join(CAMPOS)}) VALUES ({', '.join('?' * len(CAMPOS))})",
+                _fila(config))
+            return cursor.lastrowid
+
+    def insertar_varias(self, configs):
+        """Agrega muchas configuraciones en una sola transacción."""
+        with self.transaccion() as conn:
+            conn.executemany(
+                f"INSERT INTO {TABLA} ({', '.join(CAMPOS)}) VALUES ({', '.join('?' * len(CAMPOS))})",
+                [_fila(config) for config in configs])
+
+    def actualizar(self, id_config, config):
+        self.actualizar_varias([(id_config, config)])
+
+    def actualizar_varias(self, cambios):
+        """
+        `cambios` es una lista de (id, configuración). Solo se modifican los campos presentes:
+        las claves del diccionario o los primeros campos de CAMPOS si es una secuencia.
+        """
+        por_campos = {}
+        for id_config, config in cambios:
+            campos, valores = _campos_presentes(config)
+            por_campos.setdefault(campos, []).append(valores + (id_config,))
+        with self.transaccion() as conn:
+            for campos, filas in por_campos.items():
+                conn.executemany(
+                    f"UPDATE {TABLA} SET {', '.join(f'{campo}=?' for campo in campos)} WHERE id=?", filas)
+
+    def asignar_reporte(self, ids, report):
+        """Asigna el informe/proyecto `report` a varias configuraciones."""
+        self.actualizar_varias([(id_config, {"report": report}) for id_config in ids])
+
+    def habilitar(self, ids, habilitada=True):
+        """Habilita o deshabilita varias configuraciones para las ejecuciones."""
+        self.actualizar_varias([(id_config, {"enabled": 1 if habilitada else 0}) for id_config in ids])
+
+    def eliminar(self, id_config):
+        self.eliminar_varias([id_config])
+
+    def eliminar_varias(self, ids):
+        with self.transaccion() as conn:
+            conn.executemany(f"DELETE FROM {TABLA} WHERE id=?", [(id_config,) for id_config in ids])
+
+    def guardar_hashes(self, hashes):
+        """Guarda los hashes de varias configuraciones. `hashes` es una lista de (id, range_hash, table_hash)."""
+        with self.transaccion() as conn:
+            conn.executemany(
+                f"UPDATE {TABLA} SET range_hash=?, table_hash=? WHERE id=?",
+                [(range_hash, table_hash, id_config) for id_config, range_hash, table_hash in hashes])
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def obtener_store():
+    """Almacén compartido por todo el proceso (se crea con la ruta por defecto)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ConfigStore()
+        return _store
+
+
+def usar_base_datos(ruta):
+    """Cambia la base del almacén compartido (cierra las conexiones de la anterior)."""
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.cerrar()
+        _store = ConfigStore(ruta)
+        return _store
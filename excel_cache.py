@@ -0,0 +1,156 @@
+"""
+Caché de libros de Excel para la duración de una ejecución por lotes.
+
+Cada hoja se lee una sola vez (en streaming con xlsx_stream, solo valores; los libros que
+no son .xlsx, como los .xls, con pd.read_excel) y se guarda
+en memoria como una lista de filas; si solo se piden las primeras filas, únicamente se
+lee ese prefijo y se amplía cuando otra consulta necesita más. La clave incluye la ruta,
+la fecha de modificación y el tamaño del archivo, de modo que un libro modificado se
+vuelve a leer. Cuando el total estimado supera `max_bytes` se descartan las hojas usadas
+menos recientemente.
+"""
+import os
+import sys
+import zipfile
+from collections import OrderedDict
+
+from xlsx_stream import LibroXlsx
+
+MAX_BYTES_POR_DEFECTO = 512 * 1024 * 1024
+
+
+def _convertir_valor(valor):
+    """Normaliza el valor igual que pandas.read_excel (flotantes enteros -> int)."""
+    if isinstance(valor, float) and valor.is_integer():
+        return int(valor)
+    return valor
+
+
+def _estimar_bytes(filas):
+    total = sys.getsizeof(filas)
+    for fila in filas:
+        total += sys.getsizeof(fila)
+        for valor in fila:
+            if valor is not None:
+                total += sys.getsizeof(valor)
+    return total
+
+
+def firma_archivo(excel_path):
+    """Devuelve (ruta normalizada, mtime, tamaño) para usar como clave de caché."""
+    ruta = os.path.normcase(os.path.abspath(excel_path))
+    stat = os.stat(ruta)
+    return ruta, stat.st_mtime_ns, stat.st_size
+
+
+def leer_valores(excel_path, sheet_name=None, min_row=1, max_row=None, min_col=1, max_col=None):
+    """
+    Como LibroXlsx.leer_valores: (filas min_row..max_row como tuplas, si se llegó al final de
+    la hoja). Un .xlsx se lee en streaming; un libro que no es un zip (.xls) no puede leerse
+    así y se lee con pd.read_excel, como antes de xlsx_stream.
+    """
+    if zipfile.is_zipfile(excel_path):
+        with LibroXlsx(excel_path) as libro:
+            return libro.leer_valores(sheet_name, min_row, max_row, min_col, max_col)
+
+    import pandas as pd
+
+    df = pd.read_excel(excel_path, sheet_name=sheet_name or 0, header=None, dtype=object,
+                       nrows=None if max_row is None else max_row + 1)
+    completa = max_row is None or len(df) <= max_row
+    ancho = None if max_col is None else max_col - min_col + 1
+    filas = []
+    for fila in df.to_numpy(dtype=object)[min_row - 1:max_row]:
+        valores = [None if pd.isna(v) else v for v in fila[min_col - 1:max_col]]
+        if ancho is not None:
+            valores.extend([None] * (ancho - len(valores)))
+        filas.append(tuple(valores))
+    return filas, completa
+
+
+def _quitar_filas_vacias_finales(filas):
+    while filas and all(v in (None, "") for v in filas[-1]):
+        filas.pop()
+    return filas
+
+
+def leer_filas(excel_path, sheet_name=None, max_row=None):
+    """
+    Lee los valores de una hoja como lista de tuplas desde A1 hasta `max_row`
+    (o hasta el final si es None); la fila 1 de Excel es el índice 0.
+    La lectura se detiene en `max_row`. Devuelve (filas, completa), donde `completa`
+    indica que se llegó al final de la hoja (y entonces se quitan las filas vacías finales).
+    """
+    filas, completa = leer_valores(excel_path, sheet_name, max_row=max_row)
+
+    filas = [tuple(_convertir_valor(v) for v in fila) for fila in filas]
+    if completa:
+        _quitar_filas_vacias_finales(filas)
+    return filas, completa
+
+
+def leer_bloque(excel_path, sheet_name, row_start, row_end, col_start, col_end):
+    """
+    Lee solo el bloque de celdas [row_start..row_end] x [col_start..col_end] (índices 1-based)
+    más la fila 1 como encabezado, deteniéndose en `row_end`.
+    Devuelve (encabezado, filas); si la hoja termina dentro del rango se quitan
+    las filas vacías finales, igual que pd.read_excel.
+    """
+    filas, completa = leer_valores(excel_path, sheet_name, 1, row_end, col_start, col_end)
+
+    filas = [tuple(_convertir_valor(v) for v in fila) for fila in filas]
+    encabezado = filas[0] if filas else ()
+    datos = filas[max(row_start - 1, 1):]
+    if completa:
+        _quitar_filas_vacias_finales(datos)
+    return encabezado, datos
+
+
+class WorkbookCache:
+    """Caché LRU de hojas de Excel ya leídas, con límite aproximado de memoria."""
+
+    def __init__(self, max_bytes=MAX_BYTES_POR_DEFECTO):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self._hojas = OrderedDict()  # (ruta, mtime, tamaño, hoja) -> (filas, completa, bytes)
+
+    def obtener_hoja(self, excel_path, sheet_name=None, max_row=None):
+        """
+        Devuelve las filas de la hoja (al menos hasta `max_row`, o todas si es None),
+        leyéndola solo si no está en caché, si cambió el archivo o si hace falta un prefijo mayor.
+        """
+        ruta, mtime, tamano = firma_archivo(excel_path)
+        clave = (ruta, mtime, tamano, sheet_name)
+
+        entrada = self._hojas.get(clave)
+        if entrada is not None:
+            filas, completa, _ = entrada
+            if completa or (max_row is not None and len(filas) >= max_row):
+                self._hojas.move_to_end(clave)
+                self.aciertos += 1
+                return filas
+            self.total_bytes -= self._hojas.pop(clave)[2]
+            # Ampliar al menos al doble para no releer la hoja en cada consulta
+            if max_row is not None:
+                max_row = max(max_row, 2 * len(filas))
+
+        self.fallos += 1
+        self._descartar_version_anterior(ruta, mtime, tamano)
+        filas, completa = leer_filas(excel_path, sheet_name, max_row)
+        tamano_bytes = _estimar_bytes(filas)
+        if tamano_bytes <= self.max_bytes:
+            self._hojas[clave] = (filas, completa, tamano_bytes)
+            self.total_bytes += tamano_bytes
+            self._recortar()
+        return filas
+
+    def _descartar_version_anterior(self, ruta, mtime, tamano):
+        for clave in [c for c in self._hojas if c[0] == ruta and c[1:3] != (mtime, tamano)]:
+            self.total_bytes -= self._hojas.pop(clave)[2]
+
+    def _recortar(self):
+        while self.total_bytes > self.max_bytes and self._hojas:
+            _, (_, _, tamano_bytes) = self._hojas.popitem(last=False)
+            self.total_bytes -= tamano_bytes
@@ -0,0 +1,266 @@
+"""
+Extracción de rangos de un .xlsx local con valores y formato (relleno, fuente, bordes y
+alineación) en la misma GrillaCompacta que se obtiene de Google Sheets, para crear la tabla
+de Word con create_table22 sin pasar después por formatear_tabla ni aplicar_bordes_a_tabla.
+
+El libro se abre con openpyxl en modo solo lectura. Las celdas de un libro comparten estilos
+por índice (cellXfs), así que cada estilo distinto se convierte una sola vez en un
+FormatoCelda y todas las celdas que lo usan guardan el mismo id de formato.
+Los colores de tema se resuelven con el tema del libro (incluido el matiz); el texto de
+cada celda sigue el formato numérico más común (decimales, miles, %, $ y fechas), no la
+gramática completa de formatos de Excel. Las celdas combinadas no se combinan en Word.
+"""
+import colorsys
+import datetime
+import re
+from copy import copy
+
+from lxml import etree
+from openpyxl import load_workbook
+from openpyxl.styles import Alignment, Border, PatternFill
+from openpyxl.styles.cell_style import StyleArray
+from openpyxl.styles.colors import COLOR_INDEX
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.styles.numbers import is_date_format
+from openpyxl.utils import range_boundaries
+
+from Functions_Backs import FORMATO_FECHA
+from functions_back import FormatoCelda, GrillaCompacta, hex_to_rgb
+
+NS_DRAWING = "http://schemas.openxmlformats.org/drawingml/2006/main"
+
+# Estilos de borde de Excel con su nombre en Sheets (el que usa apply_cell_formatting)
+BORDES_EXCEL = {
+    'thin': 'SOLID', 'hair': 'DOTTED', 'dotted': 'DOTTED', 'dashed': 'DASHED',
+    'mediumDashed': 'DASHED', 'dashDot': 'DASHED', 'mediumDashDot': 'DASHED',
+    'dashDotDot': 'DASHED', 'mediumDashDotDot': 'DASHED', 'slantDashDot': 'DASHED',
+    'medium': 'SOLID_MEDIUM', 'thick': 'SOLID_THICK', 'double': 'DOUBLE',
+}
+ALINEACION_VERTICAL = {'top': 'TOP', 'center': 'CENTER', 'bottom': 'BOTTOM',
+                       'justify': 'CENTER', 'distributed': 'CENTER'}
+# Valores que Excel alinea a la derecha con la alineación 'general'
+NUMERICOS = (int, float, datetime.date, datetime.time)
+# Orden de los colores del tema según el índice `theme` de las celdas
+ORDEN_TEMA = ('lt1', 'dk1', 'lt2', 'dk2', 'accent1', 'accent2', 'accent3',
+              'accent4', 'accent5', 'accent6', 'hlink', 'folHlink')
+
+
+def colores_tema(workbook):
+    """Colores del tema del libro como lista '#rrggbb' en el orden de ORDEN_TEMA."""
+    if not workbook.loaded_theme:
+        return []
+    raiz = etree.fromstring(workbook.loaded_theme)
+    esquema = raiz.find(f".//{{{NS_DRAWING}}}clrScheme")
+    if esquema is None:
+        return []
+    colores = {}
+    for elemento in esquema:
+        nombre = etree.QName(elemento).localname
+        for color in elemento:
+            valor = color.get('val') if etree.QName(color).localname == 'srgbClr' else color.get('lastClr')
+            if valor:
+                colores[nombre] = '#' + valor[-6:].lower()
+    return [colores.get(nombre, '#000000') for nombre in ORDEN_TEMA]
+
+
+def _aplicar_matiz(hex_color, tint):
+    """Aclara (tint > 0) u oscurece (tint < 0) un color como Excel, sobre la luminosidad HLS."""
+    rojo, verde, azul = (int(hex_color[i:i + 2], 16) / 255 for i in (1, 3, 5))
+    h, l, s = colorsys.rgb_to_hls(rojo, verde, azul)
+    l = l * (1 + tint) if tint < 0 else l * (1 - tint) + tint
+    return '#' + ''.join(f"{round(c * 255):02x}" for c in colorsys.hls_to_rgb(h, l, s))
+
+
+def color_excel(color, tema, por_defecto):
+    """Convierte un Color de openpyxl (rgb, indexado o de tema) en '#rrggbb'."""
+    if color is None:
+        return por_defecto
+    if color.type == 'rgb' and isinstance(color.rgb, str):
+        hex_color = '#' + color.rgb[-6:].lower()
+    elif color.type == 'indexed' and color.indexed < len(COLOR_INDEX):
+        hex_color = '#' + COLOR_INDEX[color.indexed][-6:].lower()
+    elif color.type == 'theme' and color.theme < len(tema):
+        hex_color = tema[color.theme]
+    else:
+        return por_defecto
+    if color.tint:
+        hex_color = _aplicar_matiz(hex_color, color.tint)
+    return hex_color
+
+
+class EstilosLibro:
+    """
+    Único punto de acceso a los estilos de las celdas de un libro de openpyxl.
+
+    Las celdas de un libro comparten estilos por índice (cellXfs). Cuando openpyxl expone ese
+    índice (los atributos internos `_style_id`/`_style` de la celda y `_fonts`, `_fills`, ...
+    del libro) se usa como clave y cada estilo distinto se resuelve una sola vez. Si la versión
+    instalada no los tiene se usan las propiedades públicas de la celda (font, fill, border y
+    alignment), que también sirven de clave aunque cuestan una consulta por celda.
+    """
+
+    INTERNOS = ('_fonts', '_fills', '_borders', '_alignments', '_cell_styles')
+
+    def __init__(self, workbook):
+        self.workbook = workbook
+        self.internos = all(hasattr(workbook, nombre) for nombre in self.INTERNOS)
+
+    def clave(self, cell):
+        """Clave hashable del estilo de `cell`: las celdas con la misma clave tienen el mismo formato."""
+        if self.internos:
+            # ReadOnlyCell guarda el índice del estilo en cellXfs; Cell (libro abierto completo)
+            # su StyleArray, o None sin estilo, igual que EmptyCell (el estilo 0 del libro)
+            style_id = getattr(cell, '_style_id', None)
+            if style_id is not None:
+                return style_id
+            if hasattr(cell, '_style'):
+                return tuple(cell._style) if cell._style is not None else 0
+            if cell.font is None:
+                return 0
+        # Cell devuelve StyleProxy (no hashable); copy() entrega el estilo que envuelve
+        return tuple(copy(parte) if parte is not None else defecto
+                     for parte, defecto in zip((cell.font, cell.fill, cell.border, cell.alignment),
+                                               self.por_defecto()))
+
+    def partes(self, clave):
+        """(font, fill, border, alignment) del estilo con esa clave."""
+        if isinstance(clave, int) or isinstance(clave[0], int):
+            workbook = self.workbook
+            estilo = workbook._cell_styles[clave] if isinstance(clave, int) else StyleArray(clave)
+            return (workbook._fonts[estilo.fontId], workbook._fills[estilo.fillId],
+                    workbook._borders[estilo.borderId], workbook._alignments[estilo.alignmentId])
+        return clave
+
+    def por_defecto(self):
+        """(font, fill, border, alignment) de las celdas sin estilo (el estilo 0 del libro)."""
+        if self.internos:
+            return self.partes(0)
+        return DEFAULT_FONT, PatternFill(), Border(), Alignment()
+
+
+def formato_desde_estilo(partes, tema, numerico=False):
+    """
+    FormatoCelda de un estilo dado como (font, fill, border, alignment) de openpyxl. Con
+    alineación 'general' Excel alinea los números y fechas a la derecha y el resto a la
+    izquierda, por eso depende de `numerico`.
+    """
+    font, fill, border, alignment = partes
+
+    color = color_excel(font.color, tema, '#000000')
+    fondo = '#ffffff'
+    if getattr(fill, 'fill_type', None) == 'solid':
+        fondo = color_excel(fill.fgColor, tema, '#ffffff')
+
+    bordes = []
+    for side in ('top', 'left', 'bottom', 'right'):
+        lado = getattr(border, side)
+        estilo_borde = BORDES_EXCEL.get(lado.style, 'NONE') if lado is not None else 'NONE'
+        bordes.append((estilo_borde, color_excel(lado.color if lado is not None else None, tema, '#000000')))
+
+    horizontal = (alignment.horizontal or 'general').upper()
+    if horizontal == 'GENERAL':
+        horizontal = 'RIGHT' if numerico else 'LEFT'
+    elif horizontal in ('CENTERCONTINUOUS', 'DISTRIBUTED'):
+        horizontal = 'CENTER'
+    elif horizontal == 'FILL':
+        horizontal = 'LEFT'
+
+    return FormatoCelda(
+        bool(font.b), font.sz or 11, color, font.name or 'Calibri', fondo, tuple(bordes),
+        horizontal, ALINEACION_VERTICAL.get(alignment.vertical, 'BOTTOM'),
+        bool(alignment.wrap_text), int(alignment.text_rotation or 0),
+        hex_to_rgb(color),
+    )
+
+
+def texto_excel(valor, formato_numero):
+    """Texto que muestra Excel para `valor` con el formato numérico más común."""
+    if valor is None:
+        return ''
+    if isinstance(valor, bool):
+        return 'VERDADERO' if valor else 'FALSO'
+    if isinstance(valor, (datetime.datetime, datetime.date)):
+        texto = valor.strftime(FORMATO_FECHA)
+        if isinstance(valor, datetime.datetime) and 'h' in (formato_numero or '').lower():
+            texto += valor.strftime(' %H:%M')
+        return texto
+    if isinstance(valor, datetime.time):
+        return valor.strftime('%H:%M')
+    if not isinstance(valor, (int, float)):
+        return str(valor)
+
+    formato_numero = formato_numero or 'General'
+    secciones = formato_numero.split(';')
+    # Un formato con sección negativa propia ("#,##0;(#,##0)") no lleva el signo "-"
+    seccion_negativa = valor < 0 and len(secciones) > 1
+    seccion = secciones[1] if seccion_negativa else secciones[0]
+    # Quitar textos entre comillas, colores/condiciones [..] salvo la moneda [$$-409], y escapes
+    moneda = '$' if '$' in seccion else ''
+    seccion = re.sub(r'"[^"]*"|\[[^\]]*\]|\\.|_.|\*.', '', seccion)
+
+    if seccion.strip().lower() in ('general', '@', ''):
+        if isinstance(valor, float) and valor.is_integer():
+            return str(int(valor))
+        return f"{valor:.10g}" if isinstance(valor, float) else str(valor)
+    if is_date_format(formato_numero):
+        return str(valor)
+
+    porcentaje = '%' in seccion
+    decimales = re.search(r'\.([0#?]+)', seccion)
+    decimales = len(decimales.group(1)) if decimales else 0
+    miles = ',' in seccion.split('.')[0]
+    numero = abs(valor) * 100 if porcentaje else abs(valor)
+    texto = f"{numero:{',' if miles else ''}.{decimales}f}"
+    texto = f"{moneda}{texto}{'%' if porcentaje else ''}"
+    if seccion_negativa:
+        return f"({texto})" if '(' in seccion else texto
+    return f"-{texto}" if valor < 0 else texto
+
+
+def obtener_rango_excel(excel_path, sheet_name, excel_range, workbook=None):
+    """
+    Lee un rango ('B2:G20') de una hoja de Excel con valores y formato en una GrillaCompacta.
+    Devuelve (grilla, num_cols), lo mismo que get_sheet_data2(..., compacta=True), listo para
+    create_table22. Si se pasa `workbook` (openpyxl, data_only=True) se reutiliza para
+    varios rangos del mismo libro.
+    """
+    min_col, row_start, max_col, row_end = range_boundaries(excel_range.strip().upper())
+    if None in (min_col, row_start, max_col, row_end):
+        raise ValueError("Formato de rango inválido. Usa algo como 'B2:L14'.")
+    propio = workbook is None
+    if propio:
+        workbook = load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        return _leer_rango(workbook, sheet_name, min_col, row_start, max_col, row_end)
+    finally:
+        # En modo solo lectura el libro deja el archivo abierto hasta cerrarlo (en Windows
+        # eso impide guardarlo desde Excel); el que se recibe lo cierra quien lo abrió
+        if propio:
+            workbook.close()
+
+
+def _leer_rango(workbook, sheet_name, min_col, row_start, max_col, row_end):
+    hoja = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+    tema = colores_tema(workbook)
+    estilos = EstilosLibro(workbook)
+    num_cols = max_col - min_col + 1
+
+    grilla = GrillaCompacta(num_cols)
+    por_estilo = {}
+    filas = hoja.iter_rows(min_row=row_start, max_row=row_end, min_col=min_col, max_col=max_col)
+    for _, fila in zip(range(row_end - row_start + 1), filas):
+        valores, ids = [], []
+        for cell in fila:
+            valor = cell.value
+            numerico = isinstance(valor, NUMERICOS) and not isinstance(valor, bool)
+            clave = (estilos.clave(cell), numerico)
+            indice = por_estilo.get(clave)
+            if indice is None:
+                formato = formato_desde_estilo(estilos.partes(clave[0]), tema, numerico)
+                indice = por_estilo[clave] = grilla.id_formato(formato)
+            valores.append(texto_excel(valor, cell.number_format))
+            ids.append(indice)
+        valores += [''] * (num_cols - len(valores))
+        ids += [grilla.id_formato(formato_desde_estilo(estilos.por_defecto(), tema))] * (num_cols - len(ids))
+        grilla.agregar_fila(valores, ids)
+    return grilla, num_cols
@@ -0,0 +1,259 @@
+"""
+Formato de tablas de Word en una sola pasada.
+
+En lugar de recorrer la tabla con los objetos de python-docx una vez por cada cosa
+(formatear_tabla para la fuente, aplicar_bordes_a_tabla, format_table_money_columns y
+obtener_formato_tabla), EspecificacionTabla describe todo el formato de una tabla y
+aplicar_formato lo aplica recorriendo el XML (w:tbl) una sola vez con lxml.
+
+La fuente y el tamaño van en un estilo de párrafo del documento ("Tabla Arial 10") que se
+asigna a cada párrafo de la tabla, y los bordes en las propiedades de la tabla (w:tblBorders),
+en lugar de repetirlos en cada run; a los runs solo se les quita la fuente y el tamaño
+directos, que taparían los del estilo. Los párrafos que ya tienen un estilo propio conservan
+ese estilo y reciben la fuente y el tamaño en sus runs, como antes.
+"""
+from collections import namedtuple
+
+import numpy as np
+from docx.enum.style import WD_STYLE_TYPE
+from docx.oxml.ns import qn
+from docx.shared import Pt
+from lxml import etree
+
+from Functions_Backs import (
+    W_P, W_R, W_T, W_TCPR, W_VAL, W_GRIDSPAN, W_VMERGE, W_PPR, W_PSTYLE, W_RPR, W_TBLHEADER,
+    formatear_columna, reemplazar_texto
+)
+
+W_TBLBORDERS = qn('w:tblBorders')
+W_RFONTS = qn('w:rFonts')
+W_SZ = qn('w:sz')
+W_SZCS = qn('w:szCs')
+W_B = qn('w:b')
+W_ASCII = qn('w:ascii')
+W_HANSI = qn('w:hAnsi')
+
+# (tipo de línea, grosor en octavos de punto, color), como aplicaba aplicar_bordes_a_tabla
+BORDES_SIMPLES = ("single", 4, "000000")
+LADOS_TABLA = ("top", "left", "bottom", "right", "insideH", "insideV")
+# Elementos de w:tblPr que van después de w:tblBorders según el esquema
+DESPUES_DE_BORDES = ("w:shd", "w:tblLayout", "w:tblCellMar", "w:tblLook", "w:tblCaption",
+                     "w:tblDescription", "w:tblPrChange")
+# Hijos de w:rPr que van después de w:rFonts, w:b y w:sz (para insertarlos en orden)
+DESPUES_DE_NEGRITA = ("w:bCs", "w:i", "w:iCs", "w:caps", "w:smallCaps", "w:strike", "w:dstrike",
+                      "w:outline", "w:shadow", "w:emboss", "w:imprint", "w:noProof", "w:snapToGrid",
+                      "w:vanish", "w:webHidden", "w:color", "w:spacing", "w:w", "w:kern",
+                      "w:position", "w:sz", "w:szCs", "w:highlight", "w:u", "w:effect", "w:bdr",
+                      "w:shd", "w:fitText", "w:vertAlign", "w:rtl", "w:cs", "w:em", "w:lang",
+                      "w:eastAsianLayout", "w:specVanish", "w:oMath")
+DESPUES_DE_FUENTE = ("w:b",) + DESPUES_DE_NEGRITA
+DESPUES_DE_TAMANO = DESPUES_DE_NEGRITA[DESPUES_DE_NEGRITA.index("w:szCs"):]
+
+
+class EspecificacionTabla(namedtuple(
+        "EspecificacionTabla",
+        "fuente tamaño bordes formatos header_rows repetir_encabezado negrita_encabezado",
+        defaults=("Arial", 10, BORDES_SIMPLES, None, 1, False, False))):
+    """
+    Formato completo de una tabla:
+    - fuente, tamaño: fuente y tamaño en puntos de todo el texto (None = no cambiar).
+    - bordes: (tipo, grosor en octavos de punto, color) de todos los bordes (None = no cambiar).
+    - formatos: {columna 0-based: formato} como parse_formato_columnas ("dinero", "porcentaje",
+      "entero", "fecha"), aplicado al texto de las filas de datos.
+    - header_rows: filas de encabezado (no reciben formato de columnas).
+    - repetir_encabezado: repetir las filas de encabezado en cada página.
+    - negrita_encabezado: encabezado en negrita (estilo "... encabezado").
+    """
+    __slots__ = ()
+
+
+def _estilos_documento(tabla):
+    """Estilos del documento de la tabla, o None si no se pueden obtener (tabla sin documento)."""
+    try:
+        return tabla.part.package.main_document_part.styles
+    except AttributeError:
+        return None
+
+
+def _estilo_parrafo(estilos, nombre, fuente, tamaño, negrita=False, base=None):
+    """style_id del estilo de párrafo `nombre`; si no existe se crea con la fuente, el tamaño y la negrita."""
+    try:
+        return estilos[nombre].style_id
+    except KeyError:
+        pass
+    estilo = estilos.add_style(nombre, WD_STYLE_TYPE.PARAGRAPH)
+    if base is not None:
+        estilo.base_style = estilos[base]
+    else:
+        try:
+            estilo.base_style = estilos["Normal"]
+        except KeyError:
+            pass
+    if fuente:
+        estilo.font.name = fuente
+    if tamaño:
+        estilo.font.size = Pt(tamaño)
+    if negrita:
+        estilo.font.bold = True
+    estilo.quick_style = False
+    return estilo.style_id
+
+
+def _nombre_estilo(fuente, tamaño):
+    return " ".join(["Tabla"] + [str(v) for v in (fuente, tamaño) if v])
+
+
+def _hijo(padre, tag, *despues):
+    """Primer hijo `tag` de `padre`, creado en su lugar del esquema si no existe."""
+    elemento = padre.find(tag)
+    if elemento is None:
+        elemento = padre.makeelement(tag, {})
+        padre.insert_element_before(elemento, *despues)
+    return elemento
+
+
+def _aplicar_bordes(tbl, bordes):
+    tipo, grosor, color = bordes
+    tbl_borders = tbl.tblPr.find(W_TBLBORDERS)
+    if tbl_borders is None:
+        tbl_borders = tbl.tblPr.makeelement(W_TBLBORDERS, {})
+        tbl.tblPr.insert_element_before(tbl_borders, *DESPUES_DE_BORDES)
+    for lado in list(tbl_borders):
+        tbl_borders.remove(lado)
+    for lado in LADOS_TABLA:
+        etree.SubElement(tbl_borders, qn(f"w:{lado}"), {
+            W_VAL: tipo, qn("w:sz"): str(grosor), qn("w:space"): "0", qn("w:color"): color})
+
+
+def _formato_run(rPr, fuente, tamaño, negrita):
+    """Fuente, tamaño y negrita directos en un run (para párrafos con estilo propio)."""
+    if fuente:
+        # Se reemplaza entero: un w:asciiTheme anterior taparía la fuente nueva
+        r_fonts = rPr.find(W_RFONTS)
+        if r_fonts is not None:
+            rPr.remove(r_fonts)
+        _hijo(rPr, W_RFONTS, *DESPUES_DE_FUENTE).attrib.update({W_ASCII: fuente, W_HANSI: fuente})
+    if negrita:
+        _hijo(rPr, W_B, *DESPUES_DE_NEGRITA).attrib.pop(W_VAL, None)
+    if tamaño:
+        _hijo(rPr, W_SZ, *DESPUES_DE_TAMANO).set(W_VAL, str(round(tamaño * 2)))
+
+
+def _texto(tc):
+    """Texto de los w:t de la celda, un párrafo por línea (sin pasar por los objetos de python-docx)."""
+    return "\n".join("".join(t.text or "" for t in p.iter(W_T)) for p in tc.iterchildren(W_P))
+
+
+def _celda(tc):
+    """(columnas que abarca, es continuación de una fusión vertical) leyendo el w:tcPr directamente."""
+    tc_pr = tc.find(W_TCPR)
+    if tc_pr is None:
+        return 1, False
+    grid_span = tc_pr.find(W_GRIDSPAN)
+    v_merge = tc_pr.find(W_VMERGE)
+    return (int(grid_span.get(W_VAL)) if grid_span is not None else 1,
+            v_merge is not None and v_merge.get(W_VAL, "continue") == "continue")
+
+
+def _asignar_estilo(p, estilos_propios, estilo):
+    """
+    Asigna el estilo de párrafo `estilo` si el párrafo no tiene otro (o tiene uno de
+    `estilos_propios`). Devuelve False si el párrafo conserva un estilo propio.
+    """
+    p_pr = p.find(W_PPR)
+    if p_pr is None:
+        p_pr = p.makeelement(W_PPR, {})
+        p.insert(0, p_pr)
+    p_style = p_pr.find(W_PSTYLE)
+    if p_style is None:
+        p_pr.insert(0, p_pr.makeelement(W_PSTYLE, {W_VAL: estilo}))
+    elif p_style.get(W_VAL) in estilos_propios:
+        p_style.set(W_VAL, estilo)
+    else:
+        return False
+    return True
+
+
+def _formato_leido(rPr):
+    """(fuente, tamaño en puntos) directos de un run, como obtener_formato_tabla."""
+    r_fonts = rPr.find(W_RFONTS)
+    sz = rPr.find(W_SZ)
+    return (r_fonts.get(W_ASCII) if r_fonts is not None else None,
+            int(sz.get(W_VAL)) / 2 if sz is not None else None)
+
+
+def aplicar_formato(tabla, especificacion=EspecificacionTabla()):
+    """
+    Aplica una EspecificacionTabla a una tabla de python-docx en un solo recorrido del XML.
+    Devuelve {'celdas_formateadas': celdas cuyo texto cambió por el formato de columnas,
+    'formato_anterior': (fuente, tamaño) del primer run con formato directo, antes de cambiarlo}.
+    """
+    fuente, tamaño, bordes, formatos, header_rows, repetir_encabezado, negrita_encabezado = especificacion
+    formatos = formatos or {}
+    tbl = tabla._tbl
+
+    if bordes is not None:
+        _aplicar_bordes(tbl, bordes)
+
+    # Estilos de párrafo del cuerpo y del encabezado (se crean una vez por documento)
+    estilo_cuerpo = estilo_encabezado = None
+    cambia_texto = bool(fuente or tamaño)
+    estilos = _estilos_documento(tabla) if cambia_texto or negrita_encabezado else None
+    if estilos is not None:
+        nombre = _nombre_estilo(fuente, tamaño)
+        estilo_cuerpo = _estilo_parrafo(estilos, nombre, fuente, tamaño)
+        if negrita_encabezado:
+            estilo_encabezado = _estilo_parrafo(estilos, f"{nombre} encabezado", None, None,
+                                                negrita=True, base=nombre)
+
+    estilos_propios = {estilo_cuerpo, estilo_encabezado}
+    formato_anterior = None
+    por_columna = {col: ([], []) for col in formatos}  # col -> (celdas, textos)
+    for i, tr in enumerate(tbl.tr_lst):
+        encabezado = i < header_rows
+        if encabezado and repetir_encabezado:
+            tr_pr = tr.get_or_add_trPr()
+            if tr_pr.find(W_TBLHEADER) is None:
+                etree.SubElement(tr_pr, W_TBLHEADER)
+        estilo = estilo_encabezado if encabezado and estilo_encabezado else estilo_cuerpo
+        negrita = encabezado and negrita_encabezado
+
+        col = 0
+        for tc in tr.tc_lst:
+            span, continua = _celda(tc)
+            if not encabezado and col in por_columna and not continua:
+                por_columna[col][0].append(tc)
+                por_columna[col][1].append(_texto(tc))
+            col += span
+
+            for p in tc.iterchildren(W_P):
+                con_estilo = estilo is not None and _asignar_estilo(p, estilos_propios, estilo)
+                for r in p.iterchildren(W_R):
+                    rPr = r.find(W_RPR)
+                    if formato_anterior is None and rPr is not None:
+                        leido = _formato_leido(rPr)
+                        if leido != (None, None):
+                            formato_anterior = leido
+                    if con_estilo:
+                        # El formato directo taparía el del estilo
+                        if rPr is not None:
+                            for e in rPr.findall(W_RFONTS) if fuente else ():
+                                rPr.remove(e)
+                            for tag in (W_SZ, W_SZCS) if tamaño else ():
+                                for e in rPr.findall(tag):
+                                    rPr.remove(e)
+                    elif cambia_texto or negrita:
+                        _formato_run(r.get_or_add_rPr(), fuente, tamaño, negrita)
+
+    celdas_formateadas = 0
+    for col, (celdas, textos) in por_columna.items():
+        if not celdas:
+            continue
+        textos = np.array(textos, dtype=object)
+        nuevos = formatear_columna(textos, textos, formatos[col])
+        for tc, anterior, nuevo in zip(celdas, textos, nuevos):
+            if nuevo != anterior:
+                reemplazar_texto(tc, nuevo)
+                celdas_formateadas += 1
+
+    return {"celdas_formateadas": celdas_formateadas, "formato_anterior": formato_anterior or (None, None)}
@@ -1,8 +1,18 @@
+import hashlib
+import json
+import os
+import re
+from array import array
+from collections import namedtuple
+
 from docx.shared import RGBColor, Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.oxml.shared import OxmlElement
 from docx.oxml.ns import qn
 from docx.enum.table import WD_TABLE_ALIGNMENT
+from docx.table import _Cell
+from docx.text.paragraph import Paragraph
+from copy import deepcopy
 
 def col_to_letter(n):
     """Convierte un número de columna a su letra equivalente (1 -> 'A')."""
@@ -45,10 +55,221 @@ def get_default_format():
     }
 
 
-def get_sheet_data2(sheets_service, sheet_id, sheet_name, start_row, end_row, start_col, end_col):
+def _color_hex(color, por_defecto):
+    """
+    Convierte un Color de la API ({'red': 0.5, ...}) en '#rrggbb'. Si el color no viene se usa
+    `por_defecto` en cada componente; si viene, la API omite los componentes en 0.
+    """
+    if color is None:
+        componentes = (por_defecto, por_defecto, por_defecto)
+    else:
+        componentes = (color.get('red', 0), color.get('green', 0), color.get('blue', 0))
+    return "#" + "".join(f"{int(c * 255):02x}" for c in componentes)
+
+
+def celda_desde_api(cell):
+    """Convierte un CellData de la API de Sheets en el diccionario de formato de la celda."""
+    valor = cell.get('formattedValue', '')
+    fmt = cell.get('effectiveFormat', {})
+    text_format = fmt.get('textFormat', {})
+
+    # Manejo de bordes (simplificado)
+    borders = {}
+    for side in ['top', 'bottom', 'left', 'right']:
+        border = fmt.get('borders', {}).get(side, {})
+        borders[side] = {
+            'style': border.get('style', 'NONE'),
+            'color': _color_hex(border.get('color'), 0)
+        }
+
+    return {
+        'value': valor,
+        'font': {
+            'bold': text_format.get('bold', False),
+            'size': text_format.get('fontSize', 11),
+            'color': _color_hex(text_format.get('foregroundColor'), 0),
+            'name': text_format.get('fontFamily', 'Calibri')
+        },
+        'background': _color_hex(fmt.get('backgroundColor'), 1),
+        'borders': borders,
+        'alignment': {
+            'horizontal': fmt.get('horizontalAlignment', 'LEFT').upper(),
+            'vertical': fmt.get('verticalAlignment', 'TOP').upper()
+        },
+        'text_format': {
+            'wrap': fmt.get('wrapStrategy') == 'WRAP',
+            'rotation': fmt.get('textRotation', {}).get('angle', 0)
+        }
+    }
+
+
+def grilla_desde_api(row_data, num_cols):
+    """Convierte el rowData de un GridData en la tabla (lista de filas) de create_table22."""
+    tabla = []
+    for row in row_data:
+        values = row.get('values', [])
+        tabla.append([celda_desde_api(values[i]) if i < len(values) else get_default_format()
+                      for i in range(num_cols)])
+    return tabla
+
+
+# Orden de los lados en los registros de formato y en los tcBorders de Word
+LADOS_BORDE = ('top', 'left', 'bottom', 'right')
+
+
+class FormatoCelda(namedtuple('FormatoCelda', [
+        'bold', 'size', 'color', 'name', 'background', 'borders',
+        'horizontal', 'vertical', 'wrap', 'rotation', 'color_rgb'])):
+    """
+    Formato de una celda como registro inmutable y hashable. `borders` es una tupla de
+    (estilo, color) en el orden de LADOS_BORDE y `color_rgb` es el color de la fuente ya
+    convertido con hex_to_rgb. Los registros se internan en GrillaCompacta.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def desde_diccionario(cls, cell_data):
+        font = cell_data['font']
+        borders = cell_data['borders']
+        return cls(
+            font['bold'], font['size'], font['color'], font['name'],
+            cell_data['background'],
+            tuple((borders[side]['style'], borders[side]['color']) for side in LADOS_BORDE),
+            cell_data['alignment']['horizontal'], cell_data['alignment']['vertical'],
+            cell_data['text_format']['wrap'], cell_data['text_format']['rotation'],
+            hex_to_rgb(font['color']),
+        )
+
+    def clave(self):
+        """Mismo valor que clave_formato del diccionario equivalente."""
+        return self[:10]
+
+    def a_diccionario(self, valor=''):
+        """Diccionario de celda como el de get_sheet_data2 (el orden de bordes es el de get_default_format)."""
+        bordes = dict(zip(LADOS_BORDE, self.borders))
+        return {
+            'value': valor,
+            'font': {'bold': self.bold, 'size': self.size, 'color': self.color, 'name': self.name},
+            'background': self.background,
+            'borders': {side: {'style': bordes[side][0], 'color': bordes[side][1]}
+                        for side in ('top', 'bottom', 'left', 'right')},
+            'alignment': {'horizontal': self.horizontal, 'vertical': self.vertical},
+            'text_format': {'wrap': self.wrap, 'rotation': self.rotation},
+        }
+
+
+FORMATO_PREDETERMINADO = FormatoCelda.desde_diccionario(get_default_format())
+
+
+class GrillaCompacta:
+    """
+    Tabla de Sheets en forma compacta: `valores` es una lista de filas de textos e `ids` una
+    lista de filas (array de enteros) con el índice de cada celda en `formatos`, la tabla de
+    registros FormatoCelda distintos. Cada formato se guarda una sola vez aunque lo usen miles
+    de celdas. create_table22 la acepta igual que la lista de diccionarios.
+    """
+    __slots__ = ('num_cols', 'valores', 'ids', 'formatos', '_indices')
+
+    def __init__(self, num_cols):
+        self.num_cols = num_cols
+        self.valores = []
+        self.ids = []
+        self.formatos = []
+        self._indices = {}
+
+    def id_formato(self, formato):
+        """Índice del formato en la tabla, agregándolo si es nuevo."""
+        indice = self._indices.get(formato)
+        if indice is None:
+            indice = self._indices[formato] = len(self.formatos)
+            self.formatos.append(formato)
+        return indice
+
+    def agregar_fila(self, valores, ids):
+        self.valores.append(list(valores))
+        self.ids.append(array('I', ids))
+
+    def __len__(self):
+        return len(self.valores)
+
+    def celda(self, fila, columna):
+        """Diccionario de la celda, como en la tabla de get_sheet_data2."""
+        return self.formatos[self.ids[fila][columna]].a_diccionario(self.valores[fila][columna])
+
+    def a_tabla(self):
+        """Convierte a la lista de filas de diccionarios de get_sheet_data2."""
+        return [[self.formatos[i].a_diccionario(valor) for valor, i in zip(valores, ids)]
+                for valores, ids in zip(self.valores, self.ids)]
+
+    @classmethod
+    def desde_tabla(cls, tabla, num_cols):
+        """Convierte una tabla de diccionarios (get_sheet_data2) en grilla compacta."""
+        grilla = cls(num_cols)
+        registros = {}
+        for fila in tabla:
+            ids = []
+            for cell_data in fila:
+                clave = clave_formato(cell_data)
+                formato = registros.get(clave)
+                if formato is None:
+                    formato = registros[clave] = FormatoCelda.desde_diccionario(cell_data)
+                ids.append(grilla.id_formato(formato))
+            grilla.agregar_fila([cell_data['value'] for cell_data in fila], ids)
+        return grilla
+
+    def a_json(self):
+        """Datos serializables (sin color_rgb, que se recalcula al leer)."""
+        return {'num_cols': self.num_cols, 'valores': self.valores,
+                'ids': [ids.tolist() for ids in self.ids],
+                'formatos': [list(formato[:-1]) for formato in self.formatos]}
+
+    @classmethod
+    def desde_json(cls, datos):
+        grilla = cls(datos['num_cols'])
+        for campos in datos['formatos']:
+            campos[5] = tuple(tuple(borde) for borde in campos[5])
+            grilla.id_formato(FormatoCelda(*campos, hex_to_rgb(campos[2])))
+        for valores, ids in zip(datos['valores'], datos['ids']):
+            grilla.agregar_fila(valores, ids)
+        return grilla
+
+
+def grilla_compacta_desde_api(row_data, num_cols):
+    """
+    Convierte el rowData de un GridData directamente en GrillaCompacta, sin crear un
+    diccionario por celda: cada effectiveFormat distinto se convierte una sola vez.
+    """
+    grilla = GrillaCompacta(num_cols)
+    por_formato = {}
+    for row in row_data:
+        values = row.get('values', [])
+        valores, ids = [], []
+        for i in range(num_cols):
+            if i >= len(values):
+                valores.append('')
+                ids.append(grilla.id_formato(FORMATO_PREDETERMINADO))
+                continue
+            cell = values[i]
+            fmt = cell.get('effectiveFormat', {})
+            # repr depende del orden de las claves; en el peor caso el formato se convierte dos
+            # veces y id_formato lo interna igual
+            clave = repr(fmt)
+            indice = por_formato.get(clave)
+            if indice is None:
+                formato = FormatoCelda.desde_diccionario(celda_desde_api({'effectiveFormat': fmt}))
+                indice = por_formato[clave] = grilla.id_formato(formato)
+            valores.append(cell.get('formattedValue', ''))
+            ids.append(indice)
+        grilla.agregar_fila(valores, ids)
+    return grilla
+
+
+def get_sheet_data2(sheets_service, sheet_id, sheet_name, start_row, end_row, start_col, end_col, compacta=False):
     """
     Extrae datos y TODOS los formatos de un rango específico de Google Sheets.
-    Devuelve una tabla (lista de filas) y el número de columnas.
+    Devuelve una tabla (lista de filas) y el número de columnas; con `compacta=True` la tabla
+    es una GrillaCompacta.
+    Para varios rangos del mismo libro conviene obtener_rangos_sheets (una sola petición).
     """
     start_col_letter = col_to_letter(start_col)
     end_col_letter = col_to_letter(end_col)
@@ -64,119 +285,253 @@ def get_sheet_data2(sheets_service, sheet_id, sheet_name, start_row, end_row, st
 
         grid_data = sheet_response['sheets'][0]['data'][0].get('rowData', [])
         num_cols = end_col - start_col + 1
-        tabla = []
-
-        for row in grid_data:
-            fila = []
-            values = row.get('values', [])
-            
-            for i in range(num_cols):
-                if i < len(values):
-                    cell = values[i]
-                    valor = cell.get('formattedValue', '')
-                    fmt = cell.get('effectiveFormat', {})
-                    
-                    # Extracción de formato de texto
-                    text_format = fmt.get('textFormat', {})
-                    text_runs = cell.get('textFormatRuns', [])
-                    
-                    # Extracción de formato de celda
-                    background = fmt.get('backgroundColor', {}).get('rgbColor', {}).get('red', 1)
-                    bg_color = f"#{int(background.get('red', 1)*255):02x}{int(background.get('green', 1)*255):02x}{int(background.get('blue', 1)*255):02x}"
-                    
-                    # Manejo de bordes (simplificado)
-                    borders = {}
-                    for side in ['top', 'bottom', 'left', 'right']:
-                        border = fmt.get('borders', {}).get(side, {})
-                        borders[side] = {
-                            'style': border.get('style', 'NONE'),
-                            'color': f"#{int(border.get('color', {}).get('red', 0)*255):02x}"
-                                          f"{int(border.get('color', {}).get('green', 0)*255):02x}"
-                                          f"{int(border.get('color', {}).get('blue', 0)*255):02x}"
-                        }
-                    
-                    fila.append({
-                        'value': valor,
-                        'font': {
-                            'bold': text_format.get('bold', False),
-                            'size': text_format.get('fontSize', 11),
-                            'color': f"#{int(text_format.get('foregroundColor', {}).get('red', 0)*255):02x}"
-                                      f"{int(text_format.get('foregroundColor', {}).get('green', 0)*255):02x}"
-                                      f"{int(text_format.get('foregroundColor', {}).get('blue', 0)*255):02x}",
-                            'name': text_format.get('fontFamily', 'Calibri')
-                        },
-                        'background': bg_color,
-                        'borders': borders,
-                        'alignment': {
-                            'horizontal': fmt.get('horizontalAlignment', 'LEFT').upper(),
-                            'vertical': fmt.get('verticalAlignment', 'TOP').upper()
-                        },
-                        'text_format': {
-                            'wrap': fmt.get('wrapStrategy') == 'WRAP',
-                            'rotation': fmt.get('textRotation', {}).get('angle', 0)
-                        }
-                    })
-                else:
-                    fila.append(get_default_format())
-                    
-            tabla.append(fila)
-            
-        return tabla, num_cols
+        if compacta:
+            return grilla_compacta_desde_api(grid_data, num_cols), num_cols
+        return grilla_desde_api(grid_data, num_cols), num_cols
         
     except Exception as e:
         print(f"Error al obtener datos de Sheets: {str(e)}")
         # Devuelve tabla vacía con formato predeterminado
-        return [[get_default_format() for _ in range(end_col - start_col + 1)] 
-                for _ in range(end_row - start_row + 1)], end_col - start_col + 1
+        num_cols = end_col - start_col + 1
+        if compacta:
+            grilla = GrillaCompacta(num_cols)
+            predeterminado = grilla.id_formato(FORMATO_PREDETERMINADO)
+            for _ in range(end_row - start_row + 1):
+                grilla.agregar_fila([''] * num_cols, [predeterminado] * num_cols)
+            return grilla, num_cols
+        return [[get_default_format() for _ in range(num_cols)] 
+                for _ in range(end_row - start_row + 1)], num_cols
+
+
+def notacion_rango(sheet_name, start_row, end_row, start_col, end_col):
+    """Notación A1 del rango, con el nombre de la hoja entre comillas si hace falta."""
+    hoja = sheet_name if re.fullmatch(r"\w+", sheet_name) else "'" + sheet_name.replace("'", "''") + "'"
+    return f"{hoja}!{col_to_letter(start_col)}{start_row}:{col_to_letter(end_col)}{end_row}"
+
+
+def obtener_revision(drive_service, sheet_id):
+    """Versión actual del archivo en Drive (cambia con cada edición del libro)."""
+    return drive_service.files().get(fileId=sheet_id, fields="version").execute()["version"]
+
+
+def _ruta_cache_sheets(cache_dir, sheet_id, rango, revision=None):
+    base = hashlib.sha1(f"{sheet_id}|{rango}".encode("utf-8")).hexdigest()
+    if revision is None:
+        return os.path.join(cache_dir, base)
+    return os.path.join(cache_dir, f"{base}_{hashlib.sha1(str(revision).encode('utf-8')).hexdigest()[:16]}.json")
+
+
+def _leer_cache_sheets(cache_dir, sheet_id, rango, revision):
+    ruta = _ruta_cache_sheets(cache_dir, sheet_id, rango, revision)
+    try:
+        with open(ruta, encoding="utf-8") as archivo:
+            datos = json.load(archivo)
+        return GrillaCompacta.desde_json(datos["grilla"])
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _guardar_cache_sheets(cache_dir, sheet_id, rango, revision, grilla):
+    """Guarda la respuesta de un rango y borra las de revisiones anteriores del mismo rango."""
+    os.makedirs(cache_dir, exist_ok=True)
+    ruta = _ruta_cache_sheets(cache_dir, sheet_id, rango, revision)
+    prefijo = os.path.basename(_ruta_cache_sheets(cache_dir, sheet_id, rango)) + "_"
+    for nombre in os.listdir(cache_dir):
+        if nombre.startswith(prefijo) and nombre != os.path.basename(ruta):
+            os.remove(os.path.join(cache_dir, nombre))
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as archivo:
+        json.dump({"sheet_id": sheet_id, "rango": rango, "revision": revision,
+                   "grilla": grilla.a_json()}, archivo)
+    os.replace(temporal, ruta)
+
+
+def obtener_rangos_sheets(sheets_service, sheet_id, rangos, revision=None, cache_dir=None, compacta=False):
+    """
+    Extrae datos y formatos de varios rangos de un mismo libro de Google Sheets con una sola
+    petición spreadsheets().get. `rangos` es una lista de
+    (sheet_name, start_row, end_row, start_col, end_col); devuelve una lista de (tabla, num_cols)
+    en el mismo orden; con `compacta=True` cada tabla es una GrillaCompacta.
+
+    Si se indican `cache_dir` y `revision` (por ejemplo obtener_revision(drive_service, sheet_id))
+    cada rango se guarda en disco con la clave (libro, rango, revisión) y solo se piden a la API
+    los rangos que no están guardados para la revisión actual. Sin `revision` no se puede saber
+    si el libro cambió, así que siempre se consulta la API. En disco se guarda la forma compacta.
+    A diferencia de get_sheet_data2, un error de la API se propaga en lugar de devolver tablas vacías.
+    """
+    notaciones = [notacion_rango(*rango) for rango in rangos]
+    resultados = {}
+
+    usar_cache = cache_dir is not None and revision is not None
+    if usar_cache:
+        for notacion in notaciones:
+            guardado = _leer_cache_sheets(cache_dir, sheet_id, notacion, revision)
+            if guardado is not None:
+                resultados[notacion] = guardado
+
+    pendientes = []
+    for rango, notacion in zip(rangos, notaciones):
+        if notacion not in resultados and notacion not in (n for _, n in pendientes):
+            pendientes.append((rango, notacion))
+
+    if pendientes:
+        try:
+            respuesta = sheets_service.spreadsheets().get(
+                spreadsheetId=sheet_id,
+                ranges=[notacion for _, notacion in pendientes],
+                includeGridData=True,
+                fields="sheets(properties(title),data(startRow,startColumn,"
+                       "rowData(values(formattedValue,effectiveFormat,textFormatRuns))))"
+            ).execute()
+        except Exception as e:
+            print(f"Error al obtener datos de Sheets: {str(e)}")
+            raise
+
+        # La API agrupa los GridData por hoja; cada uno indica su fila y columna inicial (0-based)
+        datos_por_inicio = {}
+        for hoja in respuesta.get('sheets', []):
+            titulo = hoja.get('properties', {}).get('title')
+            for grid in hoja.get('data', []):
+                clave = (titulo, grid.get('startRow', 0), grid.get('startColumn', 0))
+                datos_por_inicio.setdefault(clave, []).append(grid.get('rowData', []))
+
+        for (sheet_name, start_row, end_row, start_col, end_col), notacion in pendientes:
+            grids = datos_por_inicio.get((sheet_name, start_row - 1, start_col - 1))
+            if not grids:
+                raise ValueError(f"La respuesta de Sheets no incluye el rango {notacion}.")
+            grilla = grilla_compacta_desde_api(grids.pop(0), end_col - start_col + 1)
+            resultados[notacion] = grilla
+            if usar_cache:
+                _guardar_cache_sheets(cache_dir, sheet_id, notacion, revision, grilla)
+
+    return [(grilla if compacta else grilla.a_tabla(), grilla.num_cols)
+            for grilla in (resultados[notacion] for notacion in notaciones)]
     
 
-def create_table22(table, num_cols, document):
+def clave_formato(cell_data):
+    """
+    Clave hashable con todo el formato de una celda (sin el valor). Las celdas con la
+    misma clave comparten la plantilla XML en create_table22.
+    """
+    font = cell_data['font']
+    borders = cell_data['borders']
+    return (
+        font['bold'], font['size'], font['color'], font['name'],
+        cell_data['background'],
+        tuple((borders[side]['style'], borders[side]['color']) for side in ('top', 'left', 'bottom', 'right')),
+        cell_data['alignment']['horizontal'], cell_data['alignment']['vertical'],
+        cell_data['text_format']['wrap'], cell_data['text_format']['rotation'],
+    )
+
+
+def construir_plantilla_celda(cell_data):
+    """
+    Construye una vez el w:tc de un formato: tcPr (fondo, bordes, ajuste y alineación vertical)
+    y un párrafo con su pPr y un run con su rPr, sin texto. Usa apply_cell_formatting y las
+    mismas propiedades de python-docx que se aplicaban celda por celda.
+    `cell_data` puede ser el diccionario de la celda o un FormatoCelda.
+    """
+    if isinstance(cell_data, FormatoCelda):
+        formato, cell_data = cell_data, cell_data.a_diccionario()
+    else:
+        formato = FormatoCelda.desde_diccionario(cell_data)
+
+    tc = OxmlElement('w:tc')
+    cell = _Cell(tc, None)
+    apply_cell_formatting(cell, cell_data)
+
+    p = Paragraph(tc.add_p(), cell)
+    run = p.add_run()
+    run.font.bold = formato.bold
+    run.font.size = Pt(formato.size)
+    run.font.color.rgb = formato.color_rgb
+    run.font.name = formato.name
+
+    p.alignment = map_alineacion(formato.horizontal)
+    if formato.rotation not in [0, 180, 270]:
+        text_direction = OxmlElement('w:textDirection')
+        text_direction.set(qn('w:val'), 'btLr')  # Bottom-to-top, left-to-right
+        p._p.get_or_add_pPr().append(text_direction)
+    return tc
+
+
+def _escribir_valor(r, valor):
+    """Pone el texto en el run (w:t directo salvo tabulaciones o saltos de línea)."""
+    if not valor:
+        return
+    if '\t' in valor or '\n' in valor or '\r' in valor:
+        r.text = valor
+        return
+    t = OxmlElement('w:t')
+    t.text = valor
+    if len(valor.strip()) < len(valor):
+        t.set(qn('xml:space'), 'preserve')
+    r.append(t)
+
+
+def _plantilla(plantillas, clave, formato):
+    plantilla = plantillas.get(clave)
+    if plantilla is None:
+        plantilla = plantillas[clave] = construir_plantilla_celda(formato)
+    return plantilla
+
+
+def _celdas_con_plantilla(table, plantillas):
+    """Por cada fila, la lista de (valor, plantilla w:tc) de sus celdas."""
+    if isinstance(table, GrillaCompacta):
+        # Con la grilla compacta la plantilla se busca una vez por id de formato, no por celda
+        por_id = [None] * len(table.formatos)
+        for valores, ids in zip(table.valores, table.ids):
+            fila = []
+            for valor, i in zip(valores, ids):
+                plantilla = por_id[i]
+                if plantilla is None:
+                    formato = table.formatos[i]
+                    plantilla = por_id[i] = _plantilla(plantillas, formato.clave(), formato)
+                fila.append((valor, plantilla))
+            yield fila
+    else:
+        for fila in table:
+            yield [(cell_data['value'], _plantilla(plantillas, clave_formato(cell_data), cell_data))
+                   for cell_data in fila]
+
+
+def create_table22(table, num_cols, document, plantillas=None):
     """
-    Crea una tabla en Word con todos los formatos extraídos de Google Sheets
+    Crea una tabla en Word con todos los formatos extraídos de Google Sheets.
+    `table` es la lista de filas de diccionarios de get_sheet_data2 o una GrillaCompacta.
+    El XML de cada formato distinto se construye una sola vez (ver clave_formato) y se copia
+    en cada celda que lo usa; `plantillas` permite reutilizar ese caché entre varias tablas.
     """
     try:
         # Crear tabla básica
         doc_table = document.add_table(rows=len(table), cols=num_cols)
         doc_table.style = 'Table Grid'
         doc_table.alignment = WD_TABLE_ALIGNMENT.LEFT
-        
+
         # Configuración de layout fijo
         tbl = doc_table._tbl
         tblPr = tbl.tblPr
         tblLayout = OxmlElement('w:tblLayout')
         tblLayout.set(qn('w:type'), 'fixed')
         tblPr.append(tblLayout)
-        
-        # Rellenar tabla con datos y formato
-        for i, fila in enumerate(table):
-            for j, cell_data in enumerate(fila):
-                cell = doc_table.cell(i, j)
-                cell.text = ""
-                
-                # Aplicar formato de celda
-                apply_cell_formatting(cell, cell_data)
-                
-                # Añadir texto con formato
-                p = cell.paragraphs[0]
-                run = p.add_run(cell_data['value'])
-                
-                # Aplicar formato de texto
-                run.font.bold = cell_data['font']['bold']
-                run.font.size = Pt(cell_data['font']['size'])
-                run.font.color.rgb = hex_to_rgb(cell_data['font']['color'])
-                run.font.name = cell_data['font']['name']
-                
-                # Aplicar alineación
-                p.alignment = map_alineacion(cell_data['alignment']['horizontal'])
-                
-                # Aplicar rotación de texto (si está soportada)
-                if cell_data['text_format']['rotation'] not in [0, 180, 270]:
-                    text_direction = OxmlElement('w:textDirection')
-                    text_direction.set(qn('w:val'), 'btLr')  # Bottom-to-top, left-to-right
-                    p._p.get_or_add_pPr().append(text_direction)
-        
+
+        if plantillas is None:
+            plantillas = {}
+
+        # Rellenar tabla con datos y formato, fila por fila sobre el XML
+        for tr, fila in zip(tbl.tr_lst, _celdas_con_plantilla(table, plantillas)):
+            for tc, (valor, plantilla) in zip(list(tr.tc_lst), fila):
+                nueva = deepcopy(plantilla)
+                # Conservar el ancho (tcW) que add_table asignó a la celda
+                tcW = tc.tcPr.tcW if tc.tcPr is not None else None
+                if tcW is not None:
+                    nueva.tcPr.insert(0, tcW)
+                _escribir_valor(nueva.p_lst[0].r_lst[0], valor)
+                tr.replace(tc, nueva)
+
         return doc_table
-        
+
     except Exception as e:
         print(f"Error al crear tabla en Word: {str(e)}")
         raise
@@ -1,65 +1,46 @@
-import sqlite3
+from config_store import DB_NAME, obtener_store
 
 
-DB_NAME = "configuraciones.db"
+# Funciones de siempre sobre el almacén compartido (config_store): una conexión por hilo
+# en modo WAL, con la base junto al código en lugar de relativa al directorio de trabajo.
 
 def inicializar_base_datos():
-    conn = sqlite3.connect('configuraciones.db')
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS configuraciones_tablas (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            excel_file TEXT NOT NULL,
-            sheet_name TEXT NOT NULL,
-            excel_range TEXT NOT NULL,
-            word_file TEXT NOT NULL,
-            table_label TEXT NOT NULL,
-            output_file TEXT,
-            money_columns TEXT,      -- nuevo campo: ej. "1,2"
-            header_rows INTEGER      -- nuevo campo: ej. 1
-        )
-    ''')
-    conn.commit()
-    conn.close()
+    """Abre la base y aplica las migraciones pendientes del esquema."""
+    obtener_store().migrar()
 
 def eliminar_configuracion(id_config):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute('DELETE FROM configuraciones_tablas WHERE id=?', (id_config,))
-    conn.commit()
-    conn.close()
-
-
-def guardar_configuracion(excel_file, sheet_name, excel_range, word_file, table_label, output_file=None, money_columns=None, header_rows=None):
-    conn = sqlite3.connect('configuraciones.db')
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO configuraciones_tablas (excel_file, sheet_name, excel_range, word_file, table_label, output_file, money_columns, header_rows)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (excel_file, sheet_name, excel_range, word_file, table_label, output_file, money_columns, header_rows))
-    conn.commit()
-    conn.close()
-
-
-def obtener_configuraciones():
-    conn = sqlite3.connect('configuraciones.db')
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM configuraciones_tablas')
-    configs = cursor.fetchall()
-    conn.close()
-    return configs
-
-
-def actualizar_configuracion(id_config, excel_file, sheet_name, excel_range, word_file, table_label, output_file=None, money_columns=None, header_rows=None):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute('''
-        UPDATE configuraciones_tablas
-        SET excel_file=?, sheet_name=?, excel_range=?, word_file=?, table_label=?, output_file=?, money_columns=?, header_rows=?
-        WHERE id=?
-    ''', (excel_file, sheet_name, excel_range, word_file, table_label, output_file, money_columns, header_rows, id_config))
-    conn.commit()
-    conn.close()
+    obtener_store().eliminar(id_config)
 
 
+def guardar_configuracion(excel_file, sheet_name, excel_range, word_file, table_label, output_file=None, money_columns=None, header_rows=None, report=None, enabled=True):
+    return obtener_store().insertar(
+        (excel_file, sheet_name, excel_range, word_file, table_label, output_file, money_columns, header_rows,
+         report, 1 if enabled else 0))
 
+
+def obtener_configuraciones(report=None, excel_file=None, word_file=None, habilitadas=None, ids=None):
+    """Configuraciones (id, *CAMPOS); los filtros son opcionales y usan los índices de la tabla."""
+    return obtener_store().listar(report=report, excel_file=excel_file, word_file=word_file, ids=ids,
+                                  habilitadas=habilitadas)
+
+
+def obtener_reportes():
+    """Informes/proyectos con configuraciones guardadas."""
+    return obtener_store().reportes()
+
+
+def obtener_hashes(ids=None):
+    """Devuelve {id: (range_hash, table_hash)} de la última actualización de cada configuración (o solo de `ids`)."""
+    return obtener_store().obtener_hashes(ids)
+
+
+def guardar_hashes(hashes):
+    """Guarda los hashes de varias configuraciones. `hashes` es una lista de (id, range_hash, table_hash)."""
+    obtener_store().guardar_hashes(hashes)
+
+
+def actualizar_configuracion(id_config, excel_file, sheet_name, excel_range, word_file, table_label, output_file=None, money_columns=None, header_rows=None, report=None, enabled=True):
+    obtener_store().actualizar(
+        id_config,
+        (excel_file, sheet_name, excel_range, word_file, table_label, output_file, money_columns, header_rows,
+         report, 1 if enabled else 0))
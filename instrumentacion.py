@@ -0,0 +1,111 @@
+"""
+Instrumentación del proceso Excel -> Word.
+
+procesar_grupo registra en cada resultado el tiempo de cada etapa ('etapas'), las celdas
+escritas y, por documento, el tiempo de apertura y guardado y los bytes guardados
+('guardado'). Este módulo convierte esos resultados en un reporte JSON o CSV y en una
+tabla resumen, y ofrece un perfil opcional con cProfile para buscar regresiones.
+"""
+import cProfile
+import csv
+import io
+import json
+import pstats
+from contextlib import contextmanager
+from datetime import datetime
+
+# Etapas por configuración, en el orden en que ocurren
+ETAPAS = (
+    "resolver_rango", "read_excel_table", "renderizar_valores", "buscar_etiqueta",
+    "ajustar_tabla_word", "update_table_cells", "hash",
+)
+# Etapas por documento
+ETAPAS_DOCUMENTO = ("abrir_documento", "doc_save")
+
+
+def _documentos(resultados):
+    """{documento: datos de apertura/guardado} sin repetir los documentos con varias tablas."""
+    documentos = {}
+    for resultado in resultados:
+        if resultado.get("documento") and resultado.get("guardado"):
+            documentos.setdefault(resultado["documento"], resultado["guardado"])
+    return documentos
+
+
+def totales_por_etapa(resultados):
+    """Suma el tiempo de cada etapa en todo el lote (las de documento se cuentan una vez por documento)."""
+    totales = {etapa: 0.0 for etapa in ETAPAS + ETAPAS_DOCUMENTO}
+    for resultado in resultados:
+        for etapa, segundos in resultado.get("etapas", {}).items():
+            totales[etapa] = totales.get(etapa, 0.0) + segundos
+    for guardado in _documentos(resultados).values():
+        for etapa in ETAPAS_DOCUMENTO:
+            totales[etapa] += guardado.get(etapa, 0.0)
+    return totales
+
+
+def tabla_resumen(resultados):
+    """Texto con el tiempo total y el porcentaje de cada etapa, más celdas escritas y bytes guardados."""
+    totales = totales_por_etapa(resultados)
+    total = sum(totales.values()) or 1.0
+    lineas = [f"{'etapa':<28} | {'segundos':>9} | {'%':>6}", "-" * 49]
+    for etapa, segundos in totales.items():
+        if segundos:
+            lineas.append(f"{etapa:<28} | {segundos:>9.4f} | {100 * segundos / total:>5.1f}%")
+    lineas.append("-" * 49)
+    lineas.append(f"{'total':<28} | {sum(totales.values()):>9.4f} |")
+
+    documentos = _documentos(resultados)
+    ok = sum(1 for r in resultados if r["ok"])
+    lineas.append(f"Configuraciones: {len(resultados)} ({ok} correctas, {len(resultados) - ok} con error)")
+    lineas.append(f"Celdas escritas: {sum(r.get('celdas_escritas', 0) for r in resultados)}")
+    lineas.append(f"Documentos guardados: {sum(1 for g in documentos.values() if 'doc_save' in g)}, "
+                  f"bytes guardados: {sum(g.get('bytes_guardados', 0) for g in documentos.values())}")
+    return "\n".join(lineas)
+
+
+def escribir_reporte(resultados, ruta, duracion_total=None):
+    """
+    Guarda el reporte de la ejecución: CSV (una fila por configuración, una columna por etapa)
+    si `ruta` termina en .csv, o JSON con los resultados completos, los totales y los documentos.
+    """
+    if str(ruta).lower().endswith(".csv"):
+        columnas = (["id", "ok", "omitida", "cancelada", "error", "documento", "duracion", "celdas_escritas"]
+                    + list(ETAPAS) + list(ETAPAS_DOCUMENTO) + ["bytes_guardados"])
+        with open(ruta, "w", newline="", encoding="utf-8") as archivo:
+            writer = csv.DictWriter(archivo, fieldnames=columnas, extrasaction="ignore")
+            writer.writeheader()
+            for resultado in resultados:
+                fila = {**resultado, **resultado.get("etapas", {}), **resultado.get("guardado", {})}
+                writer.writerow(fila)
+        return
+
+    reporte = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "duracion_total": duracion_total,
+        "totales_por_etapa": totales_por_etapa(resultados),
+        "documentos": _documentos(resultados),
+        "resultados": [{k: v for k, v in r.items() if k != "guardado"} for r in resultados],
+    }
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        json.dump(reporte, archivo, indent=2, ensure_ascii=False)
+
+
+@contextmanager
+def perfilar(ruta=None, lineas=25):
+    """
+    Ejecuta el bloque bajo cProfile. Si se indica `ruta` guarda las estadísticas
+    (se pueden abrir con pstats o snakeviz) y siempre imprime las `lineas` funciones
+    con mayor tiempo acumulado. Solo perfila el proceso actual.
+    """
+    perfil = cProfile.Profile()
+    perfil.enable()
+    try:
+        yield perfil
+    finally:
+        perfil.disable()
+        if ruta:
+            perfil.dump_stats(ruta)
+        salida = io.StringIO()
+        pstats.Stats(perfil, stream=salida).sort_stats("cumulative").print_stats(lineas)
+        print(salida.getvalue())
@@ -0,0 +1,79 @@
+"""
+Servicios falsos de Google Sheets y Drive (sin red) para las pruebas y el benchmark de
+obtener_rangos_sheets.
+
+FakeSheetsService imita spreadsheets().get(...).execute() con includeGridData: genera
+celdas con valores y formatos deterministas para cualquier rango, simula la latencia de
+cada petición y registra las peticiones en `peticiones`. FakeDriveService devuelve la
+versión (revisión) del libro.
+"""
+import re
+import time
+
+
+def _columna(letras):
+    n = 0
+    for letra in letras:
+        n = n * 26 + ord(letra) - 64
+    return n
+
+
+class _Peticion:
+    def __init__(self, funcion):
+        self._funcion = funcion
+
+    def execute(self):
+        return self._funcion()
+
+
+class FakeSheetsService:
+    def __init__(self, latencia=0.0):
+        self.latencia = latencia
+        self.peticiones = []
+
+    def spreadsheets(self):
+        return self
+
+    def get(self, spreadsheetId, ranges, includeGridData=False, fields=None):
+        return _Peticion(lambda: self._responder(spreadsheetId, ranges))
+
+    def _celda(self, fila, columna):
+        return {
+            'formattedValue': f"{fila}-{columna}",
+            'effectiveFormat': {
+                'backgroundColor': {'red': 1, 'green': 1 - 0.1 * (fila % 3), 'blue': 1},
+                'textFormat': {'bold': fila == 0, 'fontSize': 10, 'fontFamily': 'Arial',
+                               'foregroundColor': {'blue': 0.5} if columna % 2 else {}},
+                'borders': {'top': {'style': 'SOLID', 'color': {}}},
+                'horizontalAlignment': 'RIGHT' if columna else 'LEFT',
+                'verticalAlignment': 'MIDDLE',
+            },
+        }
+
+    def _responder(self, spreadsheet_id, ranges):
+        time.sleep(self.latencia)
+        self.peticiones.append((spreadsheet_id, list(ranges)))
+        hojas = {}
+        for rango in ranges:
+            hoja, c1, f1, c2, f2 = re.fullmatch(r"'?(.+?)'?!([A-Z]+)(\d+):([A-Z]+)(\d+)", rango).groups()
+            f1, f2, c1, c2 = int(f1) - 1, int(f2) - 1, _columna(c1) - 1, _columna(c2) - 1
+            grid = {'rowData': [{'values': [self._celda(f, c) for c in range(c1, c2 + 1)]}
+                                for f in range(f1, f2 + 1)]}
+            # La API omite los campos en 0
+            if f1:
+                grid['startRow'] = f1
+            if c1:
+                grid['startColumn'] = c1
+            hojas.setdefault(hoja, []).append(grid)
+        return {'sheets': [{'properties': {'title': hoja}, 'data': datos} for hoja, datos in hojas.items()]}
+
+
+class FakeDriveService:
+    def __init__(self, version="1"):
+        self.version = version
+
+    def files(self):
+        return self
+
+    def get(self, fileId, fields=None):
+        return _Peticion(lambda: {'version': self.version})
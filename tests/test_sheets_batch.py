@@ -0,0 +1,66 @@
+"""
+Pruebas de obtener_rangos_sheets con los servicios falsos de tests/fake_sheets.py:
+una sola petición por libro, caché en disco por revisión y pedido solo de los rangos nuevos.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from functions_back import get_sheet_data2, obtener_rangos_sheets, obtener_revision
+from tests.fake_sheets import FakeDriveService, FakeSheetsService
+
+RANGOS = [("DATOS" if k % 2 else "Resumen 2025", 2 + 20 * k, 16 + 20 * k, 2, 8) for k in range(5)]
+
+
+@pytest.fixture
+def drive():
+    return FakeDriveService("1")
+
+
+def test_un_solo_batch_get_por_libro():
+    individuales = [get_sheet_data2(FakeSheetsService(), "libro", *rango) for rango in RANGOS]
+    sheets = FakeSheetsService()
+
+    lote = obtener_rangos_sheets(sheets, "libro", RANGOS)
+
+    assert len(sheets.peticiones) == 1
+    assert len(sheets.peticiones[0][1]) == len(RANGOS)
+    assert lote == individuales
+
+
+def test_misma_revision_se_lee_de_la_cache(tmp_path, drive):
+    sheets = FakeSheetsService()
+    lote = obtener_rangos_sheets(sheets, "libro", RANGOS, obtener_revision(drive, "libro"), str(tmp_path))
+
+    en_cache = obtener_rangos_sheets(sheets, "libro", RANGOS, obtener_revision(drive, "libro"), str(tmp_path))
+
+    assert len(sheets.peticiones) == 1
+    assert en_cache == lote
+
+
+def test_revision_nueva_vuelve_a_pedir_los_rangos(tmp_path, drive):
+    sheets = FakeSheetsService()
+    obtener_rangos_sheets(sheets, "libro", RANGOS, obtener_revision(drive, "libro"), str(tmp_path))
+
+    drive.version = "2"
+    obtener_rangos_sheets(sheets, "libro", RANGOS, obtener_revision(drive, "libro"), str(tmp_path))
+
+    assert len(sheets.peticiones) == 2
+    assert len(sheets.peticiones[-1][1]) == len(RANGOS)
+    assert len(os.listdir(tmp_path)) == len(RANGOS)  # sin archivos de la revisión anterior
+
+
+def test_rango_nuevo_pide_solo_ese_rango(tmp_path, drive):
+    sheets = FakeSheetsService()
+    obtener_rangos_sheets(sheets, "libro", RANGOS, obtener_revision(drive, "libro"), str(tmp_path))
+
+    nuevo = ("DATOS", 500, 510, 1, 3)
+    obtener_rangos_sheets(sheets, "libro", RANGOS + [nuevo], obtener_revision(drive, "libro"), str(tmp_path))
+
+    assert len(sheets.peticiones) == 2
+    assert len(sheets.peticiones[-1][1]) == 1
@@ -1,46 +1,214 @@
-from Functions_Backs import update_word_table_from_excel,main
-from functios_database import inicializar_base_datos,guardar_configuracion,actualizar_configuracion,obtener_configuraciones,eliminar_configuracion
+from batch_engine import procesar_lote, procesar_guardadas
+from config_store import CAMPOS, obtener_store
+from functios_database import inicializar_base_datos,obtener_configuraciones,obtener_reportes
 
 import sys
-import sqlite3
+import threading
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QLabel, QLineEdit, QPushButton, QFileDialog,
     QVBoxLayout, QHBoxLayout, QMessageBox, QGroupBox, QFormLayout, QTableWidget,
-    QTableWidgetItem, QHeaderView
+    QTableWidgetItem, QHeaderView, QProgressBar, QDialog, QComboBox, QCheckBox, QTableView,
+    QAbstractItemView
 )
-from PyQt5.QtGui import QFont
-from PyQt5.QtCore import Qt
-
-
-
-def actualizar_todas_las_tablas():
-    configs = obtener_configuraciones()
-    for config in configs:
-        id_, excel_file, sheet_name, excel_range, word_file, table_label, output_file, money_columns_str, header_rows = config
+from PyQt5.QtGui import QFont, QColor
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+
+
+
+def precargar_procesamiento():
+    """
+    Importa lo que usa la actualización (python-docx, pandas, numpy, openpyxl), que batch_engine
+    y Functions_Backs cargan recién al procesar. Se llama en segundo plano con la ventana ya
+    visible, para que el primer "Actualizar" no espere esas importaciones.
+    """
+    import Functions_Backs  # python-docx y lxml
+    import excel_cache  # openpyxl
+    import pandas
+    import numpy
+
+
+def actualizar_todas_las_tablas(forzar=False, workers=1, reporte=None, perfil=None, report=None, excel_file=None):
+    """
+    Actualiza todas las tablas habilitadas; cada documento se abre y se guarda una sola vez.
+    Con `report` solo las del informe/proyecto indicado y con `excel_file` solo las que leen ese libro.
+    Las tablas cuyo rango de Excel no cambió desde la última ejecución se omiten (forzar=True las regenera).
+    Con workers > 1 (o None para todos los núcleos) los documentos independientes se procesan en paralelo.
+    `reporte` (ruta .json/.csv) guarda los tiempos por etapa y `perfil` (ruta .prof) activa cProfile.
+    """
+    return procesar_guardadas(report=report, excel_file=excel_file, forzar=forzar, workers=workers,
+                              reporte=reporte, perfil=perfil)
+
+
+class ActualizacionWorker(QThread):
+    """Ejecuta el lote de actualización fuera del hilo de la interfaz."""
+    iniciado = pyqtSignal(int)            # total de configuraciones
+    config_terminada = pyqtSignal(object)  # resultado de una configuración
+    terminado = pyqtSignal(list)           # resultados de todo el lote
+    fallo = pyqtSignal(str)
+
+    def __init__(self, forzar=False, workers=1, report=None, parent=None):
+        super().__init__(parent)
+        self.forzar = forzar
+        self.workers = workers
+        self.report = report
+
+    def run(self):
         try:
-            print(f"Actualizando tabla ID {id_}...")
-            update_word_table_from_excel(excel_file, sheet_name, excel_range, word_file, table_label, output_file)
-            print(f"Tabla ID {id_} actualizada correctamente.")
-
-            # money_columns_str viene de la base de datos (ej. "1,2,3")
-            if money_columns_str:
-                money_columns = [int(x.strip()) - 1 for x in money_columns_str.split(",") if x.strip().isdigit()]
+            configs = obtener_configuraciones(report=self.report, habilitadas=True)
+            self.iniciado.emit(len(configs))
+            resultados = procesar_lote(configs, incremental=True, forzar=self.forzar, workers=self.workers,
+                                       progreso=self.config_terminada.emit,
+                                       cancelado=self.isInterruptionRequested)
+            self.terminado.emit(resultados)
+        except Exception as e:
+            self.fallo.emit(str(e))
+
+
+class ConfiguracionesModel(QAbstractTableModel):
+    """
+    Configuraciones guardadas para un QTableView, leídas del almacén por páginas a medida que
+    la vista las necesita (canFetchMore/fetchMore). Agregar, editar o eliminar escribe en el
+    almacén y avisa solo la fila afectada, sin recargar la tabla. Ordenar y filtrar se hace
+    con un QSortFilterProxyModel (Qt.UserRole devuelve el valor sin formato para ordenar).
+    """
+    COLUMNAS = [
+        ("excel_file", "Excel"), ("sheet_name", "Hoja"), ("excel_range", "Rango"), ("word_file", "Word"),
+        ("table_label", "Etiqueta"), ("output_file", "Salida"), ("money_columns", "Formato columnas"),
+        ("header_rows", "n filas encabezado"), ("report", "Informe"), ("enabled", "Habilitada"),
+    ]
+    LOTE = 200
+
+    def __init__(self, store=None, parent=None):
+        super().__init__(parent)
+        self.store = store or obtener_store()
+        self._posiciones = [CAMPOS.index(campo) + 1 for campo, _ in self.COLUMNAS]
+        self._filas = []
+        self._completo = False
+
+    # --- Lectura ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._filas)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNAS)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._completo
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._completo:
+            return
+        ultimo = self._filas[-1][0] if self._filas else None
+        nuevas = self.store.listar(despues_de=ultimo, limite=self.LOTE)
+        self._completo = len(nuevas) < self.LOTE
+        if nuevas:
+            self.beginInsertRows(QModelIndex(), len(self._filas), len(self._filas) + len(nuevas) - 1)
+            self._filas.extend(nuevas)
+            self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        campo = self.COLUMNAS[index.column()][0]
+        valor = self._filas[index.row()][self._posiciones[index.column()]]
+        if role == Qt.UserRole:
+            return valor
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            if campo == "enabled":
+                return "Sí" if valor else "No"
+            return "" if valor is None else str(valor)
+        if role == Qt.ForegroundRole and not self._filas[index.row()][CAMPOS.index("enabled") + 1]:
+            return QColor("#9E9E9E")
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNAS[section][1]
+        return super().headerData(section, orientation, role)
+
+    def id_en_fila(self, fila):
+        return self._filas[fila][0]
+
+    def config_en_fila(self, fila):
+        """{campo: valor} de la configuración de la fila."""
+        return dict(zip(CAMPOS, self._filas[fila][1:]))
+
+    # --- Escritura ---
+
+    def agregar(self, config):
+        """Guarda una configuración nueva. Si ya se leyó todo se agrega al final; si no, llega con fetchMore."""
+        id_config = self.store.insertar(config)
+        if self._completo:
+            fila = len(self._filas)
+            self.beginInsertRows(QModelIndex(), fila, fila)
+            self._filas.append(self.store.obtener(id_config))
+            self.endInsertRows()
+        return id_config
+
+    def actualizar(self, fila, config):
+        self.store.actualizar(self.id_en_fila(fila), config)
+        self._filas[fila] = self.store.obtener(self.id_en_fila(fila))
+        self.dataChanged.emit(self.index(fila, 0), self.index(fila, len(self.COLUMNAS) - 1))
+
+    def eliminar(self, fila):
+        self.store.eliminar(self.id_en_fila(fila))
+        self.beginRemoveRows(QModelIndex(), fila, fila)
+        del self._filas[fila]
+        self.endRemoveRows()
+
+    def recargar(self):
+        """Vuelve a leer desde el principio (por ejemplo si otro proceso cambió la base)."""
+        self.beginResetModel()
+        self._filas = []
+        self._completo = False
+        self.endResetModel()
+
+
+class ResultadosDialog(QDialog):
+    """Resumen por configuración de una actualización: estado, duración y error."""
+
+    def __init__(self, resultados, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Resultado de la actualización")
+
+        ok = sum(1 for r in resultados if r["ok"])
+        canceladas = sum(1 for r in resultados if r["cancelada"])
+        total = sum(r["duracion"] for r in resultados)
+        resumen = QLabel(f"{ok} correctas, {len(resultados) - ok - canceladas} con error, "
+                         f"{canceladas} canceladas. Tiempo total: {total:.2f} s")
+
+        tabla = QTableWidget(len(resultados), 5)
+        tabla.setHorizontalHeaderLabels(["ID", "Etiqueta", "Estado", "Duración (s)", "Error"])
+        tabla.setEditTriggers(QTableWidget.NoEditTriggers)
+        for fila, resultado in enumerate(resultados):
+            if resultado["cancelada"]:
+                estado, color = "Cancelada", QColor("#9E9E9E")
+            elif not resultado["ok"]:
+                estado, color = "Error", QColor("#E53935")
+            elif resultado["omitida"]:
+                estado, color = "Sin cambios", QColor("#607D8B")
             else:
-                money_columns = []
-
-                
-            header_rows = int(header_rows) if header_rows else 1
-
-            # Aplica formato solo si hay columnas de dinero definidas
-            target_doc = output_file if output_file else word_file
+                estado, color = "Actualizada", QColor("#4CAF50")
+            estado_item = QTableWidgetItem(estado)
+            estado_item.setForeground(color)
+            tabla.setItem(fila, 0, QTableWidgetItem(str(resultado["id"])))
+            tabla.setItem(fila, 1, QTableWidgetItem(resultado["table_label"] or ""))
+            tabla.setItem(fila, 2, estado_item)
+            tabla.setItem(fila, 3, QTableWidgetItem(f"{resultado['duracion']:.2f}"))
+            tabla.setItem(fila, 4, QTableWidgetItem(resultado["error"] or ""))
+        tabla.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        tabla.horizontalHeader().setStretchLastSection(True)
+
+        cerrar_btn = QPushButton("Cerrar")
+        cerrar_btn.clicked.connect(self.accept)
 
-
-            if money_columns:
-                main(target_doc, table_label, money_columns, header_rows)
-                print(f"Formato aplicado a tabla ID {id_}.")
-
-        except Exception as e:
-            print(f"Error al actualizar tabla ID {id_}: {e}")
+        layout = QVBoxLayout()
+        layout.addWidget(resumen)
+        layout.addWidget(tabla)
+        layout.addWidget(cerrar_btn)
+        self.setLayout(layout)
+        self.resize(800, 400)
 
 
 # Clase interfaz
@@ -48,9 +216,9 @@ class TableUpdaterGUI(QWidget):
     def __init__(self):
         super().__init__()
         inicializar_base_datos()
+        self.worker = None
         self.init_ui()
-        self.id_configuraciones = []
-        self.cargar_configuraciones()
+        self.actualizar_filtro_reportes()
         
 
 
@@ -99,6 +267,10 @@ class TableUpdaterGUI(QWidget):
 
         self.label_input = QLineEdit()
         word_layout.addRow("Etiqueta:", self.label_input)
+
+        self.report_input = QLineEdit()
+        self.report_input.setPlaceholderText("Ej. Informe general marzo (opcional)")
+        word_layout.addRow("Informe/proyecto:", self.report_input)
         word_group.setLayout(word_layout)
 
         # Grupo salida
@@ -120,13 +292,17 @@ class TableUpdaterGUI(QWidget):
         format_layout = QFormLayout()
 
         self.money_columns_input = QLineEdit()
-        self.money_columns_input.setPlaceholderText("Ej. 1,2,3")
-        format_layout.addRow("Columnas dinero (índices separados por coma):", self.money_columns_input)
+        self.money_columns_input.setPlaceholderText("Ej. 1,2 (dinero) o 3:porcentaje, 4:entero, 5:fecha")
+        format_layout.addRow("Formato de columnas (índices separados por coma):", self.money_columns_input)
 
         self.header_rows_input = QLineEdit()
         self.header_rows_input.setPlaceholderText("Ej. 1")
         format_layout.addRow("Filas de encabezado:", self.header_rows_input)
 
+        self.enabled_check = QCheckBox("Incluir al actualizar")
+        self.enabled_check.setChecked(True)
+        format_layout.addRow("Habilitada:", self.enabled_check)
+
         format_group.setLayout(format_layout)
 
 
@@ -134,9 +310,20 @@ class TableUpdaterGUI(QWidget):
         guardar_btn = QPushButton("Guardar Configuración")
         guardar_btn.clicked.connect(self.guardar_config)
 
-        actualizar_btn = QPushButton("Actualizar TODAS las tablas")
-        actualizar_btn.setStyleSheet("background-color: #4CAF50; color: white; font-weight: bold;")
-        actualizar_btn.clicked.connect(self.actualizar_todas)
+        self.actualizar_btn = QPushButton("Actualizar TODAS las tablas")
+        self.actualizar_btn.setStyleSheet("background-color: #4CAF50; color: white; font-weight: bold;")
+        self.actualizar_btn.clicked.connect(self.actualizar_todas)
+
+        self.cancelar_btn = QPushButton("Cancelar")
+        self.cancelar_btn.setEnabled(False)
+        self.cancelar_btn.clicked.connect(self.cancelar_actualizacion)
+
+        self.report_filtro = QComboBox()
+        self.report_filtro.addItem("Todos los informes", None)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setFormat("%v / %m tablas")
+        self.progress_bar.setValue(0)
 
         editar_btn = QPushButton("Actualizar Configuración Seleccionada")
 
@@ -148,12 +335,26 @@ class TableUpdaterGUI(QWidget):
 
 
 
-        # Tabla configuraciones
-        self.config_table = QTableWidget()
-        self.config_table.setColumnCount(8)
-        self.config_table.setHorizontalHeaderLabels(["Excel", "Hoja", "Rango", "Word", "Etiqueta", "Salida", "Columnas dinero", "n filas encabezado"])
+        # Tabla configuraciones: modelo con lectura por páginas, ordenado y filtrado por el proxy
+        self.modelo = ConfiguracionesModel(parent=self)
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(self.modelo)
+        self.proxy.setSortRole(Qt.UserRole)
+        self.proxy.setFilterKeyColumn(-1)  # busca en todas las columnas
+        self.proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
 
+        self.filtro_input = QLineEdit()
+        self.filtro_input.setPlaceholderText("Filtrar por cualquier columna")
+        self.filtro_input.textChanged.connect(self.proxy.setFilterFixedString)
+
+        self.config_table = QTableView()
+        self.config_table.setModel(self.proxy)
+        self.config_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.config_table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.config_table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)  # orden de alta
+        self.config_table.setSortingEnabled(True)
         self.config_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.config_table.selectionModel().currentRowChanged.connect(self.seleccion_cambiada)
 
         # Layout principal
         layout = QVBoxLayout()
@@ -165,9 +366,16 @@ class TableUpdaterGUI(QWidget):
         layout.addWidget(guardar_btn)
         layout.addWidget(editar_btn)
         layout.addWidget(QLabel("Configuraciones guardadas:"))
+        layout.addWidget(self.filtro_input)
         layout.addWidget(self.config_table)
         layout.addWidget(eliminar_btn)
-        layout.addWidget(actualizar_btn)
+        actualizar_row = QHBoxLayout()
+        actualizar_row.addWidget(QLabel("Informe:"))
+        actualizar_row.addWidget(self.report_filtro)
+        actualizar_row.addWidget(self.actualizar_btn)
+        actualizar_row.addWidget(self.cancelar_btn)
+        layout.addLayout(actualizar_row)
+        layout.addWidget(self.progress_bar)
         
 
      
@@ -188,8 +396,36 @@ class TableUpdaterGUI(QWidget):
             self.word_input.setText(file)
 
 
+    def fila_seleccionada(self):
+        """Fila del modelo (no de la vista ordenada/filtrada) seleccionada, o -1."""
+        indice = self.config_table.currentIndex()
+        return self.proxy.mapToSource(indice).row() if indice.isValid() else -1
+
+    def seleccion_cambiada(self, actual, anterior):
+        if actual.isValid():
+            self.cargar_fila_en_campos(self.proxy.mapToSource(actual).row())
+
+    def config_desde_campos(self):
+        """Configuración del formulario en el orden de CAMPOS, o None si faltan datos obligatorios."""
+        config = (
+            self.excel_input.text().strip(),
+            self.sheet_input.text().strip(),
+            self.range_input.text().strip(),
+            self.word_input.text().strip(),
+            self.label_input.text().strip(),
+            self.output_input.text().strip() or None,
+            self.money_columns_input.text().strip() or None,
+            self.header_rows_input.text().strip() or None,
+            self.report_input.text().strip() or None,
+            1 if self.enabled_check.isChecked() else 0,
+        )
+        if not all(config[:5]):
+            QMessageBox.warning(self, "Faltan datos", "Completa todos los campos obligatorios.")
+            return None
+        return config
+
     def eliminar_configuracion_seleccionada(self):
-        selected_row = self.config_table.currentRow()
+        selected_row = self.fila_seleccionada()
         if selected_row < 0:
             QMessageBox.warning(self, "Seleccionar", "Selecciona una configuración para eliminar.")
             return
@@ -198,10 +434,9 @@ class TableUpdaterGUI(QWidget):
         if respuesta == QMessageBox.No:
             return
 
-        id_config = self.id_configuraciones[selected_row]
-        eliminar_configuracion(id_config)
+        self.modelo.eliminar(selected_row)
         QMessageBox.information(self, "Eliminado", "Configuración eliminada correctamente.")
-        self.cargar_configuraciones()
+        self.actualizar_filtro_reportes()
 
 
     def browse_output(self):
@@ -210,90 +445,105 @@ class TableUpdaterGUI(QWidget):
             self.output_input.setText(file)
 
     def guardar_config(self):
-        excel_file = self.excel_input.text().strip()
-        sheet_name = self.sheet_input.text().strip()
-        excel_range = self.range_input.text().strip()
-        word_file = self.word_input.text().strip()
-        table_label = self.label_input.text().strip()
-        output_file = self.output_input.text().strip() or None
-        money_columns = self.money_columns_input.text().strip() or None
-        header_rows = self.header_rows_input.text().strip() or None
-
-
-
-        if not all([excel_file, sheet_name, excel_range, word_file, table_label]):
-            QMessageBox.warning(self, "Faltan datos", "Completa todos los campos obligatorios.")
+        config = self.config_desde_campos()
+        if config is None:
             return
 
-        guardar_configuracion(excel_file, sheet_name, excel_range, word_file, table_label, output_file, money_columns, header_rows)
+        self.modelo.agregar(config)
         QMessageBox.information(self, "Guardado", "Configuración guardada correctamente.")
-        self.cargar_configuraciones()
+        self.actualizar_filtro_reportes()
 
 
     def cargar_fila_en_campos(self, row_idx):
-        self.excel_input.setText(self.config_table.item(row_idx, 0).text())
-        self.sheet_input.setText(self.config_table.item(row_idx, 1).text())
-        self.range_input.setText(self.config_table.item(row_idx, 2).text())
-        self.word_input.setText(self.config_table.item(row_idx, 3).text())
-        self.label_input.setText(self.config_table.item(row_idx, 4).text())
-        self.output_input.setText(self.config_table.item(row_idx, 5).text())
-        self.money_columns_input.setText(self.config_table.item(row_idx, 6).text())
-        self.header_rows_input.setText(self.config_table.item(row_idx, 7).text() )
+        config = self.modelo.config_en_fila(row_idx)
+        self.excel_input.setText(config["excel_file"])
+        self.sheet_input.setText(config["sheet_name"])
+        self.range_input.setText(config["excel_range"])
+        self.word_input.setText(config["word_file"])
+        self.label_input.setText(config["table_label"])
+        self.output_input.setText(config["output_file"] or "")
+        self.money_columns_input.setText(config["money_columns"] or "")
+        self.header_rows_input.setText(str(config["header_rows"]) if config["header_rows"] else "")
+        self.report_input.setText(config["report"] or "")
+        self.enabled_check.setChecked(bool(config["enabled"]))
 
     def actualizar_configuracion_seleccionada(self):
-        selected_row = self.config_table.currentRow()
+        selected_row = self.fila_seleccionada()
         if selected_row < 0:
             QMessageBox.warning(self, "Seleccionar", "Selecciona una configuración para actualizar.")
             return
 
-        id_config = self.id_configuraciones[selected_row]
-        excel_file = self.excel_input.text().strip()
-        sheet_name = self.sheet_input.text().strip()
-        excel_range = self.range_input.text().strip()
-        word_file = self.word_input.text().strip()
-        table_label = self.label_input.text().strip()
-        output_file = self.output_input.text().strip() or None
-        money_columns = self.money_columns_input.text().strip() or None
-        header_rows = self.header_rows_input.text().strip() or None
-
-        if not all([excel_file, sheet_name, excel_range, word_file, table_label]):
-            QMessageBox.warning(self, "Faltan datos", "Completa todos los campos obligatorios.")
+        config = self.config_desde_campos()
+        if config is None:
             return
 
-        actualizar_configuracion(id_config, excel_file, sheet_name, excel_range, word_file, table_label, output_file, money_columns, header_rows)
+        self.modelo.actualizar(selected_row, config)
         QMessageBox.information(self, "Actualizado", "Configuración actualizada correctamente.")
-        self.cargar_configuraciones()
-
+        self.actualizar_filtro_reportes()
 
 
     def cargar_configuraciones(self):
-        configs = obtener_configuraciones()
-
-        self.id_configuraciones = []  # 💥 limpiar antes de volver a llenar
-        self.config_table.setRowCount(len(configs))
+        """Vuelve a leer las configuraciones de la base (las filas se cargan a medida que se ven)."""
+        self.modelo.recargar()
+        self.actualizar_filtro_reportes()
 
-        for row_idx, config in enumerate(configs):
-            id_config, excel_file, sheet_name, excel_range, word_file, table_label, output_file, money_columns, header_rows = config
-            self.id_configuraciones.append(id_config)
-        self.config_table.setItem(row_idx, 0, QTableWidgetItem(excel_file))
-        self.config_table.setItem(row_idx, 1, QTableWidgetItem(sheet_name))
-        self.config_table.setItem(row_idx, 2, QTableWidgetItem(excel_range))
-        self.config_table.setItem(row_idx, 3, QTableWidgetItem(word_file))
-        self.config_table.setItem(row_idx, 4, QTableWidgetItem(table_label))
-        self.config_table.setItem(row_idx, 5, QTableWidgetItem(output_file if output_file else ""))
-        self.config_table.setItem(row_idx, 6, QTableWidgetItem(money_columns if money_columns else ""))
-        self.config_table.setItem(row_idx, 7, QTableWidgetItem(str(header_rows) if header_rows else ""))
+    def actualizar_filtro_reportes(self):
+        """Recarga los informes del selector de la actualización, conservando el elegido."""
+        seleccionado = self.report_filtro.currentData()
+        self.report_filtro.clear()
+        self.report_filtro.addItem("Todos los informes", None)
+        for report in obtener_reportes():
+            self.report_filtro.addItem(report, report)
+        indice = self.report_filtro.findData(seleccionado)
+        self.report_filtro.setCurrentIndex(max(indice, 0))
 
 
     def actualizar_todas(self):
-        try:
-            actualizar_todas_las_tablas()
-            QMessageBox.information(self, "Actualización completa", "Todas las tablas fueron actualizadas correctamente.")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Ocurrió un error:\n{str(e)}")
+        if self.worker is not None:
+            return
+        self.worker = ActualizacionWorker(report=self.report_filtro.currentData(), parent=self)
+        self.worker.iniciado.connect(self.progress_bar.setMaximum)
+        self.worker.config_terminada.connect(self.avanzar_progreso)
+        self.worker.terminado.connect(self.mostrar_resultados)
+        self.worker.fallo.connect(self.mostrar_fallo)
+        self.worker.finished.connect(self.fin_actualizacion)
+
+        self.progress_bar.setValue(0)
+        self.actualizar_btn.setEnabled(False)
+        self.cancelar_btn.setEnabled(True)
+        self.worker.start()
+
+    def avanzar_progreso(self, resultado):
+        self.progress_bar.setValue(self.progress_bar.value() + 1)
+
+    def cancelar_actualizacion(self):
+        if self.worker is not None:
+            self.worker.requestInterruption()
+            self.cancelar_btn.setEnabled(False)
+
+    def mostrar_resultados(self, resultados):
+        ResultadosDialog(resultados, self).exec_()
+
+    def mostrar_fallo(self, mensaje):
+        QMessageBox.critical(self, "Error", f"Ocurrió un error:\n{mensaje}")
+
+    def fin_actualizacion(self):
+        self.worker.deleteLater()
+        self.worker = None
+        self.actualizar_btn.setEnabled(True)
+        self.cancelar_btn.setEnabled(False)
+
+    def closeEvent(self, event):
+        # No cerrar a mitad de un guardado: se cancela y se espera a que termine la tabla en curso
+        if self.worker is not None:
+            self.worker.requestInterruption()
+            self.worker.wait()
+        super().closeEvent(event)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = TableUpdaterGUI()
     window.show()
+    # Cuando la ventana ya se dibujó, cargar el resto en un hilo sin bloquear la interfaz
+    QTimer.singleShot(0, threading.Thread(target=precargar_procesamiento, daemon=True).start)
     sys.exit(app.exec_())
@@ -0,0 +1,157 @@
+"""
+Modo de vigilancia: regenera las tablas cuando cambia un libro de Excel.
+
+Revisa cada `intervalo` segundos la fecha y el tamaño de los libros distintos que leen las
+configuraciones habilitadas (consulta por índice a la base, así que las configuraciones
+nuevas se vigilan sin reiniciar). Un libro modificado se procesa cuando lleva `espera`
+segundos sin volver a cambiar, de modo que una ráfaga de guardados (Excel escribe un
+temporal y lo renombra) genera una sola actualización.
+Si alguna configuración de un libro falla (por ejemplo, Excel todavía lo estaba escribiendo),
+el libro queda pendiente y se reintenta en la siguiente revisión.
+
+Solo se ejecutan las configuraciones que leen los libros modificados, de forma incremental y
+en este proceso: la caché de libros (WorkbookCache) y los documentos de Word ya abiertos
+(DocumentosAbiertos) se conservan entre actualizaciones. Si una configuración escribe en un
+archivo de salida distinto de su plantilla, también se reaplican las demás tablas de ese
+mismo destino (el documento se arma desde la plantilla); las que no cambiaron se omiten por
+sus hashes.
+"""
+import os
+import time
+
+from batch_engine import DocumentosAbiertos, procesar_lote, ruta_destino, config_a_dict, _clave_ruta
+from functios_database import obtener_configuraciones
+from config_store import obtener_store
+
+
+def firma_libro(ruta):
+    """(mtime, tamaño) del libro, o None si no existe en este momento (por ejemplo, mientras Excel lo reemplaza)."""
+    try:
+        stat = os.stat(ruta)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class VigilanteLibros:
+    """
+    Vigila los libros de las configuraciones habilitadas (opcionalmente solo las de un
+    informe/proyecto, un documento o unos ids) y actualiza sus tablas cuando cambian.
+    """
+
+    def __init__(self, report=None, word_file=None, ids=None, intervalo=2.0, espera=3.0, forzar=False,
+                 reporte=None, al_terminar=None):
+        self.filtros = {"report": report, "word_file": word_file, "ids": ids}
+        self.intervalo = intervalo
+        self.espera = espera
+        self.forzar = forzar
+        self.reporte = reporte
+        self.al_terminar = al_terminar  # al_terminar(libros, resultados) después de cada actualización
+        self._firmas = {}       # ruta -> firma ya procesada (o vista al empezar)
+        self._pendientes = {}   # ruta -> (firma, momento en que se vio por última vez un cambio)
+        self.cache = None
+        self.documentos = DocumentosAbiertos()
+
+    def revisar(self, ahora=None):
+        """
+        Compara las firmas de los libros con las ya procesadas y devuelve los que cambiaron y
+        llevan `espera` segundos estables. Los libros que se ven por primera vez solo se registran.
+        Un libro devuelto sigue pendiente hasta que `confirmar` registra su firma (después de
+        actualizar sin errores), así que si la actualización falla se reintenta en la siguiente revisión.
+        """
+        ahora = time.monotonic() if ahora is None else ahora
+        libros = obtener_store().libros(**self.filtros)
+        for ruta in set(self._firmas) - set(libros):
+            del self._firmas[ruta]
+            self._pendientes.pop(ruta, None)
+
+        listos = []
+        for ruta in libros:
+            firma = firma_libro(ruta)
+            if ruta not in self._firmas:
+                self._firmas[ruta] = firma
+                continue
+            if firma == self._firmas[ruta]:
+                self._pendientes.pop(ruta, None)
+                continue
+            pendiente = self._pendientes.get(ruta)
+            if pendiente is None or pendiente[0] != firma:
+                self._pendientes[ruta] = (firma, ahora)
+            elif firma is not None and ahora - pendiente[1] >= self.espera:
+                listos.append(ruta)
+        return listos
+
+    def confirmar(self, ruta):
+        """Registra como procesada la firma pendiente de `ruta`."""
+        pendiente = self._pendientes.pop(ruta, None)
+        if pendiente is not None:
+            self._firmas[ruta] = pendiente[0]
+
+    def configs_afectadas(self, libros):
+        """Configuraciones habilitadas que leen `libros`, más las que comparten un destino armado desde plantilla."""
+        configs = {}
+        for ruta in libros:
+            for config in obtener_configuraciones(excel_file=ruta, habilitadas=True, **self.filtros):
+                configs[config[0]] = config_a_dict(config)
+
+        destinos = {}
+        for config in list(configs.values()):
+            if _clave_ruta(config["word_file"]) != _clave_ruta(ruta_destino(config)):
+                destinos.setdefault(config["word_file"], set()).add(_clave_ruta(ruta_destino(config)))
+        for word_file, claves in destinos.items():
+            # Los hermanos se buscan dentro de los filtros del usuario (informe, documento e ids)
+            if self.filtros["word_file"] is not None and word_file != self.filtros["word_file"]:
+                continue
+            filtros = {**self.filtros, "word_file": word_file}
+            for config in obtener_configuraciones(habilitadas=True, **filtros):
+                config = config_a_dict(config)
+                if _clave_ruta(ruta_destino(config)) in claves:
+                    configs[config["id"]] = config
+        return [configs[id_config] for id_config in sorted(configs)]
+
+    def actualizar(self, libros):
+        """
+        Actualiza las tablas que dependen de `libros` y devuelve los resultados de procesar_lote.
+        Se confirman los libros cuyas configuraciones terminaron todas sin error; los demás
+        quedan pendientes para la siguiente revisión.
+        """
+        from excel_cache import WorkbookCache
+
+        configs = self.configs_afectadas(libros)
+        if not configs:
+            for ruta in libros:
+                self.confirmar(ruta)
+            return []
+        if self.cache is None:
+            self.cache = WorkbookCache()
+        print(f"Cambios en {', '.join(libros)}: {len(configs)} configuraciones.")
+        resultados = procesar_lote(configs, cache=self.cache, incremental=True, forzar=self.forzar,
+                                   reporte=self.reporte, documentos=self.documentos)
+        fallidas = {r["id"] for r in resultados if not r["ok"]}
+        for ruta in libros:
+            if not any(config["id"] in fallidas for config in configs if config["excel_file"] == ruta):
+                self.confirmar(ruta)
+            else:
+                print(f"{ruta}: hubo errores, se reintentará en la próxima revisión.")
+        if self.al_terminar is not None:
+            self.al_terminar(libros, resultados)
+        return resultados
+
+    def ejecutar(self, ciclos=None):
+        """Revisa los libros cada `intervalo` segundos hasta Ctrl+C (o `ciclos` revisiones)."""
+        self.revisar()
+        print(f"Vigilando {len(self._firmas)} libros (Ctrl+C para terminar).")
+        ciclo = 0
+        try:
+            while ciclos is None or ciclo < ciclos:
+                time.sleep(self.intervalo)
+                ciclo += 1
+                try:
+                    libros = self.revisar()
+                    if libros:
+                        self.actualizar(libros)
+                except Exception as e:
+                    # Un error (base bloqueada, libro a medio escribir) no detiene la vigilancia
+                    print(f"Error al actualizar: {e}")
+        except KeyboardInterrupt:
+            print("Vigilancia terminada.")
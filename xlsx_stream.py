@@ -0,0 +1,256 @@
+"""
+Lector en streaming de hojas .xlsx.
+
+Recorre el XML de la hoja fila por fila y se detiene al llegar a la última fila pedida.
+Los textos compartidos (sharedStrings.xml) solo se leen hasta el mayor índice usado, de
+modo que leer las primeras filas de una hoja enorme no cuesta más que leer una pequeña
+(openpyxl, incluso en modo solo lectura, carga todos los textos compartidos al abrir).
+
+Los valores se convierten igual que openpyxl con data_only=True: números a int/float,
+fechas según el formato numérico de la celda, booleanos y errores como texto.
+"""
+import posixpath
+import zipfile
+
+from lxml import etree
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format, is_timedelta_format
+from openpyxl.utils import column_index_from_string
+from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900, from_excel, from_ISO8601
+
+NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+_ROW = f"{{{NS_MAIN}}}row"
+_C = f"{{{NS_MAIN}}}c"
+_V = f"{{{NS_MAIN}}}v"
+_T = f"{{{NS_MAIN}}}t"
+_IS = f"{{{NS_MAIN}}}is"
+_R = f"{{{NS_MAIN}}}r"
+_SI = f"{{{NS_MAIN}}}si"
+
+_columnas = {}
+
+
+def _indice_columna(ref):
+    """'AB12' -> 28 (con caché por letras)."""
+    letras = ref.rstrip("0123456789")
+    indice = _columnas.get(letras)
+    if indice is None:
+        indice = _columnas[letras] = column_index_from_string(letras)
+    return indice
+
+
+def _texto_rico(elemento):
+    """Texto de un <si>/<is>: el <t> directo o la concatenación de los <r><t> (sin fonética)."""
+    t = elemento.find(_T)
+    if t is not None:
+        return t.text or ""
+    return "".join(run_t.text or "" for run in elemento.iterfind(_R) for run_t in run.iterfind(_T))
+
+
+def _numero(valor):
+    if "." in valor or "E" in valor or "e" in valor:
+        return float(valor)
+    return int(valor)
+
+
+class TextosCompartidos:
+    """
+    Tabla sharedStrings.xml leída de forma incremental: `textos[i]` solo analiza el XML
+    hasta la entrada i (Excel numera los textos en orden de primera aparición, así que
+    las primeras filas de una hoja usan índices bajos).
+    """
+
+    def __init__(self, zip_libro, ruta):
+        self._textos = []
+        self._archivo = zip_libro.open(ruta) if ruta and ruta in zip_libro.namelist() else None
+        self._entradas = (etree.iterparse(self._archivo, events=("end",), tag=_SI)
+                          if self._archivo is not None else iter(()))
+
+    def __getitem__(self, indice):
+        while len(self._textos) <= indice:
+            try:
+                _, si = next(self._entradas)
+            except StopIteration:
+                return None
+            self._textos.append(_texto_rico(si))
+            si.clear()
+        return self._textos[indice]
+
+    def close(self):
+        if self._archivo is not None:
+            self._archivo.close()
+
+
+class LibroXlsx:
+    """Acceso de solo lectura a las partes de un .xlsx necesarias para leer valores."""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.zip = zipfile.ZipFile(ruta)
+        self._leer_libro()
+        self._formatos_fecha = None
+        self._textos = None
+
+    def close(self):
+        if self._textos is not None:
+            self._textos.close()
+        self.zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _leer_libro(self):
+        libro = etree.fromstring(self.zip.read("xl/workbook.xml"))
+        rels = etree.fromstring(self.zip.read("xl/_rels/workbook.xml.rels"))
+        destinos = {}
+        for rel in rels.iter(f"{{{NS_PKG_REL}}}Relationship"):
+            destino = rel.get("Target")
+            if destino.startswith("/"):
+                destino = destino.lstrip("/")
+            else:
+                destino = posixpath.normpath(posixpath.join("xl", destino))
+            destinos[rel.get("Id")] = destino
+
+        self.hojas = {}
+        self.orden_hojas = []
+        for hoja in libro.iter(f"{{{NS_MAIN}}}sheet"):
+            nombre = hoja.get("name")
+            self.hojas[nombre] = destinos[hoja.get(f"{{{NS_REL}}}id")]
+            self.orden_hojas.append(nombre)
+
+        vista = libro.find(f"{{{NS_MAIN}}}bookViews/{{{NS_MAIN}}}workbookView")
+        self.hoja_activa = self.orden_hojas[int(vista.get("activeTab", 0)) if vista is not None else 0]
+
+        propiedades = libro.find(f"{{{NS_MAIN}}}workbookPr")
+        fecha1904 = propiedades is not None and propiedades.get("date1904") in ("1", "true")
+        self.epoch = CALENDAR_MAC_1904 if fecha1904 else CALENDAR_WINDOWS_1900
+
+        self.ruta_textos = next((d for d in destinos.values() if d.endswith("sharedStrings.xml")), None)
+        self.ruta_estilos = next((d for d in destinos.values() if d.endswith("styles.xml")), None)
+
+    def formatos_fecha(self):
+        """Lista por índice de estilo (atributo s) con None, 'fecha' o 'duracion'."""
+        if self._formatos_fecha is None:
+            self._formatos_fecha = []
+            if self.ruta_estilos and self.ruta_estilos in self.zip.namelist():
+                estilos = etree.fromstring(self.zip.read(self.ruta_estilos))
+                codigos = dict(BUILTIN_FORMATS)
+                for fmt in estilos.iter(f"{{{NS_MAIN}}}numFmt"):
+                    codigos[int(fmt.get("numFmtId"))] = fmt.get("formatCode")
+                cell_xfs = estilos.find(f"{{{NS_MAIN}}}cellXfs")
+                for xf in (cell_xfs if cell_xfs is not None else []):
+                    codigo = codigos.get(int(xf.get("numFmtId", 0)))
+                    if codigo and is_timedelta_format(codigo):
+                        self._formatos_fecha.append("duracion")
+                    elif codigo and is_date_format(codigo):
+                        self._formatos_fecha.append("fecha")
+                    else:
+                        self._formatos_fecha.append(None)
+        return self._formatos_fecha
+
+    def textos_compartidos(self):
+        """Textos compartidos del libro, leídos de forma incremental solo hasta el índice pedido."""
+        if self._textos is None:
+            self._textos = TextosCompartidos(self.zip, self.ruta_textos)
+        return self._textos
+
+    def iterar_filas(self, sheet_name=None, max_row=None, min_col=1, max_col=None):
+        """
+        Genera (numero_fila, [celdas]) desde la fila 1 hasta `max_row`, rellenando las filas
+        que no existen en el XML. Cada celda es (tipo, valor_crudo, estilo) o None.
+        """
+        nombre = sheet_name if sheet_name else self.hoja_activa
+        if nombre not in self.hojas:
+            raise KeyError(f"Worksheet {nombre} does not exist.")
+
+        with self.zip.open(self.hojas[nombre]) as archivo:
+            siguiente = 1
+            for _, fila in etree.iterparse(archivo, events=("end",), tag=_ROW):
+                numero = int(fila.get("r", siguiente))
+                if max_row is not None and numero > max_row:
+                    break
+                while siguiente < numero:
+                    yield siguiente, []
+                    siguiente += 1
+
+                celdas = []
+                columna = 0
+                for c in fila.iterfind(_C):
+                    ref = c.get("r")
+                    columna = _indice_columna(ref) if ref else columna + 1
+                    if columna < min_col:
+                        continue
+                    if max_col is not None and columna > max_col:
+                        break
+                    tipo = c.get("t", "n")
+                    if tipo == "inlineStr":
+                        elemento_is = c.find(_IS)
+                        crudo = _texto_rico(elemento_is) if elemento_is is not None else None
+                    else:
+                        v = c.find(_V)
+                        crudo = v.text if v is not None else None
+                    posicion = columna - min_col
+                    celdas.extend([None] * (posicion - len(celdas)))
+                    celdas.append((tipo, crudo, int(c.get("s", 0))))
+
+                fila.clear()
+                while fila.getprevious() is not None:
+                    del fila.getparent()[0]
+                yield numero, celdas
+                siguiente = numero + 1
+
+    def iterar_valores(self, sheet_name=None, min_row=1, max_row=None, min_col=1, max_col=None):
+        """
+        Genera (numero_fila, valores) para las filas min_row..max_row, con los valores ya
+        convertidos (tupla de ancho max_col - min_col + 1 si se indica max_col).
+        """
+        textos = self.textos_compartidos()
+        formatos_fecha = self.formatos_fecha()
+        ancho = None if max_col is None else max_col - min_col + 1
+        for numero, celdas in self.iterar_filas(sheet_name, max_row, min_col, max_col):
+            if numero < min_row:
+                continue
+            valores = [self._convertir(celda, textos, formatos_fecha) for celda in celdas]
+            if ancho is not None:
+                valores.extend([None] * (ancho - len(valores)))
+            yield numero, tuple(valores)
+
+    def leer_valores(self, sheet_name=None, min_row=1, max_row=None, min_col=1, max_col=None):
+        """
+        Devuelve (filas, completa): las filas min_row..max_row como tuplas de valores
+        (de ancho max_col - min_col + 1 si se indica max_col) y si se llegó al final de la hoja,
+        es decir, si no existe ninguna fila después de `max_row`.
+        """
+        filas = []
+        completa = True
+        for numero, valores in self.iterar_valores(sheet_name, min_row, None, min_col, max_col):
+            if max_row is not None and numero > max_row:
+                completa = False
+                break
+            filas.append(valores)
+        return filas, completa
+
+    def _convertir(self, celda, textos, formatos_fecha):
+        if celda is None:
+            return None
+        tipo, crudo, estilo = celda
+        if crudo is None:
+            return None
+        if tipo == "s":
+            return textos[int(crudo)]
+        if tipo == "n":
+            valor = _numero(crudo)
+            formato = formatos_fecha[estilo] if estilo < len(formatos_fecha) else None
+            if formato is not None:
+                return from_excel(valor, self.epoch, timedelta=formato == "duracion")
+            return valor
+        if tipo == "b":
+            return bool(int(crudo))
+        if tipo == "d":
+            return from_ISO8601(crudo)
+        return crudo  # str, inlineStr, e